@@ -8,3 +8,23 @@ class ServerSettings:
     WINNER_MSG = "WINNER"
     LOOSER_MSG = "LOOSER"
     NEXT_ROUND_MSG = "NO WIN"
+
+    # Pending player connections the OS queues while the accept loop is busy
+    LISTEN_BACKLOG = 64
+
+    # Recycled game boards (boardPool.py)
+    BOARD_POOL_SIZE = 64  # finished boards kept for reuse
+    BOARD_POOL_PREWARM = 8  # boards built at startup
+
+    # --gc-tuning (gcMonitor.py)
+    GC_THRESHOLDS = (10_000, 10, 10)  # gc.set_threshold; larger first thresholds trade fewer pauses for longer ones
+    GC_ALLOC_SAMPLE_EVERY = 100  # trace one move in this many with tracemalloc (0: never)
+    GC_PAUSE_HISTORY = 10_000  # recent collections kept for the pause percentiles
+
+    # Outbound send queues
+    PLAYER_SEND_QUEUE_LIMIT = 16 * 1024  # bytes queued per player before disconnecting it
+    SEND_CHUNK = 16 * 1024  # most bytes copied out of a queue per send(), however long the queue
+
+    # Spectators
+    SPECTATOR_BUFFER_LIMIT = 64 * 1024  # bytes queued per watcher before it is dropped
+    SPECTATOR_HANDSHAKE_TIMEOUT = 5  # seconds to wait for "WATCH [game_id]"
@@ -0,0 +1,160 @@
+import threading
+
+
+class AnalysisWorker:
+    """
+    Background thread that validates every available edge and empty dot of a
+    board snapshot (via GameLogic.check_moves) and picks a suggested move,
+    so the UI thread never runs connectivity checks inline.
+
+    Jobs are immutable BoardSnapshots; only the newest pending job is
+    analyzed. A job may carry a short list of speculative "prefetch"
+    candidates (moves near the cursor), which are validated and published
+    first so the first hover after a turn change is already answered.
+    Results are published to `events` (the client's incoming_events queue)
+    as {"type": "prefetch" | "analysis", "payload": result}.
+
+    With an OpeningBook, positions it covers are suggested its move.
+    """
+
+    def __init__(self, game_logic, events, book=None):
+        self.game_logic = game_logic  # only its snapshot-based check_moves is used
+        self.events = events
+        self.book = book
+        self.cond = threading.Condition()
+        self.pending_prefetch = None  # (snapshot, candidates), served first
+        self.pending_full = None  # snapshot
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.cond.notify()
+        if self.thread:
+            self.thread.join(timeout=1)
+
+    def submit(self, snapshot, prefetch=()):
+        """
+        Queue a snapshot for analysis (its turn is the player to analyze for).
+        prefetch: candidate moves to validate before the full analysis.
+        Replaces any job that hasn't started yet.
+        """
+        with self.cond:
+            self.pending_full = snapshot
+            self.pending_prefetch = (snapshot, list(prefetch)) if prefetch else None
+            self.cond.notify()
+
+    # --------------------------
+    # WORKER THREAD
+    # --------------------------
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and self.pending_prefetch is None and self.pending_full is None:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                # stale jobs were already replaced by submit(): only the newest board is left
+                if self.pending_prefetch is not None:
+                    kind, job = "prefetch", self.pending_prefetch
+                    self.pending_prefetch = None
+                else:
+                    kind, job = "analysis", self.pending_full
+                    self.pending_full = None
+
+            try:
+                if kind == "prefetch":
+                    result = self.check(*job)
+                else:
+                    result = self.analyze(job)
+            except Exception as e:
+                print(f"ANALYSIS: {kind} failed: {e}")
+                continue
+            self.events.put({"type": kind, "payload": result})
+
+    def check(self, snapshot, candidates):
+        """Validates just the given candidates: {version, turn, moves: {candidate: MoveCheck}}."""
+        checks = self.game_logic.check_moves(candidates, snapshot=snapshot)
+        return {
+            "version": snapshot.version,
+            "turn": snapshot.turn,
+            "moves": dict(zip(candidates, checks)),
+        }
+
+    def analyze(self, snapshot):
+        """
+        Returns a dict with:
+          version, turn  - which snapshot/player the result belongs to
+          edges          - {available edge: MoveCheck}
+          dots           - {empty dot: MoveCheck}
+          suggestion     - ("edge", edge) / ("conquer", dot) or None
+        """
+        edges = list(snapshot.available_pairs)
+        dots = list(snapshot.empty_dots)
+        candidates = [("edge", edge) for edge in edges] + [("conquer", dot) for dot in dots]
+        checks = self.game_logic.check_moves(candidates, snapshot=snapshot)
+
+        edge_checks = dict(zip(edges, checks[:len(edges)]))
+        dot_checks = dict(zip(dots, checks[len(edges):]))
+
+        return {
+            "version": snapshot.version,
+            "turn": snapshot.turn,
+            "edges": edge_checks,
+            "dots": dot_checks,
+            "suggestion": self.suggest(snapshot, edge_checks, dot_checks),
+        }
+
+    def suggest(self, snapshot, edge_checks, dot_checks):
+        """
+        A winning move if there is one, then the opening book's move,
+        otherwise a legal edge that extends the player's existing network
+        (closest to the board center first).
+        """
+        for edge, check in sorted(edge_checks.items()):
+            if check.wins:
+                return ("edge", edge)
+
+        entry = self.book.lookup(snapshot, snapshot.turn) if self.book is not None else None
+        if entry is not None:
+            kind, target = entry.move
+            if kind == "conquer" and dot_checks.get(target):
+                return ("conquer", target)
+            if kind == "edge":
+                (x1, y1), (x2, y2) = target
+                for edge in [((x1, y1, 1), (x2, y2, -1)), ((x2, y2, 1), (x1, y1, -1))]:
+                    if edge_checks.get(edge):
+                        return ("edge", edge)
+
+        # dots the player already touches: original dots + endpoints of owned edges
+        touched = {(x, y) for x, y, _ in snapshot.players_original_dots[snapshot.turn]}
+        for u, v in snapshot.players_pairs[snapshot.turn]:
+            if (u[0], u[1]) != (v[0], v[1]):
+                touched.add((u[0], u[1]))
+                touched.add((v[0], v[1]))
+
+        cx, cy = (snapshot.cols - 1) / 2, (snapshot.rows - 1) / 2
+        best = None
+        for edge, check in sorted(edge_checks.items()):
+            if not check.legal:
+                continue
+            (x1, y1, _), (x2, y2, _) = edge
+            extends = (x1, y1) in touched or (x2, y2) in touched
+            distance = abs((x1 + x2) / 2 - cx) + abs((y1 + y2) / 2 - cy)
+            key = (not extends, distance)
+            if best is None or key < best[0]:
+                best = (key, edge)
+
+        if best is not None:
+            return ("edge", best[1])
+        for dot, check in sorted(dot_checks.items()):
+            if check.legal:
+                return ("conquer", dot)
+        return None
@@ -0,0 +1,340 @@
+"""
+Micro-benchmarks for the rules engine hot paths.
+
+Every case runs on positions replayed from recorded games (benchmarks/games/
+<rows>x<cols>/*.json, see gameRecord.py) at several board sizes. The 9x9
+games were played through server.py by loadTest.py; larger boards are
+recorded from random self-play with --record.
+
+    python benchmark.py                   # compare against benchmarks/baseline.json
+    python benchmark.py --save            # add cases the baseline doesn't have yet
+    python benchmark.py --resave          # replace the baseline with the current numbers
+    python benchmark.py --filter check_   # only cases whose name contains "check_"
+    python benchmark.py --record 15x15 21x21
+
+Every case keeps its best of --repeat timeit runs, and each run is
+followed by a run of a fixed calibration workload (plain dicts, sets and
+a BFS that no change to this repo can touch). Cases are compared, and
+stored in the baseline, as their cost relative to that calibration, so
+a machine that is slower today, or busier during one stretch of the
+run, slows both alike and moves no ratio. A case still over the default
+--threshold of 50% is measured again (CONFIRM_RUNS times, keeping the
+best): it only counts as a regression, and the exit status is only 1,
+if it stays over the threshold. --save and --resave likewise store each
+case's best of 1 + CONFIRM_RUNS passes.
+
+--save never touches numbers already in the baseline, so a change is
+always compared against the code it replaced. Use --resave (or --resave
+--filter) only for a change meant to move the numbers, or after moving to
+different hardware: baselines are per machine.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import sys
+import timeit
+from collections import deque
+
+from settings import Settings
+from gameLogic import Board, DistanceTracker
+from gameRecord import GameRecord, load_records
+
+BENCHMARK_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmarks")
+GAMES_DIR = os.path.join(BENCHMARK_DIR, "games")
+BASELINE_PATH = os.path.join(BENCHMARK_DIR, "baseline.json")
+
+GAMES_PER_SIZE = 2
+POSITIONS = {"mid": 0.5, "late": 0.9}  # fraction of a game's moves already played
+SAMPLE_MOVES = 10  # candidate edges / dots per legality benchmark
+
+REPEAT = 9  # timeit runs per case; the best one is kept
+THRESHOLD = 0.5  # allowed slowdown, well above the measured run-to-run noise
+CONFIRM_RUNS = 2  # re-measurements a case must fail too before it counts as a regression
+CALIBRATION_SECONDS = 0.05  # calibration workload timed after every timeit run of a case
+
+
+# --------------------------
+# RECORDED POSITIONS
+# --------------------------
+
+def scaled_layout(rows, cols):
+    """The standard starting layout stretched to a rows x cols board."""
+    x_scale = (cols - 1) / (Settings.STANDARD_COLS - 1)
+    y_scale = (rows - 1) / (Settings.STANDARD_ROWS - 1)
+    return {
+        player: [(round(x * x_scale), round(y * y_scale)) for x, y in dots]
+        for player, dots in Settings.STANDARD_LAYOUT.items()
+    }
+
+
+def record_self_play(rows, cols, seed, max_moves=2000):
+    """Plays random legal moves for both players until someone wins."""
+    rng = random.Random(seed)
+    record = GameRecord(rows, cols, scaled_layout(rows, cols))
+    game_logic = record.new_game()
+
+    for _ in range(max_moves):
+        b = game_logic.board_obj
+        candidates = [("edge", edge) for edge in sorted(b.available_pairs)]
+        candidates += [("conquer", dot) for dot in sorted(b.empty_dots)]
+        rng.shuffle(candidates)
+
+        for kind, move in candidates:
+            check = game_logic.validate_edge(*move) if kind == "edge" else game_logic.validate_conquer(move)
+            if check.legal:
+                break
+        else:
+            break  # no legal move left
+
+        if kind == "edge":
+            move = ((move[0][0], move[0][1]), (move[1][0], move[1][1]))
+            game_logic.make_move(move)
+        else:
+            game_logic.make_conquer_move(move)
+        record.add_move(game_logic.turn, kind, move)
+
+        if check.wins:
+            record.winner = game_logic.turn
+            break
+        game_logic.turn = game_logic.next_turn()
+
+    return record
+
+
+def load_positions(size_filter=None):
+    """{(size, position name): GameLogic} replayed from the recorded games."""
+    positions = {}
+    for size in sorted(os.listdir(GAMES_DIR)):
+        if size_filter and size not in size_filter:
+            continue
+        records = load_records(os.path.join(GAMES_DIR, size))[:GAMES_PER_SIZE]
+        for game_number, record in enumerate(records):
+            for name, fraction in POSITIONS.items():
+                ply = int(len(record.moves) * fraction)
+                positions[(size, f"g{game_number}-{name}")] = record.replay(ply)
+    return positions
+
+
+# --------------------------
+# BENCHMARK CASES
+# --------------------------
+
+def benchmark_cases(game_logic):
+    """
+    {case name: (callable, calls per invocation)} for one position. Mutating
+    cases undo their change so every repetition sees the same board.
+    """
+    b = game_logic.board_obj
+    player = game_logic.turn
+    opponent = game_logic.next_turn()
+    game_logic.check_win()  # sync the win trackers, as during play: mutations then pay for updating them
+    layout = {p: [(x, y) for x, y, i in dots if i == 1] for p, dots in b.players_original_dots.items()}
+
+    edges = sorted(b.available_pairs)[::max(1, len(b.available_pairs) // SAMPLE_MOVES)][:SAMPLE_MOVES]
+    free_dots = sorted(b.empty_dots)
+    dots = free_dots[::max(1, len(free_dots) // SAMPLE_MOVES)][:SAMPLE_MOVES]
+    edge = edges[0]
+    move = ((edge[0][0], edge[0][1]), (edge[1][0], edge[1][1]))
+    blocking_edges = b.players_pairs[opponent].union(b.available_pairs)
+
+    def conquer_unconquer():
+        b.conquer_dot(player, dots[0])
+        b.unconquer_dot(player, dots[0])
+
+    def make_undo():
+        game_logic.make_move(move)
+        game_logic.undo_move(move, player)
+
+    def edge_checks():
+        for e in edges:
+            game_logic.check_edge_input(e[0], e[1])
+
+    def conquer_checks():
+        for dot in dots:
+            game_logic.check_conquer_input(dot)
+
+    def distances_from_scratch():
+        for p in (player, opponent):
+            DistanceTracker(b, p).distance()
+
+    def make_undo_distances():
+        game_logic.make_move(move)
+        game_logic.distance_to_win(player)
+        game_logic.distance_to_win(opponent)
+        game_logic.undo_move(move, player)
+
+    return {
+        "Board.__init__": (lambda: Board(b.rows, b.cols, layout), 1),
+        "conquer_dot+unconquer_dot": (conquer_unconquer, 1),
+        "make_move+undo_move": (make_undo, 1),
+        "check_all_outs_reach_all_ins": (lambda: game_logic.check_all_outs_reach_all_ins(
+            b.all_points, blocking_edges, b.players_original_dots[opponent]), 1),
+        "check_win": (game_logic.check_win, 1),
+        "check_edge_input": (edge_checks, len(edges)),
+        "check_conquer_input": (conquer_checks, len(dots)),
+        "distance_to_win": (distances_from_scratch, 1),
+        "make_move+distance_to_win+undo_move": (make_undo_distances, 1),
+    }
+
+
+def calibration_workload(size=12):
+    """
+    Fixed work in the rules engine's style (tuple keys, dicts, sets, a BFS)
+    that doesn't call this repo's code: the yardstick the cases are
+    measured against.
+    """
+    adjacency = {}
+    for x in range(size):
+        for y in range(size):
+            adjacency[(x, y)] = {(x + dx, y + dy) for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]
+                                 if 0 <= x + dx < size and 0 <= y + dy < size}
+    seen, queue = {(0, 0)}, deque([(0, 0)])
+    while queue:
+        for nbr in adjacency[queue.popleft()]:
+            if nbr not in seen:
+                seen.add(nbr)
+                queue.append(nbr)
+    return len(seen)
+
+
+def measure(func, calls, repeat):
+    """
+    (best seconds per call, best seconds per calibration_workload) over
+    `repeat` timeit runs of about 0.2 s each, every one followed by a
+    calibration run so both see the machine in the same state.
+
+    The garbage collector stays on while timing: a Board and its trackers
+    reference each other, so with timeit's default of turning it off every
+    run of Board.__init__ piled up ~150 MB of cycles, and the case timed
+    how fast the OS handed out fresh memory rather than the code.
+    """
+    timer = timeit.Timer(func, setup=gc.enable)
+    number, _ = timer.autorange()
+    calibration = timeit.Timer(calibration_workload, setup=gc.enable)
+    calibration_number = max(1, int(CALIBRATION_SECONDS / calibration.timeit(10) * 10))
+    best = best_calibration = float("inf")
+    for _ in range(repeat):
+        best = min(best, timer.timeit(number) / number)
+        best_calibration = min(best_calibration, calibration.timeit(calibration_number) / calibration_number)
+    return best / calls, best_calibration
+
+
+def run_benchmarks(name_filter=None, size_filter=None, repeat=REPEAT, names=None):
+    """
+    {case name: cost per call relative to calibration_workload}; names, if
+    given, limits the run to exactly those cases.
+    """
+    results = {}
+    for (size, position), game_logic in load_positions(size_filter).items():
+        for case, (func, calls) in benchmark_cases(game_logic).items():
+            name = f"{size}/{position}/{case}"
+            if name_filter and name_filter not in name:
+                continue
+            if names is not None and name not in names:
+                continue
+            seconds, calibration = measure(func, calls, repeat)
+            results[name] = seconds / calibration
+            print(f"BENCH: {name:<55} {seconds * 1e6:12.2f} us {results[name]:10.3f} x calibration")
+    return results
+
+
+# --------------------------
+# BASELINE
+# --------------------------
+
+def load_baseline():
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        baseline = json.load(f)
+    if baseline.get("unit") != "calibration_workload":
+        print("BENCH: the baseline holds absolute times from an older benchmark.py; --resave it")
+        return {}
+    return baseline["results"]
+
+
+def save_baseline(results, replace=False):
+    """Adds the results of cases missing from the baseline; replace=True overwrites the others too."""
+    baseline = load_baseline()
+    if not replace:
+        kept = [name for name in results if name in baseline]
+        results = {name: cost for name, cost in results.items() if name not in baseline}
+        if kept:
+            print(f"BENCH: kept the baseline of {len(kept)} case(s) already in it (use --resave to replace them)")
+    baseline.update(results)
+    with open(BASELINE_PATH, "w") as f:
+        json.dump({
+            "machine": f"{platform.machine()} {platform.processor()}".strip(),
+            "python": platform.python_version(),
+            "unit": "calibration_workload",
+            "results": dict(sorted(baseline.items())),
+        }, f, indent=1)
+    print(f"BENCH: saved {len(results)} results to {BASELINE_PATH}")
+
+
+def compare(results, baseline, threshold):
+    """Prints the change per case; returns the names of regressed cases."""
+    regressions = []
+    for name, cost in results.items():
+        if name not in baseline:
+            print(f"BENCH: {name:<55} (no baseline)")
+            continue
+        ratio = cost / baseline[name]
+        flag = ""
+        if ratio > 1 + threshold:
+            flag = "  REGRESSION"
+            regressions.append(name)
+        print(f"BENCH: {name:<55} {(ratio - 1) * 100:+7.1f}%{flag}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rules engine micro-benchmarks")
+    parser.add_argument("--save", action="store_true", help="add the results of cases missing from the baseline")
+    parser.add_argument("--resave", action="store_true", help="store the results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="allowed slowdown (0.5 = 50%%)")
+    parser.add_argument("--filter", help="only run cases whose name contains this")
+    parser.add_argument("--sizes", nargs="+", help="only these board sizes, e.g. 9x9 15x15")
+    parser.add_argument("--repeat", type=int, default=REPEAT)
+    parser.add_argument("--record", nargs="+", metavar="ROWSxCOLS",
+                        help="record self-play games for these board sizes instead of benchmarking")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.record:
+        for size in args.record:
+            rows, cols = map(int, size.split("x"))
+            directory = os.path.join(GAMES_DIR, size)
+            os.makedirs(directory, exist_ok=True)
+            for game_number in range(GAMES_PER_SIZE):
+                record = record_self_play(rows, cols, args.seed + game_number)
+                path = os.path.join(directory, f"selfplay_{args.seed + game_number}.json")
+                record.save(path)
+                print(f"BENCH: recorded {len(record.moves)} moves ({record.winner} won) to {path}")
+        sys.exit(0)
+
+    results = run_benchmarks(args.filter, args.sizes, args.repeat)
+    if args.save or args.resave:
+        # a baseline is the best of as many passes as a flagged case gets before it counts as a regression
+        for run in range(CONFIRM_RUNS):
+            print(f"BENCH: measuring again for the baseline ({run + 1}/{CONFIRM_RUNS})")
+            for name, cost in run_benchmarks(size_filter=args.sizes, repeat=args.repeat, names=set(results)).items():
+                results[name] = min(results[name], cost)
+        save_baseline(results, replace=args.resave)
+        sys.exit(0)
+
+    baseline = load_baseline()
+    regressions = compare(results, baseline, args.threshold)
+    for _ in range(CONFIRM_RUNS):
+        if not regressions:
+            break
+        print(f"BENCH: measuring {len(regressions)} case(s) over the threshold again")
+        for name, cost in run_benchmarks(size_filter=args.sizes, repeat=args.repeat, names=set(regressions)).items():
+            results[name] = min(results[name], cost)
+        regressions = compare({name: results[name] for name in regressions}, baseline, args.threshold)
+    if regressions:
+        print(f"BENCH: {len(regressions)} case(s) regressed by more than {args.threshold:.0%}")
+        sys.exit(1)
@@ -0,0 +1,71 @@
+"""
+Recycling of finished games' boards on the server.
+
+A GameLogic (board, edge sets, win trackers) is a large object graph. Rather
+than building one per game and dropping it when the game ends, the server
+takes games from a BoardPool and gives them back afterwards: the finished
+game is reset in place (Board.reset) and kept for the next pair of players,
+so starting a game is a list pop and the number of live board objects stays
+flat however fast games turn over.
+"""
+import threading
+
+from gameLogic import GameLogic
+
+
+class BoardPool:
+    """
+    Free GameLogic objects for one board size and starting layout.
+
+    acquire() hands out a ready game at its starting position (building a new
+    one only when the pool is empty); release() resets a finished game and
+    keeps it, up to max_free objects.
+    """
+
+    def __init__(self, rows, cols, players_original_dots, max_free, prewarm=0):
+        self.rows = rows
+        self.cols = cols
+        self.players_original_dots = players_original_dots
+        self.max_free = max_free
+        self.free = []
+        self.lock = threading.Lock()  # games are released from their own threads
+
+        # statistics
+        self.created = 0
+        self.reused = 0
+        self.discarded = 0
+
+        # builds Board's template for this layout and fills the pool up front
+        for _ in range(min(prewarm, max_free)):
+            self.free.append(self.new_game())
+
+    def new_game(self):
+        self.created += 1
+        return GameLogic(self.rows, self.cols, self.players_original_dots)
+
+    def acquire(self):
+        """A GameLogic at the starting position, P1 to move."""
+        with self.lock:
+            if self.free:
+                self.reused += 1
+                return self.free.pop()
+            return self.new_game()
+
+    def release(self, game_logic):
+        """
+        Returns a finished game to the pool. The caller must not touch it
+        afterwards. The reset runs here, in the releasing game's thread, so
+        acquire() never pays for it.
+        """
+        with self.lock:
+            if len(self.free) >= self.max_free:
+                self.discarded += 1
+                return
+        game_logic.reset()
+        with self.lock:
+            self.free.append(game_logic)
+
+    def stats(self):
+        with self.lock:
+            return {"free": len(self.free), "created": self.created,
+                    "reused": self.reused, "discarded": self.discarded}
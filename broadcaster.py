@@ -0,0 +1,309 @@
+import selectors
+import socket
+import threading
+
+from ServerSettings import ServerSettings
+
+
+class Subscriber:
+    """
+    One receiving socket plus its bounded queue of pending outbound bytes.
+    Only the broadcaster's I/O thread touches the socket for writing.
+    """
+
+    def __init__(self, conn, addr, limit, watch_eof):
+        self.conn = conn
+        self.addr = addr
+        self.limit = limit  # max queued bytes before the overflow policy kicks in
+        self.watch_eof = watch_eof  # spectators: I/O thread reads to detect EOF
+        self.buffer = bytearray()
+        self.dropped = False  # overflowed / disconnected -> will be closed
+        self.overflowed = False
+        self.close_when_flushed = False  # game over -> close after last byte
+        self.closed = False
+
+        # backpressure metrics
+        self.messages_queued = 0
+        self.bytes_sent = 0
+        self.peak_queued_bytes = 0
+
+    def stats(self):
+        return {
+            "addr": self.addr,
+            "queued_bytes": len(self.buffer),
+            "peak_queued_bytes": self.peak_queued_bytes,
+            "messages_queued": self.messages_queued,
+            "bytes_sent": self.bytes_sent,
+            "overflowed": self.overflowed,
+        }
+
+
+class Broadcaster:
+    """
+    The server's outbound I/O layer.
+
+    publish() and send() never touch a socket: they only append to each
+    subscriber's bounded write queue and wake the I/O thread, which drains
+    the queues with non-blocking send(). A game thread therefore never waits
+    on a slow receiver.
+
+    Overflow policy: a subscriber whose queue would grow past its limit is
+    dropped and its socket shut down. For spectators that is the end of it;
+    for players the game loop sees the dropped connection and ends the game
+    with "END DISCONNECTED".
+    """
+
+    def __init__(self, max_buffer_bytes=ServerSettings.SPECTATOR_BUFFER_LIMIT):
+        self.max_buffer_bytes = max_buffer_bytes
+        self.selector = selectors.DefaultSelector()
+        self.lock = threading.Lock()  # guards queues, metrics and the pending sets
+        self.pending_add = []
+        self.dirty = set()
+        self.live = set()
+        self.running = True
+
+        # totals over the server's lifetime
+        self.total_overflows = 0
+        self.total_disconnects = 0
+
+        # socketpair used to wake the I/O thread out of select()
+        self._wake_r, self._wake_w = socket.socketpair()
+        self._wake_r.setblocking(False)
+        self._wake_w.setblocking(False)
+        self.selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+        self.thread = threading.Thread(target=self._io_loop, daemon=True)
+        self.thread.start()
+
+    # --------------------------
+    # API (any thread)
+    # --------------------------
+
+    def add(self, conn, addr, initial_msgs=(), limit=None, watch_eof=True):
+        """
+        Registers a new subscriber, pre-filling its queue with initial_msgs.
+        watch_eof=False leaves reading to the owner (player sockets are read by
+        the game thread); the socket is still switched to non-blocking mode.
+        """
+        conn.setblocking(False)
+        sub = Subscriber(conn, addr, limit or self.max_buffer_bytes, watch_eof)
+        with self.lock:
+            for msg in initial_msgs:
+                self._enqueue(sub, msg.encode())
+            self.pending_add.append(sub)
+            self.dirty.add(sub)
+            self.live.add(sub)
+        self._wake()
+        return sub
+
+    def publish(self, subscribers, msg):
+        """Queues msg for every subscriber. Never blocks on the network."""
+        data = msg.encode()
+        with self.lock:
+            for sub in subscribers:
+                self._enqueue(sub, data)
+        self._wake()
+
+    def send(self, sub, msg):
+        self.publish((sub,), msg)
+
+    def close_after_flush(self, subscribers):
+        """Closes subscribers once everything queued for them has been sent."""
+        with self.lock:
+            for sub in subscribers:
+                sub.close_when_flushed = True
+                self.dirty.add(sub)
+        self._wake()
+
+    def stats(self):
+        """Aggregated backpressure metrics over all live subscribers."""
+        with self.lock:
+            return {
+                "subscribers": len(self.live),
+                "queued_bytes": sum(len(sub.buffer) for sub in self.live),
+                "max_queued_bytes": max((len(sub.buffer) for sub in self.live), default=0),
+                "overflows": self.total_overflows,
+                "disconnects": self.total_disconnects,
+            }
+
+    def stop(self):
+        self.running = False
+        self._wake()
+
+    def _enqueue(self, sub, data):
+        """Caller holds self.lock."""
+        if sub.dropped:
+            return
+        if len(sub.buffer) + len(data) > sub.limit:
+            print(f"SERVER: send queue overflow for {sub.addr} "
+                  f"({len(sub.buffer)} bytes pending) - disconnecting")
+            sub.dropped = True
+            sub.overflowed = True
+            self.total_overflows += 1
+        else:
+            sub.buffer += data
+            sub.messages_queued += 1
+            sub.peak_queued_bytes = max(sub.peak_queued_bytes, len(sub.buffer))
+        self.dirty.add(sub)
+
+    # --------------------------
+    # I/O THREAD
+    # --------------------------
+
+    def _wake(self):
+        try:
+            self._wake_w.send(b"\0")
+        except (BlockingIOError, OSError):
+            pass  # a wakeup is already pending
+
+    def _io_loop(self):
+        while self.running:
+            for key, mask in self.selector.select(timeout=1.0):
+                sub = key.data
+                if sub is None:
+                    self._drain_wakeups()
+                    continue
+                if mask & selectors.EVENT_READ:
+                    self._read(sub)
+                if mask & selectors.EVENT_WRITE:
+                    with self.lock:
+                        self.dirty.add(sub)
+
+            with self.lock:
+                new_subs, self.pending_add = self.pending_add, []
+                dirty, self.dirty = self.dirty, set()
+
+            for sub in new_subs:
+                if not sub.dropped and sub.watch_eof:
+                    self.selector.register(sub.conn, selectors.EVENT_READ, sub)
+            for sub in dirty:
+                self._flush(sub)
+
+        for sub in list(self.live):
+            self._close(sub)
+
+    def _drain_wakeups(self):
+        try:
+            while self._wake_r.recv(1024):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def _read(self, sub):
+        """Spectators don't talk after the handshake; only EOF matters."""
+        try:
+            if not sub.conn.recv(1024):
+                sub.dropped = True
+        except BlockingIOError:
+            return
+        except OSError:
+            sub.dropped = True
+        if sub.dropped:
+            self._close(sub)
+
+    def _flush(self, sub):
+        """
+        Sends as much of the queue's head as the socket accepts right now.
+        Only one chunk is copied out of the queue per send, so a long backlog
+        isn't copied again and again while a slow receiver drains it.
+        """
+        with self.lock:
+            if sub.dropped:
+                data = b""
+            else:
+                data = bytes(sub.buffer[:ServerSettings.SEND_CHUNK])
+
+        sent = 0
+        if data:
+            try:
+                sent = sub.conn.send(data)
+            except BlockingIOError:
+                sent = 0
+            except OSError:
+                sub.dropped = True
+
+        with self.lock:
+            del sub.buffer[:sent]
+            sub.bytes_sent += sent
+            remaining = len(sub.buffer)
+
+        if sub.dropped or (remaining == 0 and sub.close_when_flushed):
+            self._close(sub)
+            return
+
+        events = selectors.EVENT_READ if sub.watch_eof else 0
+        if remaining:
+            events |= selectors.EVENT_WRITE
+        self._set_events(sub, events)
+
+    def _set_events(self, sub, events):
+        """Player sockets are only registered while they have bytes queued."""
+        if sub.closed:
+            return
+        registered = sub.conn in self.selector.get_map()
+        if not events:
+            if registered:
+                self.selector.unregister(sub.conn)
+        elif registered:
+            self.selector.modify(sub.conn, events, sub)
+        else:
+            self.selector.register(sub.conn, events, sub)
+
+    def _close(self, sub):
+        if sub.closed:
+            return
+        sub.closed = True
+        with self.lock:
+            self.live.discard(sub)
+            if sub.dropped:
+                self.total_disconnects += 1
+        sub.dropped = True
+        try:
+            self.selector.unregister(sub.conn)
+        except (KeyError, ValueError):
+            pass
+        try:
+            # shutdown wakes a game thread that is waiting to read this socket
+            sub.conn.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            sub.conn.close()
+        except OSError:
+            pass
+
+
+class GameChannel:
+    """
+    The spectators of one game plus the message history that late joiners
+    replay to rebuild the current board before the live stream starts.
+    """
+
+    def __init__(self, broadcaster):
+        self.broadcaster = broadcaster
+        self.history = []
+        self.subscribers = set()
+        self.lock = threading.Lock()  # keeps join() and publish() ordered
+        self.closed = False
+
+    def join(self, conn, addr, greeting):
+        """Adds a spectator. Returns None if the game is already over."""
+        with self.lock:
+            if self.closed:
+                return None
+            initial = [greeting + "\n"] + self.history
+            sub = self.broadcaster.add(conn, addr, initial)
+            self.subscribers.add(sub)
+            return sub
+
+    def publish(self, msg):
+        with self.lock:
+            line = msg + "\n"
+            self.history.append(line)
+            self.subscribers = {sub for sub in self.subscribers if not sub.dropped}
+            self.broadcaster.publish(self.subscribers, line)
+
+    def close(self):
+        with self.lock:
+            self.closed = True
+            self.broadcaster.close_after_flush(self.subscribers)
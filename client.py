@@ -2,11 +2,13 @@
 import socket
 import threading
 import queue
-import time
+from collections import deque
 
 import pygame
 from gameLogic import *
 from settings import Settings
+from analysisWorker import AnalysisWorker
+from openingBook import OpeningBook
 
 
 # -------------------------
@@ -61,7 +63,7 @@ def is_mouse_on_point(mouse_pos, point, to_pixel, tolerance=6):
 # Client-side game
 # -------------------------
 class ClientSideGame:
-    def __init__(self, player_color):  # player_color starts as None
+    def __init__(self, player_color, spectate=False):  # player_color starts as None
         pygame.init()
         self.screen = pygame.display.set_mode((Settings.WINDOW_WIDTH, Settings.WINDOW_HEIGHT))
         pygame.display.set_caption(Settings.WINDOW_TITLE)
@@ -70,19 +72,10 @@ class ClientSideGame:
         self.player_color = player_color  # starts as None
 
         # Initialize game logic
-        self.gameLogic = GameLogic(
-            9, 9,
-            {
-                Settings.PLAYER1: [(2, 2), (5, 4), (2, 6)],
-                Settings.PLAYER2: [(6, 2), (3, 4), (6, 6)]
-            }
-        )
+        self.gameLogic = GameLogic(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
 
         self.board = self.gameLogic.board_obj
 
-        # Ensure each (x, y) appears only once in empty_dots
-        self.board.empty_dots = list({(x, y) for x, y, _ in self.board.all_points})
-
         # Calculate spacing between lines based on window size
         self.space_between_lines_x = (
                 (Settings.WINDOW_WIDTH - 2 * Settings.MARGIN - Settings.LINE_WIDTH)
@@ -102,31 +95,56 @@ class ClientSideGame:
         # Networking
         self.client_socket = None
         self.net_thread = None
-        self.outgoing_moves = queue.Queue()  # UI -> Network: tuples like ("edge", edge_obj) or ("conquer",(x,y))
+        self.outgoing_moves = queue.Queue()  # UI -> Network: (seq, move_data) of predicted moves
         self.incoming_events = queue.Queue()  # Network -> UI: dicts with keys: type, payload
 
         # Local turn/state flags
         self.is_my_turn = False  # updated by server
-        self.awaiting_server_ok = False  # waiting for OK/NOT_OK after sending a move
+        self.awaiting_server_ok = False  # a predicted move hasn't been confirmed by the server yet
+
+        # Client-side prediction: our moves are applied locally at once and
+        # rolled back if the server answers INVALID_MOVE
+        self.move_seq = 0
+        self.predictions = deque()  # (seq, player, kind, move, move_data), oldest first
 
         # Graceful shutdown flags
         self.network_alive = False
 
+        # Spectators only watch
+        self.spectate = spectate
+
+        # Server messages are newline-terminated; holds a partial trailing line
+        self.recv_buffer = ""
+
+        # Background legality/hint analysis; results arrive as "analysis" events
+        self.analysis_worker = AnalysisWorker(self.gameLogic, self.incoming_events, OpeningBook.open())
+        self.analysis = None  # latest result (see AnalysisWorker.analyze)
+        self.show_hint = False
+
+        # Hover legality per board version/turn, filled by prefetch, analysis or inline checks
+        self.hover_cache = {}
+        self.hover_cache_key = None
+        self.last_update_points = ()  # dots touched by the last server update
+
     # -------------------------
     # Socket connect & network thread
     # -------------------------
-    def start_connection_to_server(self, host='localhost', port=Settings.PORT):
+    def start_connection_to_server(self, host='localhost', port=None):
         """Starts network thread which performs handshake and then main network loop."""
+        if port is None:
+            port = Settings.SPECTATOR_PORT if self.spectate else Settings.PORT
         self.client_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
         try:
             self.client_socket.connect((host, port))
+            if self.spectate:
+                self.client_socket.sendall("WATCH".encode())
         except Exception as e:
             print("Couldn't connect to server:", e)
             self.incoming_events.put({"type": "error", "payload": f"connect_failed:{e}"})
             return
 
         # set timeout for non-blocking-ish recv
-        self.client_socket.settimeout(0.5)
+        self.client_socket.settimeout(Settings.NET_POLL_TIMEOUT)
         self.network_alive = True
         self.net_thread = threading.Thread(target=self._network_loop, daemon=True)
         self.net_thread.start()
@@ -136,7 +154,14 @@ class ClientSideGame:
         sock = self.client_socket
         try:
             # HANDSHAKE
-            data = self._recv_blocking()
+            messages = []
+            data = None
+            while not messages:
+                data = self._recv_blocking()
+                if not data:
+                    break
+                messages = self._split_messages(data)
+            data = messages.pop(0) if messages else data
             print(f"CLIENT: Received handshake: {data}")
 
             if data == "WELCOME 1":
@@ -147,6 +172,10 @@ class ClientSideGame:
                 self.player_color = Settings.PLAYER2
                 self.is_my_turn = False
                 self.incoming_events.put({"type": "status", "payload": "game_start_P2"})
+            elif data and data.startswith("WELCOME SPECTATOR"):
+                self.player_color = None
+                self.is_my_turn = False
+                self.incoming_events.put({"type": "status", "payload": "spectating"})
             else:
                 raise Exception(f"Unexpected handshake message: {data}")
 
@@ -154,9 +183,10 @@ class ClientSideGame:
 
             # main loop: react to server messages and process outgoing moves
             while self.network_alive:
-                srv_msg = None
                 try:
-                    srv_msg = self._try_recv()
+                    data = self._try_recv()
+                    if data:
+                        messages.extend(self._split_messages(data))
                 except ConnectionResetError:
                     print("CLIENT: Connection reset by server")
                     self.incoming_events.put({"type": "error", "payload": "connection_reset"})
@@ -166,15 +196,14 @@ class ClientSideGame:
                     self.incoming_events.put({"type": "error", "payload": f"recv_error:{e}"})
                     break
 
-                if srv_msg:
-                    srv_msg = srv_msg.strip()
+                while messages and self.network_alive:
+                    srv_msg = messages.pop(0).strip()
                     print(f"CLIENT: Received: {srv_msg}")
 
                     if srv_msg.startswith("UPDATE "):
                         move_data = srv_msg[7:]
                         self.incoming_events.put({"type": "apply_update", "payload": move_data})
                     elif srv_msg == "INVALID_MOVE":
-                        self.awaiting_server_ok = False
                         self.incoming_events.put({"type": "not_ok", "payload": None})
                     elif srv_msg.startswith("END "):
                         winner_msg = srv_msg[4:]
@@ -184,31 +213,23 @@ class ClientSideGame:
                         if len(srv_msg) > 0:
                             self.incoming_events.put({"type": "raw", "payload": srv_msg})
 
-                # If it's our turn and we have an outgoing move queued and we're not already awaiting OK -> send it
-                if self.is_my_turn and not self.awaiting_server_ok:
-                    try:
-                        move = self.outgoing_moves.get_nowait()
-                    except queue.Empty:
-                        move = None
-
-                    if move:
-                        msg = ""
-                        if move[0] == "edge":
-                            ((x1, y1, l1), (x2, y2, l2)) = move[1]
-                            msg = f"MOVE ({x1},{y1},{l1})->({x2},{y2},{l2})"
-                        elif move[0] == "conquer":
-                            (x, y) = move[1]
-                            msg = f"MOVE ({x},{y},-1)"
-
-                        try:
-                            sock.sendall(msg.encode())
-                            self.awaiting_server_ok = True
-                        except Exception as e:
-                            print("CLIENT: send failed:", e)
-                            self.incoming_events.put({"type": "error", "payload": f"send_failed:{e}"})
-                            break
-
-                time.sleep(0.01)
+                if self.spectate:
+                    continue
+
+                # Moves are only queued on our turn (and already applied locally): send right away.
+                # The recv timeout above is the only polling delay.
+                try:
+                    seq, move_data = self.outgoing_moves.get_nowait()
+                except queue.Empty:
+                    continue
+
+                try:
+                    sock.sendall(f"MOVE {move_data}".encode())
+                    print(f"CLIENT: Sent move #{seq}: {move_data}")
+                except Exception as e:
+                    print("CLIENT: send failed:", e)
+                    self.incoming_events.put({"type": "error", "payload": f"send_failed:{e}"})
+                    break
 
         finally:
             try:
@@ -229,7 +250,17 @@ class ClientSideGame:
                 return None
             return data.decode()
         finally:
-            sock.settimeout(0.5)
+            sock.settimeout(Settings.NET_POLL_TIMEOUT)
+
+    def _split_messages(self, data):
+        """
+        Splits received data into messages.
+        The server queues its sends, so one recv may hold several newline-terminated
+        messages (e.g. UPDATE + END) or cut one in half.
+        """
+        self.recv_buffer += data
+        *lines, self.recv_buffer = self.recv_buffer.split("\n")
+        return [line for line in lines if line.strip()]
 
     def _try_recv(self):
         """Non-blocking-ish recv returning decoded string or None."""
@@ -247,7 +278,7 @@ class ClientSideGame:
     # -------------------------
     def send_server_edge_move(self, edge):
         """Called from UI thread when player clicks to place an edge.
-           Returns True if move was queued."""
+           The move is applied locally at once. Returns True if move was queued."""
         if not self.network_alive:
             print("CLIENT: network not alive - cannot send move")
             return False
@@ -258,11 +289,12 @@ class ClientSideGame:
             print("CLIENT: awaiting server response for previous move")
             return False
 
-        self.outgoing_moves.put(("edge", edge))
+        ((x1, y1, l1), (x2, y2, l2)) = edge
+        self.predict_move("edge", edge, f"({x1},{y1},{l1})->({x2},{y2},{l2})")
         return True
 
     def send_server_conquer_move(self, dot):
-        """Queue a conquer move. Returns True if queued."""
+        """Apply a conquer move locally and queue it. Returns True if queued."""
         if not self.network_alive:
             print("CLIENT: network not alive - cannot send move")
             return False
@@ -274,15 +306,58 @@ class ClientSideGame:
             return False
 
         (x, y) = dot
-        self.outgoing_moves.put(("conquer", (int(x), int(y))))
+        dot = (int(x), int(y))
+        self.predict_move("conquer", dot, f"({dot[0]},{dot[1]},-1)")
         return True
 
+    # -------------------------
+    # Client-side prediction
+    # -------------------------
+    def predict_move(self, kind, move, move_data):
+        """
+        Applies our move to the local board right away and queues it for the
+        server, tagged with a sequence number. The server echoes it back as
+        UPDATE <move_data> (confirmed) or answers INVALID_MOVE (rolled back).
+        """
+        self.move_seq += 1
+        player = self.gameLogic.turn
+
+        if kind == "edge":
+            (x1, y1, _), (x2, y2, _) = move
+            self.gameLogic.make_move(((x1, y1), (x2, y2)))
+        else:
+            self.gameLogic.make_conquer_move(move)
+
+        self.predictions.append((self.move_seq, player, kind, move, move_data))
+        self.gameLogic.turn = self.gameLogic.next_turn()
+        self.is_my_turn = False
+        self.awaiting_server_ok = True
+        self.outgoing_moves.put((self.move_seq, move_data))
+        self.request_analysis()
+        print(f"CLIENT: Predicted move #{self.move_seq}: {move_data}")
+
+    def rollback_prediction(self):
+        """Undoes the newest unconfirmed move and gives the turn back to its player."""
+        seq, player, kind, move, move_data = self.predictions.pop()
+
+        if kind == "edge":
+            (x1, y1, _), (x2, y2, _) = move
+            self.gameLogic.undo_move(((x1, y1), (x2, y2)), player)
+        else:
+            self.gameLogic.undo_conquer_move(move, player)
+
+        self.gameLogic.turn = player
+        self.is_my_turn = (self.player_color == player)
+        self.awaiting_server_ok = bool(self.predictions)
+        print(f"CLIENT: Rolled back move #{seq}: {move_data}")
+
     # -------------------------
     # UI loop
     # -------------------------
     def run(self):
         """Main Pygame UI loop. Starts network thread first."""
         self.start_connection_to_server()
+        self.analysis_worker.start()
 
         while self.running:
             self._process_incoming_events()
@@ -300,6 +375,7 @@ class ClientSideGame:
             self.clock.tick(Settings.FPS)
 
         self.network_alive = False
+        self.analysis_worker.stop()
         if self.net_thread:
             self.net_thread.join(timeout=1)
         if self.client_socket:
@@ -314,30 +390,112 @@ class ClientSideGame:
     # --------------------
     def update_hover_state(self):
         mouse_pos = pygame.mouse.get_pos()
+        snap = self.gameLogic.snapshot()
 
         self.hovered_edge = None
         self.hovered_point = None
         self.hovered_edge_is_valid = False
         self.hovered_point_is_valid = False
 
-        for dot in self.board.empty_dots:
+        for dot in snap.empty_dots:
             if is_mouse_on_point(mouse_pos, dot, self.to_pixel):
                 self.hovered_point = dot
-                self.hovered_point_is_valid = self.gameLogic.check_conquer_input(dot)
+                self.hovered_point_is_valid = self.hover_check(snap, "conquer", dot)
                 return
 
-        for edge in self.board.available_pairs:
+        for edge in snap.available_pairs:
             if is_mouse_on_edge(mouse_pos, edge, self.to_pixel):
                 self.hovered_edge = edge
-                self.hovered_edge_is_valid = self.gameLogic.check_edge_input(edge[0], edge[1])
+                self.hovered_edge_is_valid = self.hover_check(snap, "edge", edge)
                 break
 
+    def hover_check(self, snap, kind, move):
+        """
+        Legality of a hovered move: from the hover cache (prefetched or checked
+        earlier on this board), then the full analysis, then an inline check.
+        """
+        cache = self.current_hover_cache(snap.version)
+        candidate = (kind, move)
+        if candidate in cache:
+            return cache[candidate]
+
+        analysis = self.current_analysis(snap)
+        table = analysis and analysis["edges" if kind == "edge" else "dots"]
+        if table and move in table:
+            legal = table[move].legal
+        elif kind == "edge":
+            legal = self.gameLogic.check_edge_input(move[0], move[1])
+        else:
+            legal = self.gameLogic.check_conquer_input(move)
+
+        cache[candidate] = legal
+        return legal
+
+    def current_hover_cache(self, version):
+        """The hover cache for this board version and turn (reset when either changes)."""
+        key = (version, self.gameLogic.turn)
+        if self.hover_cache_key != key:
+            self.hover_cache = {}
+            self.hover_cache_key = key
+        return self.hover_cache
+
+    # --------------------
+    # Background analysis
+    # --------------------
+    def request_analysis(self):
+        """
+        Queue the current board for analysis from this player's point of view,
+        with the moves near the cursor and around the opponent's last move
+        prefetched first. Only on our turn: during the opponent's turn the
+        board is about to change with its UPDATE, which would make the result
+        stale before it is ever used.
+        """
+        if self.spectate or not self.player_color or not self.is_my_turn:
+            return
+        snap = self.board.snapshot(self.player_color)
+        self.analysis_worker.submit(snap, self.prefetch_candidates(snap))
+
+    def prefetch_candidates(self, snap):
+        """Available edges and empty dots closest to the cursor / last update."""
+        mx, my = pygame.mouse.get_pos()
+        targets = [(
+            (mx - Settings.MARGIN) / self.space_between_lines_x,
+            (my - Settings.MARGIN) / self.space_between_lines_y
+        )]
+        targets.extend(self.last_update_points)
+
+        def distance(x, y):
+            return min(abs(x - tx) + abs(y - ty) for tx, ty in targets)
+
+        scored = []
+        for edge in snap.available_pairs:
+            (x1, y1, _), (x2, y2, _) = edge
+            d = distance((x1 + x2) / 2, (y1 + y2) / 2)
+            if d <= Settings.PREFETCH_RADIUS:
+                scored.append((d, ("edge", edge)))
+        for dot in snap.empty_dots:
+            d = distance(*dot)
+            if d <= Settings.PREFETCH_RADIUS:
+                scored.append((d, ("conquer", dot)))
+
+        scored.sort()
+        return [candidate for _, candidate in scored[:Settings.PREFETCH_LIMIT]]
+
+    def current_analysis(self, snap):
+        """The latest analysis if it matches the given snapshot and current turn."""
+        analysis = self.analysis
+        if analysis and analysis["version"] == snap.version and analysis["turn"] == self.gameLogic.turn:
+            return analysis
+        return None
+
     def handle_events(self):
         for event in pygame.event.get():
             if event.type == pygame.QUIT:
                 self.running = False
             elif event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
                 self.running = False
+            elif event.type == pygame.KEYDOWN and event.key == pygame.K_h:
+                self.show_hint = not self.show_hint
             elif event.type == pygame.MOUSEBUTTONDOWN and event.button == 1 and self.is_my_turn:
                 if self.hovered_point and self.hovered_point_is_valid:
                     self.send_server_conquer_move(self.hovered_point)
@@ -361,12 +519,14 @@ class ClientSideGame:
                 p2 = (int(p2_str[0]), int(p2_str[1]))
 
                 self.gameLogic.make_move((p1, p2))
+                self.last_update_points = (p1, p2)
                 print(f"CLIENT: Applied server edge move: {p1}->{p2}")
                 return True
             else:
                 p_str = move_str.split(",")
                 p = (int(p_str[0]), int(p_str[1]))
                 self.gameLogic.make_conquer_move(p)
+                self.last_update_points = (p,)
                 print(f"CLIENT: Applied server conquer move: {p}")
                 return True
         except Exception as e:
@@ -390,23 +550,45 @@ class ClientSideGame:
                 print("Status:", payload)
                 if payload == "game_start_P1" or payload == "game_start_P2":
                     pygame.display.set_caption(f"{Settings.WINDOW_TITLE} - Player: {self.player_color}")
+                    self.request_analysis()
+                elif payload == "spectating":
+                    pygame.display.set_caption(f"{Settings.WINDOW_TITLE} - Spectator")
             elif etype == "apply_update":
                 move_str = payload
+                if self.predictions and self.predictions[0][4] == move_str:
+                    # the server accepted our predicted move: already on the board
+                    seq = self.predictions.popleft()[0]
+                    self.awaiting_server_ok = bool(self.predictions)
+                    print(f"CLIENT: Move #{seq} confirmed by server")
+                    continue
+
+                # anything else means our predictions diverged from the server: drop them
+                while self.predictions:
+                    self.rollback_prediction()
+
                 success = self._apply_server_update(move_str)
                 if success:
                     self.gameLogic.turn = self.gameLogic.next_turn()
                     self.is_my_turn = (self.player_color == self.gameLogic.turn)
                     self.awaiting_server_ok = False
+                    self.request_analysis()
                     print(f"CLIENT: Update applied. New turn: {self.gameLogic.turn}. My turn: {self.is_my_turn}")
                 else:
                     print(f"CLIENT: !! CRITICAL: Failed to apply server update '{move_str}'")
             elif etype == "not_ok":
-                self.awaiting_server_ok = False
                 print("Server: NOT OK (move rejected)")
+                if self.predictions:
+                    self.rollback_prediction()
+                    self.request_analysis()
+                self.awaiting_server_ok = bool(self.predictions)
             elif etype == "game_over":
                 payload = payload.strip()
                 if payload == "DISCONNECTED":
                     print("Game over: Opponent disconnected")
+                elif payload == "NO_GAME":
+                    print("No running game to watch")
+                elif self.spectate:
+                    print(f"Game over: {payload} won")
                 elif payload == self.player_color:
                     print(f"Game over: YOU WIN! ({payload})")
                 else:
@@ -415,6 +597,14 @@ class ClientSideGame:
             elif etype == "error":
                 print("Network error:", payload)
                 self.running = False
+            elif etype == "analysis":
+                self.analysis = payload
+            elif etype == "prefetch":
+                # ignore results for a board that has changed since
+                if (payload["version"], payload["turn"]) == (self.board.version, self.gameLogic.turn):
+                    cache = self.current_hover_cache(payload["version"])
+                    for candidate, check in payload["moves"].items():
+                        cache[candidate] = check.legal
             elif etype == "raw":
                 print("RAW from server:", payload)
             else:
@@ -434,8 +624,11 @@ class ClientSideGame:
     def draw(self):
         self.screen.fill(Settings.BG_COLOR)
 
+        # Render from an immutable snapshot (shared with the previous frame if unchanged)
+        snap = self.gameLogic.snapshot()
+
         # Draw existing bridges
-        for player, edges in self.board.players_pairs.items():
+        for player, edges in snap.players_pairs.items():
             for edge in edges:
                 color = Settings.PLAYERS_LINE_COLORS[player]
                 pygame.draw.line(
@@ -447,7 +640,7 @@ class ClientSideGame:
 
         # Draw available edges
         seen = set()
-        for edge in self.board.available_pairs:
+        for edge in snap.available_pairs:
             p1 = (edge[0][0], edge[0][1])
             p2 = (edge[1][0], edge[1][1])
             key = frozenset({p1, p2})
@@ -475,7 +668,7 @@ class ClientSideGame:
             pygame.draw.line(self.screen, color, p1_px, p2_px, Settings.LINE_WIDTH)
 
         # Draw empty points
-        for x, y, i in self.board.all_points:
+        for x, y, i in snap.all_points:
             color = Settings.BG_COLOR
             if i == -1:
                 if self.hovered_point == (x, y) and self.is_my_turn:
@@ -486,7 +679,7 @@ class ClientSideGame:
                 pygame.draw.circle(self.screen, color, self.to_pixel(x, y), Settings.EMPTY_POINT_RADIUS)
 
         # Draw conquered dots
-        for player, points in self.board.conquer_dots.items():
+        for player, points in snap.conquer_dots.items():
             for x, y in points:
                 pygame.draw.circle(
                     self.screen, Settings.POINT_COLOR[player],
@@ -495,7 +688,7 @@ class ClientSideGame:
                 )
 
         # Draw original player dots
-        for player, points in self.board.players_original_dots.items():
+        for player, points in snap.players_original_dots.items():
             for x, y, _ in points:
                 pygame.draw.circle(
                     self.screen, Settings.POINT_COLOR[player],
@@ -503,6 +696,20 @@ class ClientSideGame:
                     Settings.PLAYER_POINT_RADIUS
                 )
 
+        # Draw suggested move (toggled with H)
+        analysis = self.current_analysis(snap)
+        if self.show_hint and self.is_my_turn and analysis and analysis["suggestion"]:
+            kind, move = analysis["suggestion"]
+            if kind == "edge":
+                pygame.draw.line(
+                    self.screen, Settings.HINT_COLOR,
+                    self.to_pixel(move[0][0], move[0][1]),
+                    self.to_pixel(move[1][0], move[1][1]),
+                    Settings.LINE_WIDTH
+                )
+            else:
+                pygame.draw.circle(self.screen, Settings.HINT_COLOR, self.to_pixel(*move), Settings.EMPTY_POINT_RADIUS)
+
         # Draw status bar
         self.draw_status_bar()
 
@@ -512,6 +719,8 @@ class ClientSideGame:
         font = pygame.font.SysFont(None, 24)
 
         my_player_text = f"You are: {self.player_color}" if self.player_color else "Connecting..."
+        if self.spectate:
+            my_player_text = "Spectating"
         text1 = font.render(my_player_text, True, (255, 255, 255))
         self.screen.blit(text1, (10, 10))
 
@@ -527,6 +736,10 @@ class ClientSideGame:
             wait_text = font.render("Waiting for server...", True, (255, 255, 0))
             self.screen.blit(wait_text, (10, 70))
 
+        if self.show_hint:
+            hint_text = font.render("Hint on (H)", True, Settings.HINT_COLOR)
+            self.screen.blit(hint_text, (10, 90))
+
     def quit(self):
         pygame.quit()
 
@@ -67,19 +67,10 @@ class ClientSideGame:
         self.player_color = player_color
 
         # Initialize game logic
-        self.gameLogic = GameLogic(
-            9, 9,
-            {
-                Settings.PLAYER1: [(2, 2), (5, 4), (2, 6)],
-                Settings.PLAYER2: [(6, 2), (3, 4), (6, 6)]
-            }
-        )
+        self.gameLogic = GameLogic(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
 
         self.board = self.gameLogic.board_obj
 
-        # Fixed: ensure each (x, y) appears only once in empty_dots
-        self.board.empty_dots = list({(x, y) for x, y, _ in self.board.all_points})
-
         # Calculate spacing between lines based on window size
         self.space_between_lines_x = (
                 (Settings.WINDOW_WIDTH - 2 * Settings.MARGIN - Settings.LINE_WIDTH)
@@ -1,4 +1,106 @@
+from collections import deque
+from types import MappingProxyType
+
 from settings import Settings
+import graphAlgorithms
+import numpyReachability
+
+
+# -------------------------------------------------
+# INTERNED VERTICES AND EDGES
+# -------------------------------------------------
+class BoardGeometry:
+    """
+    The canonical vertex and edge tuples of one board size, built once and
+    shared by every Board of that size. Boards are built from these tuples
+    and the hot paths (conquer_dot, make_move, validation) look edges up here
+    instead of assembling fresh tuples, so an edge is allocated once per
+    board size and set lookups of it usually hit by identity.
+
+    It also defines the successor bitmasks Board keeps per vertex: bit 0 is
+    the dot's internal edge (in->out or out->in), bits 1-4 the out->in edges
+    to the left, right, upper and lower neighbour.
+    """
+
+    __slots__ = ("rows", "cols", "vertices", "internal_edges", "edge_pairs", "edge_bits", "neighbours")
+
+    sizes = {}  # (rows, cols) -> BoardGeometry
+
+    DIRECTIONS = [(-1, 0), (1, 0), (0, -1), (0, 1)]  # successor mask bits 1-4
+
+    def __init__(self, rows, cols):
+        self.rows = rows
+        self.cols = cols
+        self.vertices = {}  # (x, y) -> (in vertex, out vertex)
+        self.internal_edges = {}  # (x, y) -> (in->out edge, out->in edge)
+        self.edge_pairs = {}  # move -> (out1->in2 edge, out2->in1 edge), see edges_of
+        self.edge_bits = {}  # edge -> (source vertex, bit of the edge in the source's mask)
+        self.neighbours = {}  # vertex -> successors for each mask: neighbours[vertex][mask]
+
+        for x in range(cols):
+            for y in range(rows):
+                v_in, v_out = (x, y, -1), (x, y, 1)
+                self.vertices[(x, y)] = (v_in, v_out)
+                self.internal_edges[(x, y)] = ((v_in, v_out), (v_out, v_in))
+                self.edge_bits[(v_in, v_out)] = (v_in, 1)
+                self.edge_bits[(v_out, v_in)] = (v_out, 1)
+
+        # out->in edge between every two orthogonal neighbours, one tuple per edge
+        edges = {}
+        for (x, y), (v_in, v_out) in self.vertices.items():
+            targets = [v_in]  # successors of v_out, by mask bit
+            for bit, (dx, dy) in enumerate(self.DIRECTIONS, 1):
+                neighbour = self.vertices.get((x + dx, y + dy))
+                if neighbour is None:
+                    targets.append(None)
+                    continue
+                edge = edges[((x, y), (x + dx, y + dy))] = (v_out, neighbour[0])
+                self.edge_bits[edge] = (v_out, 1 << bit)
+                targets.append(neighbour[0])
+
+            self.neighbours[v_in] = ((), (v_out,))
+            self.neighbours[v_out] = tuple(
+                tuple(target for bit, target in enumerate(targets) if mask >> bit & 1 and target is not None)
+                for mask in range(1 << len(targets))
+            )
+
+        for (a, c), edge in edges.items():
+            pair = (edge, edges[(c, a)])
+            # keyed by the dots and by the directed edge, the two forms callers pass
+            self.edge_pairs[(a, c)] = pair
+            self.edge_pairs[edge] = pair
+
+    def masks(self, edges):
+        """{vertex: successor mask} of an edge set (edges outside the board's grid are left out)."""
+        masks = {}
+        for edge in edges:
+            slot = self.edge_bits.get(edge)
+            if slot is not None:
+                vertex, bit = slot
+                masks[vertex] = masks.get(vertex, 0) | bit
+        return masks
+
+    @classmethod
+    def of(cls, rows, cols):
+        geometry = cls.sizes.get((rows, cols))
+        if geometry is None:
+            geometry = cls.sizes[(rows, cols)] = cls(rows, cols)
+        return geometry
+
+    def edges_of(self, move):
+        """
+        Both directed edges of an edge move, given as ((x1, y1), (x2, y2)) or
+        as the out->in edge ((x1, y1, 1), (x2, y2, -1)). Moves between dots
+        that aren't orthogonal neighbours get new tuples.
+        """
+        pair = self.edge_pairs.get(move)
+        if pair is not None:
+            return pair
+        first_point, second_point = move
+        return (
+            ((first_point[0], first_point[1], 1), (second_point[0], second_point[1], -1)),
+            ((second_point[0], second_point[1], 1), (first_point[0], first_point[1], -1)),
+        )
 
 
 class Board:
@@ -10,36 +112,109 @@ class Board:
       - conquered and original dots for each player
     """
 
+    # Fully built starting boards, one per (rows, cols, layout); see __init__
+    templates = {}
+
     def __init__(self, rows, cols, players_original_dots):
+        """
+        Clones the starting position from a template Board that is built once
+        per (rows, cols, layout) and never mutated afterwards, so a new game
+        costs a handful of set/list copies instead of generating every edge.
+        """
         self.rows = rows
         self.cols = cols
+        self._grid = None  # see the board property
+
+        key = (rows, cols, tuple(sorted(
+            (player, tuple(sorted(tuple(dot) for dot in dots))) for player, dots in players_original_dots.items()
+        )))
+        template = Board.templates.get(key)
+        if template is None:
+            template = Board.templates[key] = Board._build_template(rows, cols, players_original_dots)
+        self.template = template
+        self.geometry = template.geometry
+
+        self.all_points = template.all_points.copy()
+        self.players_original_dots = {p: dots.copy() for p, dots in template.players_original_dots.items()}
+        self.empty_dots = template.empty_dots.copy()
+        self.conquer_dots = {p: dots.copy() for p, dots in template.conquer_dots.items()}
+        self.dot_owner = template.dot_owner.copy()
+        self.available_pairs = template.available_pairs.copy()
+        self.players_pairs = {p: edges.copy() for p, edges in template.players_pairs.items()}
+        self.incoming_edges = {p: counts.copy() for p, counts in template.incoming_edges.items()}
+        self.successors = {p: masks.copy() for p, masks in template.successors.items()}
+        self.available_successors = template.available_successors.copy()
+
+        # Same versions as the template, so its frozen components and snapshot are reused as is
+        self.version = template.version
+        self.component_versions = template.component_versions.copy()
+        self.frozen_components = template.frozen_components.copy()
+        self.last_snapshot = template.last_snapshot
+
+        # Incremental win detection and distance to win per player (synced lazily on first query)
+        self.connectivity = {
+            player: ConnectivityTracker(self, player) for player in [Settings.PLAYER1, Settings.PLAYER2]
+        }
+        self.distance_to_win = {
+            player: DistanceTracker(self, player) for player in [Settings.PLAYER1, Settings.PLAYER2]
+        }
 
-        # 2D visual representation of the board (for debugging / printing)
-        self.board = [["." for _ in range(cols)] for _ in range(rows)]
+    @classmethod
+    def _build_template(cls, rows, cols, players_original_dots):
+        """Builds a starting board the long way (every edge generated) and freezes it once."""
+        template = cls.__new__(cls)
+        template.rows = rows
+        template.cols = cols
+        template._grid = None
+        template.geometry = BoardGeometry.of(rows, cols)
+
+        # Change tracking for snapshot(): a global version plus one per component
+        template.version = 0
+        template.component_versions = {}
+        template.frozen_components = {}  # component -> (version, immutable copy)
+        template.last_snapshot = None
+
+        template._generate(players_original_dots)
+        template.snapshot()
+        return template
+
+    def _generate(self, players_original_dots):
+        rows, cols = self.rows, self.cols
+        vertices = self.geometry.vertices
 
         # All nodes (each with "in" and "out" states)
-        self.all_points = [(x, y, i) for x in range(cols) for y in range(rows) for i in [-1, 1]]
+        self.all_points = [v for x in range(cols) for y in range(rows) for v in vertices[(x, y)]]
 
         # Store original player starting positions (duplicated with in/out states)
         self.players_original_dots = {Settings.PLAYER1: [], Settings.PLAYER2: []}
         for player, dots in players_original_dots.items():
             for x, y in dots:
-                self.players_original_dots[player].append((x, y, -1))
-                self.players_original_dots[player].append((x, y, 1))
+                self.players_original_dots[player].extend(vertices[(x, y)])
 
-        # Initialize empty dots (unclaimed points)
-        self.empty_dots = [(x, y) for x, y, _ in self.all_points.copy()]
+        # Initialize empty dots (unclaimed points) and who conquered each of the others
+        self.empty_dots = set(self.geometry.vertices)
         self.conquer_dots = {Settings.PLAYER1: [], Settings.PLAYER2: []}
+        self.dot_owner = {}  # (x, y) -> player whose conquer_dots list holds it
         self.available_pairs = set()
 
         # Create default internal edges for all vertices (between in and out states)
-        default_edges = {
-            ((x, y, -1), (x, y, 1)) for x in range(cols) for y in range(rows)
-        }.union({
-            ((x, y, 1), (x, y, -1)) for x in range(cols) for y in range(rows)
-        })
+        default_edges = {edge for internal in self.geometry.internal_edges.values() for edge in internal}
         self.players_pairs = {player: default_edges.copy() for player in [Settings.PLAYER1, Settings.PLAYER2]}
 
+        # Number of each player's edges into every IN vertex, internal in<->out edges excluded
+        self.incoming_edges = {player: {} for player in [Settings.PLAYER1, Settings.PLAYER2]}
+
+        # Per-vertex successor bitmasks of every edge set (see BoardGeometry), kept in step with the sets
+        self.successors = {player: self.geometry.masks(edges) for player, edges in self.players_pairs.items()}
+
+        # conquer_dot reports to the trackers; the template's own are never synced
+        self.connectivity = {
+            player: ConnectivityTracker(self, player) for player in [Settings.PLAYER1, Settings.PLAYER2]
+        }
+        self.distance_to_win = {
+            player: DistanceTracker(self, player) for player in [Settings.PLAYER1, Settings.PLAYER2]
+        }
+
         # Remove internal edges that belong to conquered (initial) opponent dots
         for player in [Settings.PLAYER1, Settings.PLAYER2]:
             opponent = Settings.PLAYER1 if player == Settings.PLAYER2 else Settings.PLAYER2
@@ -47,30 +222,152 @@ class Board:
 
             for x, y in opponent_xy:
                 self.conquer_dot(opponent, (x, y))
-                for edge in [((x, y, -1), (x, y, 1)), ((x, y, 1), (x, y, -1))]:
+                for edge in self.geometry.internal_edges[(x, y)]:
                     if edge in self.players_pairs[player]:
                         self.players_pairs[player].remove(edge)
+                        self._unlink(self.successors[player], edge)
+
+        # All possible orthogonal edges (up, down, left, right), in both directions
+        for pair in self.geometry.edge_pairs.values():
+            self.available_pairs.update(pair)
+        self.available_successors = self.geometry.masks(self.available_pairs)
+
+    def reset(self):
+        """
+        Puts the board back to its starting position in place so another game
+        can reuse it (see boardPool.py). The containers themselves are kept and
+        refilled from the template (update() of an empty set copies the
+        template's hash table as is), so no new objects reach the GC.
+        """
+        template = self.template
+        self._grid = None
+
+        self.empty_dots.clear()
+        self.empty_dots.update(template.empty_dots)
+        for player, dots in self.conquer_dots.items():
+            dots[:] = template.conquer_dots[player]
+        self.dot_owner.clear()
+        self.dot_owner.update(template.dot_owner)
+        for player, counts in self.incoming_edges.items():
+            counts.clear()
+            counts.update(template.incoming_edges[player])
+        self.available_pairs.clear()
+        self.available_pairs.update(template.available_pairs)
+        for player, edges in self.players_pairs.items():
+            edges.clear()
+            edges.update(template.players_pairs[player])
+        for player, masks in self.successors.items():
+            masks.clear()
+            masks.update(template.successors[player])
+        self.available_successors.clear()
+        self.available_successors.update(template.available_successors)
+
+        # Versions keep increasing across games: the template's frozen components
+        # are reused under a new version, and the trackers resync on their next query
+        self.version += 1
+        self.component_versions = {component: self.version for component in template.frozen_components}
+        self.frozen_components = {
+            component: (self.version, frozen) for component, (_, frozen) in template.frozen_components.items()
+        }
+        self.last_snapshot = None
+        for tracker in self.connectivity.values():
+            tracker.invalidate()
+        for tracker in self.distance_to_win.values():
+            tracker.invalidate()
+
+    @property
+    def board(self):
+        """2D visual representation of the board (for debugging / printing), built on first use."""
+        if self._grid is None:
+            self._grid = [["." for _ in range(self.cols)] for _ in range(self.rows)]
+            for player, dots in self.players_original_dots.items():
+                for x, y, _ in dots:
+                    self._grid[y][x] = player
+        return self._grid
+
+    # --------------------------
+    # EDGE OWNERSHIP
+    # --------------------------
+
+    def add_edges(self, player, edges):
+        """Moves edges from the available pool to the player, keeping its ConnectivityTracker in sync."""
+        tracker = self.connectivity[player]
+        synced = tracker.is_synced()
+        opponent = Settings.PLAYER1 if player == Settings.PLAYER2 else Settings.PLAYER2
+        mine, theirs = self.distance_to_win[player], self.distance_to_win[opponent]
+        mine_synced, theirs_synced = mine.is_synced(), theirs.is_synced()
+
+        pairs = self.players_pairs[player]
+        incoming = self.incoming_edges[player]
+        added = [edge for edge in edges if edge not in pairs]
+        for edge in added:
+            pairs.add(edge)
+            self._link(self.successors[player], edge)
+            u, v = edge
+            if u[0] != v[0] or u[1] != v[1]:
+                incoming[v] = incoming.get(v, 0) + 1
+        changed = {("players_pairs", player)} if added else set()
+        taken = [edge for edge in edges if edge in self.available_pairs]
+        for edge in taken:
+            self.available_pairs.remove(edge)
+            self._unlink(self.available_successors, edge)
+        if taken:
+            changed.add("available_pairs")
+
+        # the trackers only hear about edges that really changed hands
+        self.mark_changed(*changed)
+        if synced:
+            tracker.edges_added(added)
+        if mine_synced:
+            mine.edges_cheaper(added, 0)
+        if theirs_synced:
+            theirs.edges_dearer(taken, 1)
+
+    def remove_edges(self, player, edges):
+        """Returns the player's edges to the available pool (undoing add_edges)."""
+        tracker = self.connectivity[player]
+        synced = tracker.is_synced()
+        opponent = Settings.PLAYER1 if player == Settings.PLAYER2 else Settings.PLAYER2
+        mine, theirs = self.distance_to_win[player], self.distance_to_win[opponent]
+        mine_synced, theirs_synced = mine.is_synced(), theirs.is_synced()
 
-        # Place player symbols on the visual board (for debugging)
-        for player, dots in self.players_original_dots.items():
-            for x, y, _ in dots:
-                self.board[y][x] = player
-
-        # Generate all possible orthogonal edge pairs (up, down, left, right)
-        for y in range(rows):
-            for x in range(cols):
-                p1_out = (x, y, 1)
-                p1_in = (x, y, -1)
-                neighbors = [
-                    (x - 1, y),  # left
-                    (x + 1, y),  # right
-                    (x, y - 1),  # up
-                    (x, y + 1),  # down
-                ]
-                for nx, ny in neighbors:
-                    if 0 <= nx < cols and 0 <= ny < rows:
-                        self.available_pairs.add((p1_out, (nx, ny, -1)))
-                        self.available_pairs.add(((nx, ny, 1), p1_in))
+        pairs = self.players_pairs[player]
+        incoming = self.incoming_edges[player]
+        removed = [edge for edge in edges if edge in pairs]
+        for edge in removed:
+            pairs.discard(edge)
+            self._unlink(self.successors[player], edge)
+            u, v = edge
+            if u[0] != v[0] or u[1] != v[1]:
+                incoming[v] -= 1
+        changed = {("players_pairs", player)} if removed else set()
+        returned = [edge for edge in edges if edge not in self.available_pairs]
+        for edge in returned:
+            self.available_pairs.add(edge)
+            self._link(self.available_successors, edge)
+        if returned:
+            changed.add("available_pairs")
+
+        self.mark_changed(*changed)
+        if synced:
+            tracker.edges_removed(removed)
+        if mine_synced:
+            mine.edges_dearer(removed, 0)
+        if theirs_synced:
+            theirs.edges_cheaper(returned, 1)
+
+    def _link(self, masks, edge):
+        """Sets the edge's bit in a successor mask dict (edges between non-neighbours have none)."""
+        slot = self.geometry.edge_bits.get(edge)
+        if slot is not None:
+            vertex, bit = slot
+            masks[vertex] = masks.get(vertex, 0) | bit
+
+    def _unlink(self, masks, edge):
+        slot = self.geometry.edge_bits.get(edge)
+        if slot is not None:
+            vertex, bit = slot
+            masks[vertex] = masks.get(vertex, 0) & ~bit
 
     # --------------------------
     # CONQUERING MECHANICS
@@ -85,17 +382,34 @@ class Board:
         """
         opponent = Settings.PLAYER1 if player == Settings.PLAYER2 else Settings.PLAYER2
         x, y = dot
+        tracker = self.connectivity[opponent]
+        synced = tracker.is_synced()
+        distance = self.distance_to_win[opponent]
+        distance_synced = distance.is_synced()
 
         # Remove the internal "in↔out" edges from the opponent
-        for edge in [((x, y, -1), (x, y, 1)), ((x, y, 1), (x, y, -1))]:
+        removed = []
+        for edge in self.geometry.internal_edges[(x, y)]:
             if edge in self.players_pairs[opponent]:
                 self.players_pairs[opponent].remove(edge)
+                self._unlink(self.successors[opponent], edge)
+                removed.append(edge)
 
         # Update conquered / empty sets
-        if dot not in self.conquer_dots[player]:
+        changed = [("players_pairs", opponent)] if removed else []
+        if self.dot_owner.get(dot) != player:
             self.conquer_dots[player].append(dot)
+            self.dot_owner[dot] = player
+            changed.append(("conquer_dots", player))
         if dot in self.empty_dots:
             self.empty_dots.remove(dot)
+            changed.append("empty_dots")
+
+        self.mark_changed(*changed)
+        if synced:
+            tracker.edges_removed(removed)
+        if distance_synced and removed:
+            distance.dot_lost(self.geometry.vertices[dot][0])
 
     def unconquer_dot(self, player, dot):
         """
@@ -106,16 +420,95 @@ class Board:
         """
         opponent = Settings.PLAYER1 if player == Settings.PLAYER2 else Settings.PLAYER2
         x, y = dot
+        tracker = self.connectivity[opponent]
+        synced = tracker.is_synced()
+        distance = self.distance_to_win[opponent]
+        distance_synced = distance.is_synced()
 
-        if dot in self.conquer_dots[player]:
+        changed = []
+        if self.dot_owner.get(dot) == player:
             self.conquer_dots[player].remove(dot)
+            changed.append(("conquer_dots", player))
+            if dot in self.conquer_dots[opponent]:
+                self.dot_owner[dot] = opponent  # undoing a conquer of a dot the opponent already held
+            else:
+                del self.dot_owner[dot]
+                self.empty_dots.add(dot)
+                changed.append("empty_dots")
 
-        if dot not in self.empty_dots:
-            self.empty_dots.append(dot)
-
-        restored_edges = [((x, y, -1), (x, y, 1)), ((x, y, 1), (x, y, -1))]
-        for edge in restored_edges:
+        restored = [edge for edge in self.geometry.internal_edges[(x, y)] if edge not in self.players_pairs[opponent]]
+        for edge in restored:
             self.players_pairs[opponent].add(edge)
+            self._link(self.successors[opponent], edge)
+        if restored:
+            changed.append(("players_pairs", opponent))
+
+        self.mark_changed(*changed)
+        if synced:
+            tracker.edges_added(restored)
+        if distance_synced and restored:
+            distance.dot_restored(self.geometry.vertices[dot][0])
+
+    # --------------------------
+    # SNAPSHOTS
+    # --------------------------
+
+    def mark_changed(self, *components):
+        """
+        Must be called after mutating a component, e.g. ("players_pairs", player),
+        "available_pairs", ("conquer_dots", player) or "empty_dots". Only pass
+        the components that really changed: snapshot() freezes each marked one
+        again, while the others are shared with the previous snapshot.
+        """
+        self.version += 1
+        for component in components:
+            self.component_versions[component] = self.version
+
+    def snapshot(self, turn=None):
+        """
+        Returns an immutable BoardSnapshot of the current state.
+
+        Components that didn't change since the previous snapshot are shared
+        with it rather than copied, and an unchanged board returns the previous
+        snapshot itself. Call it from the thread that mutates the board; the
+        returned snapshot can then be read from any thread without locks.
+        """
+        last = self.last_snapshot
+        if last is not None and last.version == self.version and last.turn == turn:
+            return last
+
+        players = [Settings.PLAYER1, Settings.PLAYER2]
+        snap = BoardSnapshot(
+            rows=self.rows,
+            cols=self.cols,
+            version=self.version,
+            turn=turn,
+            all_points=self._frozen("all_points", tuple, self.all_points),
+            players_original_dots=MappingProxyType({
+                p: self._frozen(("players_original_dots", p), tuple, self.players_original_dots[p])
+                for p in players
+            }),
+            players_pairs=MappingProxyType({
+                p: self._frozen(("players_pairs", p), frozenset, self.players_pairs[p]) for p in players
+            }),
+            available_pairs=self._frozen("available_pairs", frozenset, self.available_pairs),
+            conquer_dots=MappingProxyType({
+                p: self._frozen(("conquer_dots", p), tuple, self.conquer_dots[p]) for p in players
+            }),
+            empty_dots=self._frozen("empty_dots", frozenset, self.empty_dots),
+        )
+        self.last_snapshot = snap
+        return snap
+
+    def _frozen(self, component, freeze, value):
+        """Immutable copy of a component, rebuilt only when its version changed."""
+        version = self.component_versions.get(component, 0)
+        cached = self.frozen_components.get(component)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        frozen = freeze(value)
+        self.frozen_components[component] = (version, frozen)
+        return frozen
 
     # --------------------------
     # DEBUG PRINTING
@@ -152,6 +545,498 @@ class Board:
         print("\n====================\n")
 
 
+# -------------------------------------------------
+# IMMUTABLE BOARD SNAPSHOT
+# -------------------------------------------------
+class BoardSnapshot:
+    """
+    Read-only view of a Board at one version, produced by Board.snapshot().
+    Same attribute names as Board (players_pairs, available_pairs, ...), but
+    every collection is immutable and shared between snapshots while unchanged,
+    so renderers and worker threads can read it without locks or copies.
+    """
+
+    __slots__ = ("rows", "cols", "version", "turn", "all_points", "players_original_dots",
+                 "players_pairs", "available_pairs", "conquer_dots", "empty_dots")
+
+    def __init__(self, **fields):
+        for name in self.__slots__:
+            object.__setattr__(self, name, fields[name])
+
+    def __setattr__(self, name, value):
+        raise AttributeError("BoardSnapshot is immutable")
+
+
+# -------------------------------------------------
+# INCREMENTAL WIN DETECTION
+# -------------------------------------------------
+class ConnectivityTracker:
+    """
+    Answers "does every OUT of the player's original dots reach every IN"
+    without a graph search.
+
+    Edges always come in both directions and a dot's in/out vertices are
+    joined by its internal edges unless it was conquered, so the player's
+    strongly connected components are the groups of live (unconquered) dots
+    linked by its edges; the player has won once all of its original dots
+    are in one group.
+
+    The Board reports every change to the player's edges:
+      - additions (moves, unconquer) only merge groups: union-find, near O(1)
+      - removals (conquer, undo) only split the group they touch: that one
+        group is taken out of the forest and relinked from its own dots
+    Code that changes the player's edges without going through these Board
+    methods must call Board.mark_changed(("players_pairs", player)), which
+    bumps the component version: the forest is then rebuilt from scratch on
+    the next query. A direct set mutation alone goes unnoticed.
+    """
+
+    def __init__(self, board, player):
+        self.board = board
+        self.player = player
+        self.components = None  # UnionFind over live dots
+        self.links = {}  # dot -> {linked dot: number of player edges between them}
+        self.original_dots = ()  # the player's original (x, y) dots, refreshed on rebuild
+        self.synced_version = None  # version of ("players_pairs", player) the forest reflects
+
+    def invalidate(self):
+        """Forgets the forest; the next query rebuilds it."""
+        self.components = None
+        self.links = {}
+        self.synced_version = None
+
+    def board_version(self):
+        return self.board.component_versions.get(("players_pairs", self.player), 0)
+
+    def is_synced(self):
+        return self.synced_version == self.board_version()
+
+    def rebuild(self):
+        self.components = graphAlgorithms.UnionFind()
+        self.links = {}
+        self.original_dots = {(x, y) for x, y, _ in self.board.players_original_dots[self.player]}
+        self._add(self.board.players_pairs[self.player])
+        self.synced_version = self.board_version()
+
+    # --------------------------
+    # UPDATES (called by Board right after the change)
+    # --------------------------
+
+    def edges_added(self, edges):
+        self._add(edges)
+        self.synced_version = self.board_version()
+
+    def edges_removed(self, edges):
+        forest = self.components
+        parent = forest.parent
+        touched = set()  # one dot of every group that may have split
+        dead = set()
+
+        for u, v in edges:
+            a, c = (u[0], u[1]), (v[0], v[1])
+            if a == c:
+                if u[2] == -1 and a in parent:  # in->out edge gone: the dot can't be passed through
+                    dead.add(a)
+                    touched.add(a)
+                continue
+            links_a = self.links.get(a)
+            if links_a and c in links_a:
+                self._unlink(a, c)
+                if a in parent and c in parent:
+                    touched.add(a)
+
+        roots = {forest.find(dot) for dot in touched}
+        for root in roots:
+            self._relink([dot for dot in forest.discard_set(root) if dot not in dead])
+        self.synced_version = self.board_version()
+
+    def _add(self, edges):
+        forest = self.components
+        parent = forest.parent
+        for u, v in edges:
+            a, c = (u[0], u[1]), (v[0], v[1])
+            if a == c:
+                if u[2] == -1 and a not in parent:  # dot becomes passable: join its live neighbours
+                    self._relink([a])
+                continue
+            links_a = self.links.setdefault(a, {})
+            links_a[c] = links_a.get(c, 0) + 1
+            links_c = self.links.setdefault(c, {})
+            links_c[a] = links_c.get(a, 0) + 1
+            if a in parent and c in parent:
+                forest.union(a, c)
+
+    def _unlink(self, a, c):
+        for x, y in ((a, c), (c, a)):
+            links = self.links[x]
+            links[y] -= 1
+            if not links[y]:
+                del links[y]
+
+    def _relink(self, dots):
+        """Adds live dots to the forest and unions them with their live linked neighbours."""
+        forest = self.components
+        for dot in dots:
+            forest.add(dot)
+        for dot in dots:
+            for nbr in self.links.get(dot, ()):
+                if nbr in forest.parent:
+                    forest.union(dot, nbr)
+
+    # --------------------------
+    # QUERIES
+    # --------------------------
+
+    def connected(self):
+        """True if all of the player's original dots are in one strongly connected component."""
+        return self.connected_with()
+
+    def connected_with(self, *new_links):
+        """
+        Like connected(), as if the player also owned the edges between the
+        given dot pairs ((x1, y1), (x2, y2)) - answers "does this move win"
+        without playing it.
+        """
+        if not self.is_synced():
+            self.rebuild()
+
+        forest = self.components
+        dots = self.original_dots
+        if any(dot not in forest.parent for dot in dots):
+            # an original dot lost its internal edges (not possible through the game rules):
+            # the component argument no longer applies, ask the graph directly
+            edges = set(self.board.players_pairs[self.player])
+            for (x1, y1), (x2, y2) in new_links:
+                edges.add(((x1, y1, 1), (x2, y2, -1)))
+                edges.add(((x2, y2, 1), (x1, y1, -1)))
+            return graphAlgorithms.all_outs_reach_all_ins(edges, self.board.players_original_dots[self.player])
+
+        roots = {forest.find(dot) for dot in dots}
+        if len(roots) <= 1:
+            return True
+
+        # merge the roots the new links would join (tiny union-find over roots)
+        merged = {root: root for root in roots}
+
+        def top(root):
+            while merged[root] != root:
+                root = merged[root]
+            return root
+
+        for a, c in new_links:
+            if a in forest.parent and c in forest.parent:
+                ra, rc = forest.find(a), forest.find(c)
+                merged.setdefault(ra, ra)
+                merged.setdefault(rc, rc)
+                merged[top(ra)] = top(rc)
+        return len({top(root) for root in roots}) == 1
+
+
+# -------------------------------------------------
+# DISTANCE TO WIN
+# -------------------------------------------------
+class DistanceTracker:
+    """
+    How many more edges the player needs to connect all of its original
+    dots: the cheapest tree joining them over its live dots, where its own
+    edges cost 0 and available edges 1 (the opponent's edges and the dots
+    conquered from the player can't be used). 0 means the player has won;
+    None that some original dot can no longer be reached.
+
+    Keeps one distance map per original dot ({IN vertex of a live dot: cost
+    from that original dot}, a 0-1 BFS over the Board's successor masks).
+    With three original dots the tree is exact: three shortest paths meeting
+    at the dot minimising their sum. With more it is the minimum spanning
+    tree over the pairwise distances, at most twice the optimum.
+
+    The Board reports every change to the player's edges or to the available
+    edges, and only the affected maps are updated:
+      - cheaper edges (a move, undoing the opponent's move, a dot given back)
+        only lower distances: they are propagated from the changed edge
+      - dearer edges (the opponent's move, undo, a conquered dot) only
+        matter if some shortest path used them; then just the vertices left
+        without an equally short path are recomputed (see _repair)
+    Like ConnectivityTracker, it only notices changes made behind the
+    Board's back through Board.mark_changed; it is then rebuilt on the next
+    query.
+    """
+
+    def __init__(self, board, player):
+        self.board = board
+        self.player = player
+        self.terminals = ()  # IN vertices of the player's original dots
+        self.maps = []  # per terminal: {IN vertex: distance}
+        self.synced_version = None  # (players_pairs, available_pairs) versions the maps reflect
+        self.value = None
+        self.value_stale = True
+
+    def invalidate(self):
+        """Forgets the maps; the next query rebuilds them."""
+        self.maps = []
+        self.synced_version = None
+        self.value_stale = True
+
+    def board_version(self):
+        versions = self.board.component_versions
+        return versions.get(("players_pairs", self.player), 0), versions.get("available_pairs", 0)
+
+    def is_synced(self):
+        return self.synced_version == self.board_version()
+
+    def rebuild(self):
+        self.terminals = [v for v in self.board.players_original_dots[self.player] if v[2] == -1]
+        self.maps = [self._search(terminal) for terminal in self.terminals]
+        self.synced_version = self.board_version()
+        self.value_stale = True
+
+    # --------------------------
+    # UPDATES (called by Board right after the change)
+    # --------------------------
+
+    def edges_cheaper(self, edges, cost):
+        """The edges (out->in between two dots) now cost `cost` for the player."""
+        own = self.board.successors[self.player]
+        neighbours = self.board.geometry.neighbours
+        for distance in self.maps:
+            seeds = []
+            for u, v in edges:
+                u_in = neighbours[u][1][0]
+                d = distance.get(u_in)
+                if d is not None and own.get(v, 0) & 1 and distance.get(v, d + cost + 1) > d + cost:
+                    distance[v] = d + cost
+                    seeds.append(v)
+            if seeds:
+                self._relax(distance, seeds)
+                self.value_stale = True
+        self.synced_version = self.board_version()
+
+    def edges_dearer(self, edges, old_cost):
+        """The edges used to cost old_cost and now cost more (or can't be used)."""
+        neighbours = self.board.geometry.neighbours
+        for i, distance in enumerate(self.maps):
+            roots = []
+            for u, v in edges:
+                d = distance.get(neighbours[u][1][0])
+                if d is not None and distance.get(v) == d + old_cost:
+                    roots.append(v)  # a shortest path may have used the edge
+            if roots:
+                self._repair(i, roots)
+        self.synced_version = self.board_version()
+
+    def dot_lost(self, v_in):
+        """The player's internal edges at the dot are gone: it can't be passed through."""
+        for i, distance in enumerate(self.maps):
+            d = distance.pop(v_in, None)
+            if d is None:
+                continue
+            if v_in == self.terminals[i]:
+                self.maps[i] = {}  # the original dot itself (not possible through the game rules)
+            else:
+                self._repair(i, [nbr for nbr, cost in self._edges_from(v_in) if distance.get(nbr) == d + cost])
+            self.value_stale = True
+        self.synced_version = self.board_version()
+
+    def dot_restored(self, v_in):
+        """The player's internal edges at the dot are back."""
+        for i, distance in enumerate(self.maps):
+            if v_in in distance:
+                continue  # it never lost them
+            if v_in == self.terminals[i]:
+                self.maps[i] = self._search(v_in)
+                self.value_stale = True
+            elif self._settle(distance, v_in):
+                self._relax(distance, [v_in])
+                self.value_stale = True
+        self.synced_version = self.board_version()
+
+    # --------------------------
+    # 0-1 BFS
+    # --------------------------
+
+    def _search(self, terminal):
+        if not self.board.successors[self.player].get(terminal, 0) & 1:
+            return {}  # the original dot itself was conquered (not possible through the game rules)
+        distance = {terminal: 0}
+        self._relax(distance, [terminal])
+        return distance
+
+    def _edges_from(self, v_in):
+        """(IN vertex of a live neighbour, cost) for every usable edge out of the dot."""
+        own = self.board.successors[self.player]
+        available = self.board.available_successors
+        neighbours = self.board.geometry.neighbours
+        v_out = neighbours[v_in][1][0]
+        edges = [(nbr, 0) for nbr in neighbours[v_out][own.get(v_out, 0) & ~1] if own.get(nbr, 0) & 1]
+        edges += [(nbr, 1) for nbr in neighbours[v_out][available.get(v_out, 0)] if own.get(nbr, 0) & 1]
+        return edges
+
+    def _settle(self, distance, v_in):
+        """
+        Gives the dot the best distance offered by its neighbours in the map
+        (edges come in mirrored pairs, so its successors are its predecessors).
+        False if none of them is in the map.
+        """
+        best = None
+        for nbr, cost in self._edges_from(v_in):
+            d = distance.get(nbr)
+            if d is not None and (best is None or d + cost < best):
+                best = d + cost
+        if best is None:
+            return False
+        distance[v_in] = best
+        return True
+
+    def _repair(self, i, roots):
+        """
+        The roots' distances in map i may have gone up (an edge into them got
+        dearer, or a dot they were reached from died). Finds the vertices
+        that really lost their distance, level by level from the lowest:
+        0-cost edges come in mirrored pairs, so a level splits into groups
+        joined by the player's own edges, and a group keeps its distance if
+        any member still has a cost-1 edge from a kept vertex one level
+        lower (or is the original dot). The other groups are forgotten, their
+        successors one level up become candidates, and their distances are
+        recomputed from the neighbours that kept theirs.
+        """
+        own = self.board.successors[self.player]
+        available = self.board.available_successors
+        neighbours = self.board.geometry.neighbours
+        distance = self.maps[i]
+        terminal = self.terminals[i]
+        levels = {}  # distance -> candidates
+        for node in roots:
+            levels.setdefault(distance[node], set()).add(node)
+
+        affected = set()
+        while levels:
+            d = min(levels)
+            pending = levels.pop(d)
+            while pending:
+                group = [pending.pop()]
+                seen = set(group)
+                supported = False
+                for node in group:  # grows while iterating: a BFS over the group
+                    if node == terminal:
+                        supported = True
+                        break
+                    v_out = neighbours[node][1][0]
+                    for nbr in neighbours[v_out][own.get(v_out, 0) & ~1]:
+                        if nbr not in seen and distance.get(nbr) == d:
+                            seen.add(nbr)
+                            group.append(nbr)
+                    for nbr in neighbours[v_out][available.get(v_out, 0)]:
+                        if distance.get(nbr) == d - 1 and nbr not in affected:
+                            supported = True
+                            break
+                    if supported:
+                        break
+                pending -= seen
+                if supported:
+                    continue
+                affected.update(group)
+                for node in group:
+                    v_out = neighbours[node][1][0]
+                    for nbr in neighbours[v_out][available.get(v_out, 0)]:
+                        if distance.get(nbr) == d + 1:
+                            levels.setdefault(d + 1, set()).add(nbr)
+
+        if not affected:
+            return
+        for node in affected:
+            del distance[node]
+        seeds = [node for node in affected if self._settle(distance, node)]
+        self._relax(distance, seeds)
+        self.value_stale = True
+
+    def _relax(self, distance, seeds):
+        """Lowers distances along the player's graph from the seeds (whose distances are set)."""
+        own = self.board.successors[self.player]
+        available = self.board.available_successors
+        neighbours = self.board.geometry.neighbours
+        queue = deque(sorted(seeds, key=distance.__getitem__))
+        while queue:
+            node = queue.popleft()
+            d = distance[node]
+            v_out = neighbours[node][1][0]
+            for nbr in neighbours[v_out][own.get(v_out, 0) & ~1]:
+                if own.get(nbr, 0) & 1 and distance.get(nbr, d + 1) > d:
+                    distance[nbr] = d
+                    queue.appendleft(nbr)
+            d += 1
+            for nbr in neighbours[v_out][available.get(v_out, 0)]:
+                if own.get(nbr, 0) & 1 and distance.get(nbr, d + 1) > d:
+                    distance[nbr] = d
+                    queue.append(nbr)
+
+    # --------------------------
+    # QUERIES
+    # --------------------------
+
+    def distance(self):
+        """Edges the player still has to take to win (see the class docstring), or None."""
+        if not self.is_synced():
+            self.rebuild()
+        if self.value_stale:
+            self.value = self._tree_cost()
+            self.value_stale = False
+        return self.value
+
+    def _tree_cost(self):
+        maps, terminals = self.maps, self.terminals
+        if len(terminals) <= 1:
+            return 0
+        if any(terminal not in distance for distance in maps for terminal in terminals):
+            return None
+
+        if len(terminals) == 3:
+            first, second, third = sorted(maps, key=len)
+            best = None
+            for node, d in first.items():
+                d2 = second.get(node)
+                if d2 is not None:
+                    d3 = third.get(node)
+                    if d3 is not None and (best is None or d + d2 + d3 < best):
+                        best = d + d2 + d3
+            return best
+
+        # Prim over the pairwise distances (exact for two terminals)
+        total = 0
+        cheapest = {terminal: maps[0][terminal] for terminal in terminals[1:]}
+        while cheapest:
+            terminal = min(cheapest, key=cheapest.get)
+            total += cheapest.pop(terminal)
+            distance = maps[terminals.index(terminal)]
+            for other in cheapest:
+                cheapest[other] = min(cheapest[other], distance[other])
+        return total
+
+
+# -------------------------------------------------
+# MOVE VALIDATION RESULT
+# -------------------------------------------------
+class MoveCheck:
+    """
+    Structured result of validating a move for the current player:
+      - legal:  the move may be played
+      - wins:   playing it completes the mover's connectivity
+      - blocks: it would completely block the opponent
+    """
+
+    def __init__(self, legal, wins=False, blocks=False):
+        self.legal = legal
+        self.wins = wins
+        self.blocks = blocks
+
+    def __bool__(self):
+        return self.legal
+
+    def __repr__(self):
+        return f"MoveCheck(legal={self.legal}, wins={self.wins}, blocks={self.blocks})"
+
+
+ILLEGAL_MOVE = MoveCheck(False)
+
+
 # -------------------------------------------------
 # GAME LOGIC: RULE ENFORCEMENT & TURN MANAGEMENT
 # -------------------------------------------------
@@ -168,6 +1053,15 @@ class GameLogic:
         """Returns the next player's ID."""
         return Settings.PLAYER2 if self.turn == Settings.PLAYER1 else Settings.PLAYER1
 
+    def reset(self):
+        """Back to the starting position with P1 to move (see Board.reset)."""
+        self.board_obj.reset()
+        self.turn = Settings.PLAYER1
+
+    def snapshot(self):
+        """Immutable snapshot of the board, tagged with whose turn it is."""
+        return self.board_obj.snapshot(self.turn)
+
     # --------------------------
     # GRAPH CONNECTIVITY CHECKS
     # --------------------------
@@ -176,135 +1070,309 @@ class GameLogic:
         """
         Checks strong connectivity for the player's subgraph.
         Every OUT node must be able to reach all IN nodes.
-        Uses BFS on the entire graph (V, E).
+        Uses the early-exit BFS of graphAlgorithms; large boards go through
+        the vectorized NumPy kernel when it is available.
         """
-        adj = {v: [] for v in V}
-        for u, v in E:
-            adj.setdefault(u, []).append(v)
-
-        outs = [v for v in S if v[2] == 1]
-        ins = [v for v in S if v[2] == -1]
-
-        if not ins:
-            return True
-        if not outs:
-            return False
+        if numpyReachability.use_kernel(len(V)):
+            b = self.board_obj
+            return numpyReachability.all_outs_reach_all_ins(E, S, b.cols, b.rows)
 
-        for out_v in outs:
-            visited = set()
-            queue = [out_v]
+        return graphAlgorithms.all_outs_reach_all_ins(E, S)
 
-            while queue:
-                node = queue.pop(0)
-                if node not in visited:
-                    visited.add(node)
-                    for nbr in adj.get(node, []):
-                        if nbr not in visited:
-                            queue.append(nbr)
+    def opponent_reaches_without(self, removed):
+        """
+        check_all_outs_reach_all_ins for the player not to move, over its
+        edges plus the available ones minus the `removed` edges (both
+        directions of an edge move, or a dot's internal edges). Walks the
+        Board's successor masks, so neither that edge set nor an adjacency
+        is built. No NumPy kernel here: building its arrays from the edge
+        sets costs more than this walk (measured up to 64x64).
+        """
+        b = self.board_obj
+        n_turn = self.next_turn()
 
-            if not all(in_v in visited for in_v in ins):
-                return False
+        # Edges between dots always come in mirrored pairs (see check_moves), so
+        # while every original dot keeps its internal edges (bit 0) reachability
+        # between them is symmetric and one BFS settles the query
+        masks = b.successors[n_turn]
+        removed = b.geometry.masks(removed)
+        original_dots = b.players_original_dots[n_turn]
+        symmetric = all(masks.get(v, 0) & ~removed.get(v, 0) & 1 for v in original_dots)
 
-        return True
+        return graphAlgorithms.all_outs_reach_all_ins_masked(
+            (masks, b.available_successors),
+            b.geometry.neighbours,
+            original_dots,
+            removed,
+            symmetric
+        )
 
     # --------------------------
     # WIN CONDITION
     # --------------------------
 
     def check_win(self):
-        """Checks if any player has achieved full connectivity."""
+        """
+        Checks if any player has achieved full connectivity.
+        A union-find query per player (see ConnectivityTracker).
+        """
         b = self.board_obj
-        if self.check_all_outs_reach_all_ins(b.all_points, b.players_pairs[Settings.PLAYER1],
-                                             b.players_original_dots[Settings.PLAYER1]):
+        if b.connectivity[Settings.PLAYER1].connected():
             return Settings.PLAYER1
-        if self.check_all_outs_reach_all_ins(b.all_points, b.players_pairs[Settings.PLAYER2],
-                                             b.players_original_dots[Settings.PLAYER2]):
+        if b.connectivity[Settings.PLAYER2].connected():
             return Settings.PLAYER2
         return None
 
+    def distance_to_win(self, player):
+        """
+        Edges the player still has to take to connect its original dots
+        (0: it has won, None: it no longer can). See DistanceTracker.
+        """
+        return self.board_obj.distance_to_win[player].distance()
+
     # --------------------------
     # CONQUER RULE VALIDATION
     # --------------------------
 
     def check_conquer_input(self, dot):
+        """Returns True if the current player may conquer the dot."""
+        return self.validate_conquer(dot).legal
+
+    def validate_conquer(self, dot):
         """
         Determines if a dot can be legally conquered by the current player:
           1. Dot must be within bounds.
           2. Dot must not already be conquered.
           3. Player must have ≥2 edges connected to this dot.
           4. Conquering must not completely block the opponent.
+        Conquering only removes opponent edges, so it never wins by itself.
         """
         x, y = dot
         b = self.board_obj
 
         if not (0 <= x < b.cols and 0 <= y < b.rows):
-            return False
+            return ILLEGAL_MOVE
 
-        if (x, y) in b.conquer_dots[Settings.PLAYER1] + b.conquer_dots[Settings.PLAYER2]:
-            return False
-
-        # Must be connected by at least two of the player's edges
-        connected_edges = [e for e in b.players_pairs[self.turn] if (x, y, -1) in e]
-        for internal in [((x, y, 1), (x, y, -1)), ((x, y, -1), (x, y, 1))]:
-            if internal in connected_edges:
-                connected_edges.remove(internal)
+        if (x, y) in b.dot_owner:
+            return ILLEGAL_MOVE
 
-        if len(connected_edges) < 2:
-            return False
+        # Must be connected by at least two of the player's edges (all of them lead into the IN vertex)
+        v_in = b.geometry.vertices[(x, y)][0]
+        if b.incoming_edges[self.turn].get(v_in, 0) < 2:
+            return ILLEGAL_MOVE
 
-        # Check blocking rule (simulate conquer, then undo)
-        n_turn = self.next_turn()
-        b.conquer_dot(self.turn, (x, y))
-        if not self.check_all_outs_reach_all_ins(
-                b.all_points,
-                b.players_pairs[n_turn].union(b.available_pairs),
-                b.players_original_dots[n_turn]
-        ):
-            b.unconquer_dot(self.turn, (x, y))
-            return False
+        # Check blocking rule: conquering removes the opponent's internal edges
+        # (simulated by masking them out, so readers never see a half-done conquer)
+        if not self.opponent_reaches_without(b.geometry.internal_edges[(x, y)]):
+            return MoveCheck(False, blocks=True)
 
-        b.unconquer_dot(self.turn, (x, y))
-        return True
+        return MoveCheck(True)
 
     # --------------------------
     # EDGE RULE VALIDATION
     # --------------------------
 
     def check_edge_input(self, point1, point2):
+        """Returns True if the current player may take the edge."""
+        return self.validate_edge(point1, point2).legal
+
+    def validate_edge(self, point1, point2):
         """
         Determines if an edge between two nodes is a legal move:
           - Must be inside bounds.
           - Must exist in available pairs.
           - Must not fully block opponent (unless it wins).
+        The result also tells whether the move wins, so callers don't need
+        to rerun check_win after playing it.
         """
         x1, y1, _ = point1
         x2, y2, _ = point2
         b = self.board_obj
 
         if not (0 <= x1 < b.cols and 0 <= y1 < b.rows and 0 <= x2 < b.cols and 0 <= y2 < b.rows):
-            return False
+            return ILLEGAL_MOVE
 
-        if ((x1, y1, 1), (x2, y2, -1)) not in b.available_pairs and (
-        (x2, y2, 1), (x1, y1, -1)) not in b.available_pairs:
-            return False
+        dots = ((x1, y1), (x2, y2))
+        new_edges = b.geometry.edge_pairs.get(dots)
+        if new_edges is None or (new_edges[0] not in b.available_pairs and new_edges[1] not in b.available_pairs):
+            return ILLEGAL_MOVE
 
-        # Allow if it creates immediate win
-        new_edges = {((x1, y1, 1), (x2, y2, -1)), ((x2, y2, 1), (x1, y1, -1))}
-        if self.check_all_outs_reach_all_ins(
-                b.all_points, b.players_pairs[self.turn].union(new_edges), b.players_original_dots[self.turn]
-        ):
-            return True
+        # Allow if it creates immediate win (a union-find query, see ConnectivityTracker)
+        if b.connectivity[self.turn].connected_with(dots):
+            return MoveCheck(True, wins=True)
 
         # Otherwise, reject if it completely blocks the opponent
-        n_turn = self.next_turn()
-        other_edges = (
-            b.available_pairs.difference(new_edges)
-        ).union(b.players_pairs[n_turn])
+        if not self.opponent_reaches_without(new_edges):
+            return MoveCheck(False, blocks=True)
 
-        if not self.check_all_outs_reach_all_ins(b.all_points, other_edges, b.players_original_dots[n_turn]):
-            return False
+        return MoveCheck(True)
 
-        return True
+    # --------------------------
+    # BATCH VALIDATION
+    # --------------------------
+
+    def check_moves(self, candidates, snapshot=None):
+        """
+        Validates many candidate moves for the current player in one pass.
+        candidates: list of ("edge", (point1, point2)) / ("conquer", (x, y)),
+        the same tuples the client queues for the server.
+        Returns a list of MoveCheck in the same order (same answers as
+        validate_edge / validate_conquer).
+
+        Every move adds or removes edges in in/out pairs, so reachability
+        between dots is symmetric and the question reduces to an undirected
+        graph of dots. Both players' dot graphs are built once:
+          - mover wins   <=> the new edge joins the last two components
+                             holding the mover's original dots
+          - move blocks  <=> the removed edge is a bridge (or the conquered
+                             dot an articulation point) of the opponent's
+                             graph that separates its original dots
+        so after one linear pass each candidate costs O(1).
+
+        Works on an immutable BoardSnapshot (taken now unless one is passed, in
+        which case its turn is used), so a worker thread can validate against a
+        snapshot handed over by the UI thread while the UI keeps playing.
+        """
+        b = snapshot if snapshot is not None else self.snapshot()
+        turn = b.turn if b.turn is not None else self.turn
+        n_turn = Settings.PLAYER2 if turn == Settings.PLAYER1 else Settings.PLAYER1
+
+        mover_edges = b.players_pairs[turn]
+        opponent_edges = b.players_pairs[n_turn]
+        available = b.available_pairs
+        conquered = set(b.conquer_dots[Settings.PLAYER1]) | set(b.conquer_dots[Settings.PLAYER2])
+        mover_dots = {(x, y) for x, y, _ in b.players_original_dots[turn]}
+        opponent_dots = {(x, y) for x, y, _ in b.players_original_dots[n_turn]}
+
+        # Mover: component label of every dot it can pass through
+        mover_graph = self._dot_graph(mover_edges)
+        component = graphAlgorithms.connected_components(mover_graph)
+        mover_components = {component.get(dot) for dot in mover_dots}
+        mover_wins_now = len(mover_components) == 1 and None not in mover_components
+
+        # Opponent: bridges / articulation points separating its original dots
+        opponent_graph = self._dot_graph(opponent_edges | available)
+        opponent_ok, cut_edges, cut_dots = graphAlgorithms.separators(opponent_graph, opponent_dots)
+
+        # Player's edges into each IN node, ignoring internal in<->out edges
+        incoming = {}
+        for u, v in mover_edges:
+            if (u[0], u[1]) != (v[0], v[1]):
+                incoming[v] = incoming.get(v, 0) + 1
+
+        edge_pairs = self.board_obj.geometry.edge_pairs
+        results = []
+        for kind, move in candidates:
+            if kind == "edge":
+                (x1, y1, _), (x2, y2, _) = move
+                if not (0 <= x1 < b.cols and 0 <= y1 < b.rows and 0 <= x2 < b.cols and 0 <= y2 < b.rows):
+                    results.append(ILLEGAL_MOVE)
+                    continue
+                pair = edge_pairs.get(((x1, y1), (x2, y2)))
+                if pair is None or (pair[0] not in available and pair[1] not in available):
+                    results.append(ILLEGAL_MOVE)
+                    continue
+
+                joined = {component.get((x1, y1)), component.get((x2, y2))}
+                wins = mover_wins_now or (None not in joined and mover_components <= joined)
+                if wins:
+                    results.append(MoveCheck(True, wins=True))
+                elif opponent_ok and frozenset(((x1, y1), (x2, y2))) not in cut_edges:
+                    results.append(MoveCheck(True))
+                else:
+                    results.append(MoveCheck(False, blocks=True))
+
+            elif kind == "conquer":
+                x, y = move
+                if not (0 <= x < b.cols and 0 <= y < b.rows) or (x, y) in conquered:
+                    results.append(ILLEGAL_MOVE)
+                    continue
+                if incoming.get((x, y, -1), 0) < 2:
+                    results.append(ILLEGAL_MOVE)
+                    continue
+                if opponent_ok and (x, y) not in cut_dots:
+                    results.append(MoveCheck(True))
+                else:
+                    results.append(MoveCheck(False, blocks=True))
+
+            else:
+                results.append(ILLEGAL_MOVE)
+
+        return results
+
+    def legal_moves(self):
+        """
+        [(move, MoveCheck)] for every legal move of the player to move, with
+        moves as GameRecord's tuples: ("edge", ((x1, y1), (x2, y2))) and
+        ("conquer", (x, y)). Same answers as check_moves over every
+        available edge and empty dot, but read from the live board instead
+        of a snapshot, for callers that play and undo moves on it (the
+        search): the mover's components come from its ConnectivityTracker,
+        the opponent's dot graph from the successor masks and the conquer
+        rule from incoming_edges, so no edge set is copied or walked.
+        """
+        b = self.board_obj
+        turn = self.turn
+        n_turn = Settings.PLAYER2 if turn == Settings.PLAYER1 else Settings.PLAYER1
+        geometry = b.geometry
+        vertices, neighbours = geometry.vertices, geometry.neighbours
+
+        # Mover: component root of every live dot (the tracker's forest)
+        tracker = b.connectivity[turn]
+        if not tracker.is_synced():
+            tracker.rebuild()
+        find = tracker.components.find
+        roots = {dot: find(dot) for dot in tracker.components.parent}
+        mover_components = {roots.get(dot) for dot in tracker.original_dots}
+        mover_wins_now = len(mover_components) == 1 and None not in mover_components
+
+        # Opponent: its live dots joined by its own or available edges
+        opponent_masks, available_masks = b.successors[n_turn], b.available_successors
+        graph = {dot: set() for dot, (v_in, _) in vertices.items() if opponent_masks.get(v_in, 0) & 1}
+        for dot, links in graph.items():
+            v_out = vertices[dot][1]
+            for nbr_in in neighbours[v_out][(opponent_masks.get(v_out, 0) | available_masks.get(v_out, 0)) & ~1]:
+                nbr = (nbr_in[0], nbr_in[1])
+                if nbr in graph:
+                    links.add(nbr)
+                    graph[nbr].add(dot)
+        opponent_dots = {(x, y) for x, y, _ in b.players_original_dots[n_turn]}
+        opponent_ok, cut_edges, cut_dots = graphAlgorithms.separators(graph, opponent_dots)
+
+        moves = []
+        for u, v in b.available_pairs:
+            a, c = (u[0], u[1]), (v[0], v[1])
+            if a >= c:
+                continue  # each edge move once: both of its directions are available
+            move = ("edge", (a, c))
+            ra, rc = roots.get(a), roots.get(c)
+            if mover_wins_now or (ra is not None and rc is not None and mover_components <= {ra, rc}):
+                moves.append((move, MoveCheck(True, wins=True)))
+            elif opponent_ok and frozenset((a, c)) not in cut_edges:
+                moves.append((move, MoveCheck(True)))
+
+        incoming = b.incoming_edges[turn]
+        for dot in b.empty_dots:
+            if incoming.get(vertices[dot][0], 0) >= 2 and opponent_ok and dot not in cut_dots:
+                moves.append((("conquer", dot), MoveCheck(True)))
+        return moves
+
+    def _dot_graph(self, E):
+        """
+        Undirected graph of dots a player can pass through: a dot counts only
+        while its in->out edge exists, and two dots are joined when the edge
+        between them (in either direction) is in E.
+        """
+        graph = {}
+        for u, v in E:
+            if (u[0], u[1]) == (v[0], v[1]) and u[2] == -1:
+                graph.setdefault((u[0], u[1]), set())
+        for u, v in E:
+            a, c = (u[0], u[1]), (v[0], v[1])
+            if a != c and a in graph and c in graph:
+                graph[a].add(c)
+                graph[c].add(a)
+        return graph
 
     # --------------------------
     # MOVE EXECUTION
@@ -312,16 +1380,15 @@ class GameLogic:
 
     def make_move(self, edge):
         """Adds a new edge to the current player's graph and removes it from available pairs."""
-        first_point, second_point = edge
-
-        edg_1 = ((first_point[0], first_point[1], 1), (second_point[0], second_point[1], -1))
-        edg_2 = ((second_point[0], second_point[1], 1), (first_point[0], first_point[1], -1))
-
-        self.board_obj.players_pairs[self.turn].add(edg_1)
-        self.board_obj.players_pairs[self.turn].add(edg_2)
-
-        self.board_obj.available_pairs.discard(edg_1)
-        self.board_obj.available_pairs.discard(edg_2)
+        self.board_obj.add_edges(self.turn, self.board_obj.geometry.edges_of(edge))
 
     def make_conquer_move(self, dot):
         self.board_obj.conquer_dot(self.turn, dot)
+
+    def undo_move(self, edge, player):
+        """Reverts a legal make_move of `player` (used to roll back predicted moves)."""
+        self.board_obj.remove_edges(player, self.board_obj.geometry.edges_of(edge))
+
+    def undo_conquer_move(self, dot, player):
+        """Reverts a legal make_conquer_move of `player`."""
+        self.board_obj.unconquer_dot(player, dot)
@@ -0,0 +1,120 @@
+import json
+import os
+
+from settings import Settings
+from gameLogic import GameLogic
+
+
+class GameRecord:
+    """
+    A played game: board size, the players' original dots and every legal
+    move in order. Stored as JSON, e.g.
+
+        {"rows": 9, "cols": 9,
+         "players_original_dots": {"r": [[2, 2], ...], "b": [[6, 2], ...]},
+         "moves": [["r", "edge", [[0, 0], [1, 0]]], ["b", "conquer", [4, 4]], ...],
+         "winner": "r"}
+
+    winner is None for abandoned games. Used by the server's --record-dir
+    option and by benchmark.py, which replays recorded positions.
+    """
+
+    def __init__(self, rows, cols, players_original_dots, moves=None, winner=None):
+        self.rows = rows
+        self.cols = cols
+        self.players_original_dots = {
+            player: [tuple(dot) for dot in dots] for player, dots in players_original_dots.items()
+        }
+        self.moves = moves if moves is not None else []  # (player, "edge" | "conquer", move)
+        self.winner = winner
+
+    # --------------------------
+    # RECORDING
+    # --------------------------
+
+    def add_move(self, player, kind, move):
+        """kind "edge": move is ((x1, y1), (x2, y2)); kind "conquer": move is (x, y)."""
+        self.moves.append((player, kind, move))
+
+    def add_wire_move(self, player, move_str):
+        """Records a move in the MOVE/UPDATE wire format: "(x1,y1,l1)->(x2,y2,l2)" or "(x,y,l)"."""
+        move_str = move_str.replace("(", "").replace(")", "")
+        if "->" in move_str:
+            p1, p2 = (tuple(map(int, part.split(","))) for part in move_str.split("->"))
+            self.add_move(player, "edge", ((p1[0], p1[1]), (p2[0], p2[1])))
+        else:
+            x, y = map(int, move_str.split(",")[:2])
+            self.add_move(player, "conquer", (x, y))
+
+    # --------------------------
+    # REPLAY
+    # --------------------------
+
+    def new_game(self):
+        """A GameLogic at the starting position, P1 to move."""
+        game_logic = GameLogic(self.rows, self.cols, self.players_original_dots)
+        game_logic.turn = Settings.PLAYER1
+        return game_logic
+
+    def replay(self, ply=None):
+        """
+        GameLogic after the first `ply` moves (all of them by default), with
+        the turn set to the player who moves next.
+        """
+        game_logic = self.new_game()
+        for player, kind, move in self.moves[:ply]:
+            game_logic.turn = player
+            if kind == "edge":
+                game_logic.make_move(move)
+            else:
+                game_logic.make_conquer_move(move)
+            game_logic.turn = game_logic.next_turn()
+        return game_logic
+
+    # --------------------------
+    # SERIALIZATION
+    # --------------------------
+
+    def to_dict(self):
+        return {
+            "rows": self.rows,
+            "cols": self.cols,
+            "players_original_dots": {
+                player: [list(dot) for dot in dots] for player, dots in self.players_original_dots.items()
+            },
+            "moves": [[player, kind, _to_lists(move)] for player, kind, move in self.moves],
+            "winner": self.winner,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        moves = [(player, kind, _to_tuples(move)) for player, kind, move in data["moves"]]
+        return cls(data["rows"], data["cols"], data["players_original_dots"], moves, data.get("winner"))
+
+    def save(self, path):
+        # write-then-rename, so readers never see a half-written record
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(self.to_dict(), f, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path) as f:
+            return cls.from_dict(json.load(f))
+
+
+def load_records(directory):
+    """All *.json game records in a directory, sorted by file name."""
+    return [
+        GameRecord.load(os.path.join(directory, name))
+        for name in sorted(os.listdir(directory)) if name.endswith(".json")
+    ]
+
+
+def _to_lists(value):
+    return [_to_lists(v) for v in value] if isinstance(value, (tuple, list)) else value
+
+
+def _to_tuples(value):
+    return tuple(_to_tuples(v) for v in value) if isinstance(value, (tuple, list)) else value
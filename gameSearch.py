@@ -0,0 +1,301 @@
+"""
+Game-tree search over GameLogic, for bots and analysis tools.
+
+    search = GameSearch(game_logic)                # or GameSearch(game_logic, evaluate=...)
+    result = search.run(max_depth=8, time_limit=1.0)
+    result.move, result.score, result.depth, result.stats.nodes_per_second()
+
+Negamax with alpha-beta pruning under iterative deepening: depth 1, 2, ...
+are searched in turn. When the time limit hits in the middle of an
+iteration, the best root move that iteration had fully searched is
+returned (the previous best is searched first, so it is at least as well
+informed), else the previous iteration's, else the first move in order.
+The clock is read at every node, so a run overshoots its limit by about
+one node. Moves are tried in this order:
+  - the previous iteration's best move (root only)
+  - killer moves: the last two moves that caused a cutoff at the same ply
+  - the history heuristic: moves that caused cutoffs anywhere, weighted by
+    the depth left, so good moves found deep in the tree float up
+
+Legal moves come from GameLogic.legal_moves, which validates every candidate
+of a position in one linear pass over the live board's incremental state
+(no snapshot, no edge set copies). Moves use GameRecord's tuples:
+("edge", ((x1, y1), (x2, y2))) and ("conquer", (x, y)). The search plays
+and undoes moves on the GameLogic it is given, which is back at its
+starting position when run() returns; don't share it with another thread
+meanwhile.
+
+    python gameSearch.py benchmarks/games/9x9/<game>.json --ply 40 --time 2
+"""
+import argparse
+import time
+
+from settings import Settings
+from gameRecord import GameRecord
+
+WIN_SCORE = 1_000_000  # minus the plies to the win, so faster wins score higher
+MAX_DEPTH = 64
+
+
+class SearchTimeout(Exception):
+    """Raised inside the tree when the time limit is up; run() catches it."""
+
+
+# --------------------------
+# EVALUATION
+# --------------------------
+
+def distance_eval(game_logic, player):
+    """
+    Default evaluation: how many more edges the opponent needs to win than
+    the player (GameLogic.distance_to_win, kept up to date incrementally as
+    the search plays and undoes moves). A player who can no longer connect
+    its dots counts as a whole board away.
+    """
+    b = game_logic.board_obj
+    opponent = Settings.PLAYER2 if player == Settings.PLAYER1 else Settings.PLAYER1
+    unreachable = b.rows * b.cols
+    mine = game_logic.distance_to_win(player)
+    theirs = game_logic.distance_to_win(opponent)
+    return (unreachable if theirs is None else theirs) - (unreachable if mine is None else mine)
+
+
+# --------------------------
+# RESULTS
+# --------------------------
+
+class SearchStats:
+    """Counters of one run(); nodes includes leaves, evaluations counts evaluate() calls."""
+
+    def __init__(self):
+        self.nodes = 0
+        self.evaluations = 0
+        self.cutoffs = 0
+        self.book_hits = 0
+        self.elapsed = 0.0
+        self.iterations = []  # (depth, nodes, seconds) per completed depth
+
+    def nodes_per_second(self):
+        return self.nodes / self.elapsed if self.elapsed > 0 else 0.0
+
+    def __repr__(self):
+        return (f"SearchStats(nodes={self.nodes}, evaluations={self.evaluations}, cutoffs={self.cutoffs}, "
+                f"book_hits={self.book_hits}, elapsed={self.elapsed:.3f}s, nps={self.nodes_per_second():.0f})")
+
+
+class SearchResult:
+    def __init__(self, move, score, depth, stats, principal_variation):
+        self.move = move  # None if the player to move has no legal move
+        self.score = score  # from the point of view of the player to move
+        self.depth = depth  # last depth searched to completion
+        self.stats = stats
+        self.principal_variation = principal_variation
+
+    def __repr__(self):
+        return f"SearchResult(move={self.move}, score={self.score}, depth={self.depth}, {self.stats})"
+
+
+# --------------------------
+# SEARCH
+# --------------------------
+
+class GameSearch:
+    """
+    Negamax alpha-beta search for the player to move in game_logic.
+
+    evaluate(game_logic, player) scores a position from the player's point of
+    view (higher is better, well below WIN_SCORE); distance_eval by
+    default. Killer and history tables persist across run() calls, so a bot
+    reusing its GameSearch for successive moves keeps what it learned.
+    With an OpeningBook, run() answers book positions without searching.
+    """
+
+    def __init__(self, game_logic, evaluate=distance_eval, book=None):
+        self.game_logic = game_logic
+        self.evaluate = evaluate
+        self.book = book
+        self.killers = [[] for _ in range(MAX_DEPTH + 1)]  # per ply, the last two cutoff moves
+        self.history = {}  # move -> cutoff weight
+        self.stats = SearchStats()
+        self.deadline = None
+        self.root_best = None  # (score, pv) of the root moves fully searched in the current iteration
+
+    def run(self, max_depth=MAX_DEPTH, time_limit=None):
+        """
+        Iterative deepening up to max_depth plies, stopping early when
+        time_limit (seconds) runs out or a forced win/loss is found.
+        """
+        self.stats = SearchStats()
+        started = time.perf_counter()
+        self.deadline = started + time_limit if time_limit is not None else None
+
+        if self.book is not None:
+            entry = self.book.lookup(self.game_logic.board_obj, self.game_logic.turn)
+            if entry is not None and self._is_legal(entry.move):
+                self.stats.book_hits += 1
+                self.stats.elapsed = time.perf_counter() - started
+                return SearchResult(entry.move, entry.search_score(), entry.depth, self.stats, [entry.move])
+
+        legal = self._legal_moves()
+        best_move = self._ordered_moves(legal, 0)[0][0] if legal else None
+        best_score, depth_done, pv = 0, 0, [best_move] if legal else []
+        for depth in range(1, min(max_depth, MAX_DEPTH) + 1):
+            nodes_before = self.stats.nodes
+            try:
+                score, pv = self._root(depth, legal, best_move)
+            except SearchTimeout:
+                if self.root_best is not None:
+                    best_score, pv = self.root_best
+                    best_move = pv[0]
+                break
+            best_score, depth_done = score, depth
+            best_move = pv[0] if pv else None
+            self.stats.iterations.append((depth, self.stats.nodes - nodes_before, time.perf_counter() - started))
+            if best_move is None or abs(score) >= WIN_SCORE - MAX_DEPTH:
+                break  # no move, or the outcome is decided: deeper searches can't change it
+
+        self.stats.elapsed = time.perf_counter() - started
+        return SearchResult(best_move, best_score, depth_done, self.stats, pv)
+
+    def _root(self, depth, legal, previous_best):
+        self.root_best = None
+        moves = self._ordered_moves(legal, 0, previous_best)
+        if not moves:
+            return 0, []
+
+        for move, check in moves:
+            if check.wins:
+                return WIN_SCORE - 1, [move]
+
+        alpha, beta = -WIN_SCORE - 1, WIN_SCORE + 1
+        best_pv = []
+        for move, check in moves:
+            self._check_time()
+            self._play(move)
+            try:
+                score, pv = self._negamax(depth - 1, 1, -beta, -alpha)
+            finally:
+                self._undo(move)
+            score = -score
+            if score > alpha or not best_pv:
+                alpha, best_pv = max(alpha, score), [move] + pv
+                self.root_best = (alpha, best_pv)
+        return alpha, best_pv
+
+    def _negamax(self, depth, ply, alpha, beta):
+        """Score of the position for the player to move, and the line that leads to it."""
+        stats = self.stats
+        stats.nodes += 1
+        self._check_time()
+
+        if depth == 0 or ply >= MAX_DEPTH:
+            stats.evaluations += 1
+            return self.evaluate(self.game_logic, self.game_logic.turn), []
+
+        legal = self._legal_moves()
+        if not legal:
+            return 0, []  # the rules don't decide a position with no legal move: call it even
+        for move, check in legal:
+            if check.wins:
+                return WIN_SCORE - ply - 1, [move]
+
+        best_score, best_pv = -WIN_SCORE - 1, []
+        for move, check in self._ordered_moves(legal, ply):
+            self._play(move)
+            try:
+                score, pv = self._negamax(depth - 1, ply + 1, -beta, -alpha)
+            finally:
+                self._undo(move)
+            score = -score
+            if score > best_score:
+                best_score, best_pv = score, [move] + pv
+                if score > alpha:
+                    alpha = score
+            if alpha >= beta:
+                stats.cutoffs += 1
+                self._record_cutoff(move, ply, depth)
+                break
+        return best_score, best_pv
+
+    def _check_time(self):
+        # a clock read costs far less than the legal_moves() pass of a node
+        if self.deadline is not None and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+    # --------------------------
+    # MOVES
+    # --------------------------
+
+    def _legal_moves(self):
+        """[(move, MoveCheck)] for every legal move of the player to move."""
+        return self.game_logic.legal_moves()
+
+    def _is_legal(self, move):
+        kind, target = move
+        if kind == "edge":
+            (x1, y1), (x2, y2) = target
+            return self.game_logic.check_edge_input((x1, y1, 1), (x2, y2, -1))
+        return self.game_logic.check_conquer_input(target)
+
+    def _ordered_moves(self, moves, ply, first=None):
+        killers = self.killers[ply]
+        history = self.history
+
+        def priority(entry):
+            move = entry[0]
+            if move == first:
+                return 3 * WIN_SCORE
+            if move in killers:
+                return 2 * WIN_SCORE - killers.index(move)
+            return history.get(move, 0)
+
+        return sorted(moves, key=priority, reverse=True)
+
+    def _record_cutoff(self, move, ply, depth):
+        killers = self.killers[ply]
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[2:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+    def _play(self, move):
+        kind, target = move
+        game_logic = self.game_logic
+        if kind == "edge":
+            game_logic.make_move(target)
+        else:
+            game_logic.make_conquer_move(target)
+        game_logic.turn = game_logic.next_turn()
+
+    def _undo(self, move):
+        kind, target = move
+        game_logic = self.game_logic
+        game_logic.turn = game_logic.next_turn()
+        if kind == "edge":
+            game_logic.undo_move(target, game_logic.turn)
+        else:
+            game_logic.undo_conquer_move(target, game_logic.turn)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Search a recorded position and report the best move")
+    parser.add_argument("record", help="a GameRecord JSON file")
+    parser.add_argument("--ply", type=int, help="moves of the record to replay first (default: all)")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH)
+    parser.add_argument("--time", type=float, default=1.0, help="time limit in seconds")
+    parser.add_argument("--book", help="an opening book to answer from (openingBook.py)")
+    args = parser.parse_args()
+
+    game_logic = GameRecord.load(args.record).replay(args.ply)
+    book = None
+    if args.book:
+        from openingBook import OpeningBook
+        book = OpeningBook(args.book)
+    result = GameSearch(game_logic, book=book).run(args.depth, args.time)
+    if result.stats.book_hits:
+        print(f"SEARCH: book position ({args.book})")
+    for depth, nodes, seconds in result.stats.iterations:
+        print(f"SEARCH: depth {depth:2}  {nodes:8} nodes  {seconds:7.3f} s")
+    print(f"SEARCH: {game_logic.turn} plays {result.move} (score {result.score}, depth {result.depth})")
+    print(f"SEARCH: {result.stats.nodes} nodes in {result.stats.elapsed:.3f} s "
+          f"({result.stats.nodes_per_second():.0f} nodes/s, {result.stats.cutoffs} cutoffs)")
@@ -0,0 +1,138 @@
+"""
+Garbage collector tuning and allocation sampling for the server (--gc-tuning).
+
+Every move allocates short-lived tuples, sets and adjacency dicts. Each
+cyclic GC pass then walks the object graphs of all running games, and that
+pause lands on whichever move triggered it. GCMonitor:
+  - raises the collection thresholds (ServerSettings.GC_THRESHOLDS)
+  - freezes everything alive after startup (modules, board templates, the
+    prewarmed board pool) so collections never scan it again
+  - times every collection through gc.callbacks
+  - traces one move in every `sample_every` with tracemalloc, reporting the
+    bytes and blocks it leaves behind and its peak temporary memory
+"""
+import gc
+import itertools
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager, nullcontext
+
+
+class GCMonitor:
+    def __init__(self, thresholds, sample_every, pause_history):
+        self.thresholds = thresholds
+        self.sample_every = sample_every  # 0: no allocation sampling
+
+        # collections, filled in by on_gc
+        self.collections = [0, 0, 0]  # per generation
+        self.pauses = []  # seconds, the last pause_history collections
+        self.pause_history = pause_history
+        self.pause_total = 0.0
+        self.max_pause = 0.0
+        self.gc_started = None
+
+        # allocation samples, filled in by move()
+        self.move_counter = itertools.count(1)
+        self.sample_lock = threading.Lock()  # tracemalloc is process-wide: one sample at a time
+        self.sampled_moves = 0
+        self.retained_bytes = 0
+        self.retained_blocks = 0
+        self.peak_bytes = 0
+        self.max_peak_bytes = 0
+
+    # --------------------------
+    # SETUP
+    # --------------------------
+
+    def install(self):
+        gc.set_threshold(*self.thresholds)
+        gc.callbacks.append(self.on_gc)
+
+    def freeze(self):
+        """
+        Collects once, then moves every surviving object to the permanent
+        generation. Call it when startup is done and before games begin.
+        """
+        gc.collect()
+        gc.freeze()
+        # pause statistics cover play only, not this startup collection
+        self.collections = [0, 0, 0]
+        self.pauses = []
+        self.pause_total = 0.0
+        self.max_pause = 0.0
+        return gc.get_freeze_count()
+
+    # --------------------------
+    # MEASUREMENT
+    # --------------------------
+
+    def on_gc(self, phase, info):
+        # collections hold the GIL, so start/stop pairs never interleave
+        if phase == "start":
+            self.gc_started = time.perf_counter()
+            return
+        if self.gc_started is None:
+            return
+        pause = time.perf_counter() - self.gc_started
+        self.gc_started = None
+        self.collections[info["generation"]] += 1
+        self.pause_total += pause
+        self.max_pause = max(self.max_pause, pause)
+        self.pauses.append(pause)
+        if len(self.pauses) > 2 * self.pause_history:
+            del self.pauses[:-self.pause_history]
+
+    def move(self):
+        """
+        Context manager around the processing of one move. Every
+        sample_every-th move is traced, unless another game's sample is
+        still running. Other threads allocating meanwhile are counted too,
+        so samples are upper bounds under load.
+        """
+        if not self.sample_every or next(self.move_counter) % self.sample_every:
+            return nullcontext()
+        if not self.sample_lock.acquire(blocking=False):
+            return nullcontext()
+        return self._traced_move()
+
+    @contextmanager
+    def _traced_move(self):
+        try:
+            tracemalloc.start()
+            yield
+            # only allocations made since start() are traced
+            blocks = len(tracemalloc.take_snapshot().traces)
+            retained, peak = tracemalloc.get_traced_memory()
+            self.sampled_moves += 1
+            self.retained_bytes += retained
+            self.retained_blocks += blocks
+            self.peak_bytes += peak
+            self.max_peak_bytes = max(self.max_peak_bytes, peak)
+        finally:
+            tracemalloc.stop()
+            self.sample_lock.release()
+
+    # --------------------------
+    # REPORT
+    # --------------------------
+
+    def stats(self):
+        pauses = sorted(self.pauses[-self.pause_history:])
+        stats = {
+            "collections": tuple(self.collections),
+            "pause_total_ms": round(self.pause_total * 1000, 2),
+            "pause_max_ms": round(self.max_pause * 1000, 3),
+            "pause_p99_ms": round(pauses[int(0.99 * (len(pauses) - 1))] * 1000, 3) if pauses else None,
+            "frozen": gc.get_freeze_count(),
+        }
+        if self.sampled_moves:
+            n = self.sampled_moves
+            stats.update({
+                "sampled_moves": n,
+                "retained_bytes_per_move": self.retained_bytes // n,
+                "retained_blocks_per_move": self.retained_blocks // n,
+                "peak_bytes_per_move": self.peak_bytes // n,
+                "max_peak_bytes": self.max_peak_bytes,
+            })
+        return stats
@@ -0,0 +1,418 @@
+"""
+Graph algorithms shared by the rules engine.
+
+Directed graphs are adjacency dicts {vertex: [successor, ...]} over the
+board's (x, y, i) vertices (i = -1 for IN, 1 for OUT); undirected dot
+graphs are {dot: {neighbour, ...}}. Everything is iterative (no recursion
+limit on large boards) and uses deque queues and set/int-bitset lookups.
+
+test.py property-checks these against the naive reference versions.
+"""
+from collections import deque
+
+
+# --------------------------
+# ADJACENCY
+# --------------------------
+
+def adjacency(E, vertices=()):
+    """Directed adjacency lists for edge set E (plus isolated `vertices`)."""
+    adj = {v: [] for v in vertices}
+    for u, v in E:
+        if u in adj:
+            adj[u].append(v)
+        else:
+            adj[u] = [v]
+    return adj
+
+
+# --------------------------
+# REACHABILITY
+# --------------------------
+
+def bfs(adj, source):
+    """Set of vertices reachable from source."""
+    visited = {source}
+    queue = deque([source])
+    while queue:
+        node = queue.popleft()
+        for nbr in adj.get(node, ()):
+            if nbr not in visited:
+                visited.add(nbr)
+                queue.append(nbr)
+    return visited
+
+
+def reachable_from_any(adj, sources):
+    """Set of vertices reachable from at least one of the sources (one multi-source BFS)."""
+    visited = set(sources)
+    queue = deque(visited)
+    while queue:
+        node = queue.popleft()
+        for nbr in adj.get(node, ()):
+            if nbr not in visited:
+                visited.add(nbr)
+                queue.append(nbr)
+    return visited
+
+
+def reach_masks(adj, sources):
+    """
+    Bitset BFS from all sources at once: {vertex: mask} where bit j of mask
+    is set if sources[j] reaches the vertex. A vertex is re-queued only when
+    it gains new bits, so each vertex is expanded at most len(sources) times.
+    """
+    masks = {}
+    queue = deque()
+    for bit, source in enumerate(sources):
+        masks[source] = masks.get(source, 0) | (1 << bit)
+        queue.append(source)
+    while queue:
+        node = queue.popleft()
+        mask = masks[node]
+        for nbr in adj.get(node, ()):
+            old = masks.get(nbr, 0)
+            if mask & ~old:
+                masks[nbr] = old | mask
+                queue.append(nbr)
+    return masks
+
+
+# --------------------------
+# STRONGLY CONNECTED COMPONENTS
+# --------------------------
+
+def strongly_connected_components(adj, roots=None):
+    """
+    Iterative Tarjan. Returns (components, comp_of):
+      components - lists of vertices, in reverse topological order of the
+                   condensation (a component comes after every component
+                   it can reach)
+      comp_of    - vertex -> index into components
+    With roots, only the part of the graph reachable from them is explored.
+    """
+    index = {}
+    low = {}
+    on_stack = set()
+    stack = []
+    components = []
+    comp_of = {}
+
+    for root in (adj if roots is None else roots):
+        if root in index:
+            continue
+        index[root] = low[root] = len(index)
+        stack.append(root)
+        on_stack.add(root)
+        work = [(root, iter(adj.get(root, ())))]
+
+        while work:
+            node, nbrs = work[-1]
+            advanced = False
+            for nbr in nbrs:
+                if nbr not in index:
+                    index[nbr] = low[nbr] = len(index)
+                    stack.append(nbr)
+                    on_stack.add(nbr)
+                    work.append((nbr, iter(adj.get(nbr, ()))))
+                    advanced = True
+                    break
+                if nbr in on_stack and index[nbr] < low[node]:
+                    low[node] = index[nbr]
+            if advanced:
+                continue
+
+            work.pop()
+            if work:
+                parent = work[-1][0]
+                if low[node] < low[parent]:
+                    low[parent] = low[node]
+
+            if low[node] == index[node]:
+                component = []
+                while True:
+                    v = stack.pop()
+                    on_stack.discard(v)
+                    comp_of[v] = len(components)
+                    component.append(v)
+                    if v == node:
+                        break
+                components.append(component)
+
+    return components, comp_of
+
+
+def condensation(adj, components, comp_of):
+    """Successor sets of the component DAG (only between components in comp_of)."""
+    succ = [set() for _ in components]
+    for c, component in enumerate(components):
+        for v in component:
+            for nbr in adj.get(v, ()):
+                d = comp_of.get(nbr)
+                if d is not None and d != c:
+                    succ[c].add(d)
+    return succ
+
+
+# --------------------------
+# UNION-FIND
+# --------------------------
+
+class UnionFind:
+    """
+    Disjoint sets with path halving and union by size (near O(1) per
+    operation). members[root] lists every item of a set, so a single set can
+    be taken apart again (discard_set) without touching the others.
+    """
+
+    def __init__(self):
+        self.parent = {}
+        self.size = {}
+        self.members = {}
+
+    def add(self, item):
+        if item not in self.parent:
+            self.parent[item] = item
+            self.size[item] = 1
+            self.members[item] = [item]
+
+    def find(self, item):
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a, b):
+        """Merges the sets of a and b; returns the new root."""
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return a
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        self.members[a].extend(self.members.pop(b))
+        del self.size[b]
+        return a
+
+    def discard_set(self, item):
+        """Removes the whole set containing item; returns its members."""
+        root = self.find(item)
+        members = self.members.pop(root)
+        del self.size[root]
+        for member in members:
+            del self.parent[member]
+        return members
+
+
+# --------------------------
+# CONNECTIVITY QUERIES
+# --------------------------
+
+def all_outs_reach_all_ins(E, S):
+    """
+    True if every OUT vertex of S reaches every IN vertex of S along E
+    (the win / not-blocked condition of GameLogic).
+
+    One BFS per OUT, each stopping as soon as it has seen every IN or hits
+    an OUT already known to reach them all (it then reaches them too). A
+    board has a handful of OUTs and they are usually close to each other,
+    so this beats the single-pass condensation query below in practice.
+    """
+    adj = adjacency(E)
+    return _outs_reach_ins(lambda node: adj.get(node, ()), S)
+
+
+def all_outs_reach_all_ins_masked(masks, neighbours, S, removed=None, symmetric=False):
+    """
+    all_outs_reach_all_ins over a graph kept as successor bitmasks: the
+    union of the {vertex: mask} dicts in `masks`, minus the bits of
+    `removed` ({vertex: mask}), where neighbours[vertex][mask] lists the
+    successors a mask stands for. Board maintains such masks as edges
+    change (see BoardGeometry), so a query builds nothing up front.
+
+    symmetric: the caller guarantees that reachability between vertices of
+    S is symmetric (u reaches v iff v reaches u). A single BFS from one OUT
+    that sees the rest of S then answers the query.
+    """
+    removed = removed or {}
+
+    def successors(node):
+        mask = 0
+        for vertex_masks in masks:
+            mask |= vertex_masks.get(node, 0)
+        return neighbours[node][mask & ~removed.get(node, 0)]
+
+    return _outs_reach_ins(successors, S, symmetric)
+
+
+def _outs_reach_ins(successors, S, symmetric=False):
+    outs = list({v for v in S if v[2] == 1})
+    ins = {v for v in S if v[2] == -1}
+
+    if not ins:
+        return True
+    if not outs:
+        return False
+
+    if symmetric:
+        missing = ins.union(outs[1:])
+        visited = {outs[0]}
+        queue = deque(visited)
+        while queue:
+            for nbr in successors(queue.popleft()):
+                if nbr not in visited:
+                    visited.add(nbr)
+                    missing.discard(nbr)
+                    if not missing:
+                        return True
+                    queue.append(nbr)
+        return False
+
+    good = set()  # OUTs known to reach every IN
+    for out_v in outs:
+        missing = set(ins)
+        visited = {out_v}
+        queue = deque([out_v])
+        found = False
+        while queue and not found:
+            node = queue.popleft()
+            for nbr in successors(node):
+                if nbr in visited:
+                    continue
+                if nbr in good:
+                    found = True
+                    break
+                visited.add(nbr)
+                missing.discard(nbr)
+                if not missing:
+                    found = True
+                    break
+                queue.append(nbr)
+        if not found:
+            return False
+        good.add(out_v)
+
+    return True
+
+
+def all_outs_reach_all_ins_condensed(E, S):
+    """
+    Same answer as all_outs_reach_all_ins in one O(V + E) pass regardless of
+    the number of OUTs: a Tarjan pass from the OUT vertices, then the IN
+    vertices each component reaches are accumulated as a bitset over the
+    condensation in topological order.
+    """
+    outs = {v for v in S if v[2] == 1}
+    ins = list({v for v in S if v[2] == -1})
+
+    if not ins:
+        return True
+    if not outs:
+        return False
+
+    adj = adjacency(E)
+    components, comp_of = strongly_connected_components(adj, outs)
+    if any(v not in comp_of for v in ins):
+        return False
+
+    own = [0] * len(components)
+    for bit, v in enumerate(ins):
+        own[comp_of[v]] |= 1 << bit
+    full = (1 << len(ins)) - 1
+
+    # components are listed sinks first, so successors are always done
+    reach = []
+    for c, successors in enumerate(condensation(adj, components, comp_of)):
+        mask = own[c]
+        for d in successors:
+            mask |= reach[d]
+        reach.append(mask)
+
+    return all(reach[comp_of[v]] == full for v in outs)
+
+
+def is_subset_strongly_connected(E, S):
+    """
+    The check test.py started from: within the subgraph induced by S, is
+    every IN vertex reachable from at least one OUT vertex?
+    """
+    S = set(S)
+    adj = adjacency(((u, v) for u, v in E if u in S and v in S), S)
+    outs = [v for v in S if v[2] == 1]
+    reached = reachable_from_any(adj, outs)
+    return all(v in reached for v in S if v[2] == -1)
+
+
+# --------------------------
+# UNDIRECTED DOT GRAPHS
+# --------------------------
+
+def connected_components(graph):
+    """Maps every vertex of an undirected graph to a component id."""
+    component = {}
+    for start in graph:
+        if start in component:
+            continue
+        component[start] = start
+        queue = deque([start])
+        while queue:
+            node = queue.popleft()
+            for nbr in graph[node]:
+                if nbr not in component:
+                    component[nbr] = start
+                    queue.append(nbr)
+    return component
+
+
+def separators(graph, terminals):
+    """
+    Returns (connected, cut_edges, cut_dots) for the terminal vertices:
+      connected - all terminals are in one component
+      cut_edges - frozenset({a, b}) edges whose removal separates terminals
+      cut_dots  - vertices whose removal separates terminals
+    One iterative DFS (Tarjan low-links) counting terminals per subtree.
+    """
+    if not terminals:
+        return True, set(), set()
+    root = next(iter(terminals))
+    if root not in graph:
+        return False, set(), set()
+
+    total = len(terminals)
+    disc = {root: 0}
+    low = {root: 0}
+    below = {root: 1 if root in terminals else 0}  # terminals in DFS subtree
+    cut_edges = set()
+    cut_dots = set()
+    stack = [(root, None, iter(graph[root]))]
+
+    while stack:
+        node, parent, nbrs = stack[-1]
+        advanced = False
+        for nbr in nbrs:
+            if nbr not in disc:
+                disc[nbr] = low[nbr] = len(disc)
+                below[nbr] = 1 if nbr in terminals else 0
+                stack.append((nbr, node, iter(graph[nbr])))
+                advanced = True
+                break
+            if nbr != parent:
+                low[node] = min(low[node], disc[nbr])
+        if advanced:
+            continue
+
+        stack.pop()
+        if parent is None:
+            continue
+        low[parent] = min(low[parent], low[node])
+        below[parent] += below[node]
+        separates = 0 < below[node] < total
+        if separates and low[node] > disc[parent]:
+            cut_edges.add(frozenset((parent, node)))
+        if separates and low[node] >= disc[parent]:
+            cut_dots.add(parent)
+
+    connected = below[root] == total
+    return connected, cut_edges, cut_dots
@@ -0,0 +1,297 @@
+"""
+Headless load generator for server.py.
+
+Opens N player connections to a GameServer (optionally spawning one as a
+subprocess), lets every pair play random legal moves over the normal
+WELCOME / MOVE / UPDATE / END protocol, and reports the connection rate,
+p50/p99 move round-trip latency and the server's CPU usage.
+
+    python loadTest.py --clients 200 --spawn-server
+    python loadTest.py --clients 50 --port 12346 --server-pid 1234
+"""
+import argparse
+import os
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+from settings import Settings
+from gameLogic import GameLogic
+
+try:
+    import psutil
+except ImportError:  # optional: falls back to /proc
+    psutil = None
+
+
+# --------------------------
+# SIMULATED CLIENT
+# --------------------------
+
+class SimulatedClient:
+    """
+    One headless player. Keeps its own GameLogic in sync with the server's
+    UPDATEs and, on its turn, sends a random legal move and times how long
+    the server takes to echo it back.
+    """
+
+    def __init__(self, host, port, rng, max_moves):
+        self.host = host
+        self.port = port
+        self.rng = rng
+        self.max_moves = max_moves  # per game; the client quits after that many UPDATEs
+        self.sock = None
+        self.recv_buffer = ""
+        self.player_color = None
+
+        # the same layout the server sets up
+        self.gameLogic = GameLogic(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
+        self.gameLogic.turn = Settings.PLAYER1
+
+        # results
+        self.connect_time = None  # seconds from connect() to WELCOME
+        self.rtts = []
+        self.moves_sent = 0
+        self.invalid_moves = 0
+        self.result = None  # END payload, "QUIT" or "ERROR: ..."
+
+    def connect(self, timeout):
+        start = time.perf_counter()
+        self.sock = socket.create_connection((self.host, self.port), timeout=timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        welcome = self.read_line()
+        if not welcome or not welcome.startswith("WELCOME "):
+            raise ConnectionError(f"unexpected handshake: {welcome}")
+        self.player_color = Settings.PLAYER1 if welcome == "WELCOME 1" else Settings.PLAYER2
+        self.connect_time = time.perf_counter() - start
+
+    def read_line(self):
+        """Next newline-terminated server message, or None on EOF."""
+        while "\n" not in self.recv_buffer:
+            data = self.sock.recv(1024)
+            if not data:
+                return None
+            self.recv_buffer += data.decode()
+        line, self.recv_buffer = self.recv_buffer.split("\n", 1)
+        return line.strip()
+
+    def play(self):
+        try:
+            updates = 0
+            while True:
+                if self.gameLogic.turn == self.player_color:
+                    if updates >= self.max_moves:
+                        self.sock.sendall("QUIT".encode())
+                        self.result = "QUIT"
+                        return
+
+                    move = self.pick_move()
+                    if move is None:
+                        self.sock.sendall("QUIT".encode())
+                        self.result = "QUIT"
+                        return
+                    self.sock.sendall(f"MOVE {move}".encode())
+                    self.moves_sent += 1
+                    sent_at = time.perf_counter()
+                else:
+                    sent_at = None
+
+                msg = self.read_line()
+                if msg is None:
+                    self.result = "ERROR: connection closed"
+                    return
+
+                if msg.startswith("UPDATE "):
+                    if sent_at is not None:
+                        self.rtts.append(time.perf_counter() - sent_at)
+                    self.apply_update(msg[7:])
+                    self.gameLogic.turn = self.gameLogic.next_turn()
+                    updates += 1
+                elif msg == "INVALID_MOVE":
+                    # our board disagrees with the server's; try another move
+                    self.invalid_moves += 1
+                elif msg.startswith("END "):
+                    self.result = msg[4:]
+                    return
+        except OSError as e:
+            self.result = f"ERROR: {e}"
+        finally:
+            self.sock.close()
+
+    def pick_move(self):
+        """A random legal move as the move_data of a MOVE message, or None."""
+        board = self.gameLogic.board_obj
+        candidates = [("edge", edge) for edge in board.available_pairs]
+        candidates += [("conquer", dot) for dot in board.empty_dots]
+        self.rng.shuffle(candidates)
+
+        for kind, move in candidates:
+            if kind == "edge":
+                if self.gameLogic.validate_edge(move[0], move[1]).legal:
+                    (x1, y1, l1), (x2, y2, l2) = move
+                    return f"({x1},{y1},{l1})->({x2},{y2},{l2})"
+            elif self.gameLogic.validate_conquer(move).legal:
+                return f"({move[0]},{move[1]},-1)"
+        return None
+
+    def apply_update(self, move_str):
+        move_str = move_str.replace("(", "").replace(")", "")
+        if "->" in move_str:
+            p1, p2 = (tuple(map(int, part.split(","))) for part in move_str.split("->"))
+            self.gameLogic.make_move(((p1[0], p1[1]), (p2[0], p2[1])))
+        else:
+            x, y, _ = map(int, move_str.split(","))
+            self.gameLogic.make_conquer_move((x, y))
+
+
+# --------------------------
+# SERVER PROCESS
+# --------------------------
+
+def process_cpu_seconds(pid):
+    """User + system CPU time of a process (psutil if installed, else /proc)."""
+    if psutil is not None:
+        times = psutil.Process(pid).cpu_times()
+        return times.user + times.system
+    with open(f"/proc/{pid}/stat") as f:
+        # fields after the parenthesized command name; utime and stime are 14 and 15
+        fields = f.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def spawn_server(host, port, spectator_port, record_dir=None):
+    """Starts server.py in a subprocess and waits until it accepts connections."""
+    server_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "server.py")
+    command = [sys.executable, server_path, "--host", host, "--port", str(port),
+               "--spectator-port", str(spectator_port)]
+    if record_dir:
+        command += ["--record-dir", record_dir]
+    proc = subprocess.Popen(
+        command,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+    # probe the spectator port: a probe on the player port would be paired into a game
+    deadline = time.time() + 10
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"server exited with code {proc.returncode}")
+        try:
+            with socket.create_connection((host, spectator_port), timeout=1) as probe:
+                probe.sendall("WATCH 0".encode())
+                probe.recv(1024)
+            return proc
+        except OSError:
+            time.sleep(0.1)
+    proc.kill()
+    raise RuntimeError("server did not start listening")
+
+
+# --------------------------
+# REPORT
+# --------------------------
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return float("nan")
+    rank = max(1, int(round(p / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def run_load_test(host, port, clients, max_moves, seed, server_pid=None, socket_timeout=30):
+    rng = random.Random(seed)
+    bots = [SimulatedClient(host, port, random.Random(rng.random()), max_moves) for _ in range(clients)]
+    errors = []
+
+    cpu_before = process_cpu_seconds(server_pid) if server_pid else None
+    started = time.perf_counter()
+
+    # connect sequentially so every pair ends up in the same game, then play concurrently
+    for bot in bots:
+        try:
+            bot.connect(socket_timeout)
+        except OSError as e:
+            errors.append(f"connect: {e}")
+            bot.result = f"ERROR: {e}"
+    connected_at = time.perf_counter()
+
+    threads = [threading.Thread(target=bot.play, daemon=True) for bot in bots if bot.sock and bot.result is None]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    finished = time.perf_counter()
+
+    cpu_used = process_cpu_seconds(server_pid) - cpu_before if server_pid else None
+
+    rtts = sorted(rtt for bot in bots for rtt in bot.rtts)
+    connected = [bot for bot in bots if bot.connect_time is not None]
+    results = [bot.result for bot in bots]
+    connect_seconds = connected_at - started
+
+    return {
+        "clients": clients,
+        "connected": len(connected),
+        "connect_seconds": connect_seconds,
+        "connections_per_sec": len(connected) / connect_seconds if connect_seconds else float("inf"),
+        "moves": len(rtts),
+        "moves_per_sec": len(rtts) / (finished - connected_at) if finished > connected_at else float("inf"),
+        "rtt_p50_ms": percentile(rtts, 50) * 1000,
+        "rtt_p99_ms": percentile(rtts, 99) * 1000,
+        "invalid_moves": sum(bot.invalid_moves for bot in bots),
+        "games_won": sum(1 for r in results if r in (Settings.PLAYER1, Settings.PLAYER2)) // 2,
+        "errors": errors + [r for r in results if r and r.startswith("ERROR")],
+        "wall_seconds": finished - started,
+        "server_cpu_seconds": cpu_used,
+        "server_cpu_percent": cpu_used / (finished - started) * 100 if cpu_used is not None else None,
+    }
+
+
+def print_report(report):
+    print(f"LOAD: {report['connected']}/{report['clients']} clients connected "
+          f"in {report['connect_seconds']:.2f}s ({report['connections_per_sec']:.0f} conn/s)")
+    print(f"LOAD: {report['moves']} moves, {report['moves_per_sec']:.0f} moves/s, "
+          f"RTT p50 {report['rtt_p50_ms']:.2f} ms, p99 {report['rtt_p99_ms']:.2f} ms")
+    print(f"LOAD: {report['games_won']} games won, {report['invalid_moves']} invalid moves, "
+          f"{len(report['errors'])} errors")
+    if report["server_cpu_seconds"] is not None:
+        print(f"LOAD: server CPU {report['server_cpu_seconds']:.2f}s "
+              f"({report['server_cpu_percent']:.0f}% over {report['wall_seconds']:.2f}s)")
+    for error in report["errors"][:10]:
+        print(f"LOAD: {error}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Headless load test for server.py")
+    parser.add_argument("--clients", type=int, default=100, help="player connections (pairs form games)")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=Settings.PORT)
+    parser.add_argument("--spectator-port", type=int, default=Settings.SPECTATOR_PORT)
+    parser.add_argument("--spawn-server", action="store_true", help="start server.py as a subprocess")
+    parser.add_argument("--server-pid", type=int, help="measure the CPU of an already running server")
+    parser.add_argument("--max-moves", type=int, default=200, help="moves per game before quitting")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--record-dir", help="with --spawn-server: save the played games as game records")
+    args = parser.parse_args()
+
+    if args.clients % 2:
+        parser.error("--clients must be even (the server pairs connections into games)")
+
+    server = None
+    server_pid = args.server_pid
+    if args.spawn_server:
+        server = spawn_server(args.host, args.port, args.spectator_port, args.record_dir)
+        server_pid = server.pid
+
+    try:
+        print_report(run_load_test(args.host, args.port, args.clients, args.max_moves, args.seed, server_pid))
+    finally:
+        if server is not None:
+            if args.record_dir:
+                time.sleep(1)  # game threads save their records right after the final END
+            server.terminate()
+            server.wait()
@@ -47,6 +47,12 @@ def main():
         client_game = ClientSideGame(None)
         client_game.run()
 
+    def watch_game():
+        print("Watch game selected")
+        from client import ClientSideGame
+        client_game = ClientSideGame(None, spectate=True)
+        client_game.run()
+
     def offline_game():
         print("Offline game with friend selected")
         from offline_game import Game
@@ -66,23 +72,28 @@ def main():
     button_width = 300
     button_height = 60
     button_margin = 20
-    start_y = (Settings.WINDOW_HEIGHT - (4 * button_height + 3 * button_margin)) // 2
+    start_y = (Settings.WINDOW_HEIGHT - (5 * button_height + 4 * button_margin)) // 2
 
     buttons = [
         Button("Online Game",
                (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y, button_width, button_height),
                online_game),
-        Button("Offline Game with Friend",
+        Button("Watch Online Game",
                (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + (button_height + button_margin), button_width,
                 button_height),
+               watch_game),
+        Button("Offline Game with Friend",
+               (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + 2 * (button_height + button_margin),
+                button_width,
+                button_height),
                offline_game),
         Button("Play vs Computer",
-               (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + 2 * (button_height + button_margin),
+               (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + 3 * (button_height + button_margin),
                 button_width,
                 button_height),
                vs_computer),
         Button("Exit",
-               (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + 3 * (button_height + button_margin),
+               (Settings.WINDOW_WIDTH // 2 - button_width // 2, start_y + 4 * (button_height + button_margin),
                 button_width,
                 button_height),
                exit_action),
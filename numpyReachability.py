@@ -0,0 +1,128 @@
+"""
+Optional NumPy-backed reachability kernel for large boards.
+
+Vertices (x, y, i) are mapped to dense integer ids, a player's edge set is
+turned into CSR arrays, and BFS is run for all OUT sources at once: each
+vertex carries a bitmask of the sources that reached it, and every step
+expands the whole frontier with vectorized gathers and OR-reductions.
+
+NumPy is optional. Without it, HAS_NUMPY is False and GameLogic keeps
+using the pure-Python queries of graphAlgorithms.
+"""
+import itertools
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency
+    np = None
+
+HAS_NUMPY = np is not None
+
+# Below this many vertices converting the edge set to arrays costs more than
+# the pure-Python BFS it replaces. Measured crossover is around 21x21 for
+# check_all_outs_reach_all_ins over players_pairs ∪ available_pairs; a 9x9
+# board (162 vertices) never uses it. Move validation never does either: its
+# masked BFS over the Board's successor masks beats the kernel at every size.
+MIN_VERTICES = 2000
+
+
+def use_kernel(vertex_count):
+    """True if the vectorized kernel should be used for a board of this size."""
+    return HAS_NUMPY and vertex_count >= MIN_VERTICES
+
+
+def _vertex_ids(coords, cols):
+    """coords: int array of shape (n, 3) with (x, y, i) rows -> dense ids."""
+    return (coords[:, 1] * cols + coords[:, 0]) * 2 + (coords[:, 2] > 0)
+
+
+def sorted_edge_arrays(E, cols):
+    """
+    Converts an iterable of ((x1, y1, i1), (x2, y2, i2)) edges to two arrays
+    (src, dst) of dense vertex ids, sorted by src. reach_bits turns them into
+    CSR form: with indptr = searchsorted(src, arange(vertex_count + 1)), the
+    successors of vertex v are dst[indptr[v]:indptr[v + 1]].
+    """
+    count = len(E)
+    coords = itertools.chain.from_iterable(itertools.chain.from_iterable(E))
+    flat = np.fromiter(coords, dtype=np.int64, count=6 * count).reshape(count, 6)
+    src = _vertex_ids(flat[:, :3], cols)
+    dst = _vertex_ids(flat[:, 3:], cols)
+
+    order = np.argsort(src, kind="stable")
+    return src[order], dst[order]
+
+
+def reach_bits(src, dst, sources, vertex_count, targets=None):
+    """
+    Batched BFS from up to 64 sources at once, over the edges (src, dst) of
+    sorted_edge_arrays.
+
+    Returns a uint64 array with one entry per vertex whose bit j is set if
+    sources[j] reaches that vertex. Only edges leaving the current frontier
+    are touched per step; the sources' frontiers are merged per vertex by
+    OR-ing their bits. If targets is given, stops as soon as every source
+    reaches every target.
+    """
+    k = len(sources)
+    full = np.uint64((1 << k) - 1)
+    indptr = np.searchsorted(src, np.arange(vertex_count + 1))
+
+    reach = np.zeros(vertex_count, dtype=np.uint64)
+    np.bitwise_or.at(reach, sources, np.left_shift(np.uint64(1), np.arange(k, dtype=np.uint64)))
+    frontier = np.unique(sources)
+    frontier_bits = reach[frontier]
+
+    while len(frontier):
+        if targets is not None and (reach[targets] == full).all():
+            break
+
+        # all edges leaving the frontier, each carrying its source's bits
+        counts = indptr[frontier + 1] - indptr[frontier]
+        total = counts.sum()
+        if not total:
+            break
+        offsets = np.repeat(indptr[frontier] - np.cumsum(counts) + counts, counts)
+        edge_ids = offsets + np.arange(total)
+        hit = dst[edge_ids]
+        bits = np.repeat(frontier_bits, counts)
+
+        # merge bits arriving at the same vertex, keep only newly reached ones
+        order = np.argsort(hit, kind="stable")
+        hit = hit[order]
+        starts = np.flatnonzero(np.concatenate(([True], hit[1:] != hit[:-1])))
+        frontier = hit[starts]
+        frontier_bits = np.bitwise_or.reduceat(bits[order], starts) & ~reach[frontier]
+
+        changed = frontier_bits != 0
+        frontier = frontier[changed]
+        frontier_bits = frontier_bits[changed]
+        reach[frontier] |= frontier_bits
+
+    return reach
+
+
+def all_outs_reach_all_ins(E, S, cols, rows):
+    """Vectorized equivalent of GameLogic.check_all_outs_reach_all_ins."""
+    outs = list({v for v in S if v[2] == 1})
+    ins = [v for v in S if v[2] == -1]
+
+    if not ins:
+        return True
+    if not outs:
+        return False
+    if not E:
+        return False  # an OUT vertex never is an IN vertex
+
+    vertex_count = rows * cols * 2
+    in_ids = _vertex_ids(np.array(ins, dtype=np.int64), cols)
+    src, dst = sorted_edge_arrays(E, cols)
+
+    # one BFS pass per batch of 64 sources (a board has a handful of OUTs)
+    for first in range(0, len(outs), 64):
+        batch = outs[first:first + 64]
+        out_ids = _vertex_ids(np.array(batch, dtype=np.int64), cols)
+        reach = reach_bits(src, dst, out_ids, vertex_count, targets=in_ids)
+        if not (reach[in_ids] == np.uint64((1 << len(batch)) - 1)).all():
+            return False
+    return True
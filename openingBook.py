@@ -0,0 +1,228 @@
+"""
+Opening book and solved endgames in a memory-mapped file.
+
+Every game on the standard 9x9 board starts from the same position, so the
+first moves are searched once, offline, and stored by position hash
+(positionHash.py); so are positions near the end of recorded games that the
+search can prove won or lost. Bots and hint workers look positions up
+instead of searching:
+
+    book = OpeningBook.open()                   # the standard book, None if it isn't built
+    entry = book.lookup(board, turn)            # BookEntry or None
+    GameSearch(game_logic, book=book).run()     # answers from the book when it can
+
+    python openingBook.py --records benchmarks/games/9x9 --plies 6 --time 2
+
+File layout (little endian): a 32-byte header
+    magic "DOTBOOK1", rows u8, cols u8, reserved u16, record count u32,
+    hash of the starting position u64, reserved u64
+then one 16-byte record per position, sorted by hash:
+    hash u64, move u32, score i16, depth u8, flags u8
+The file is mapped, not read: a lookup is a binary search over the records
+that unpacks about a dozen of them.
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+
+from settings import Settings
+from gameRecord import GameRecord, load_records
+from gameSearch import GameSearch, WIN_SCORE, MAX_DEPTH
+from positionHash import position_hash
+
+BOOK_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books", "standard_9x9.book")
+
+MAGIC = b"DOTBOOK1"
+HEADER = struct.Struct("<8sBBHIQ8x")
+RECORD = struct.Struct("<QIhBB")
+HASH = struct.Struct("<Q")
+
+SOLVED = 1  # flags: score is exact, in plies to the end (> 0: the player to move wins)
+
+
+# --------------------------
+# MOVE PACKING
+# --------------------------
+
+def pack_move(move):
+    """("edge", ((x1, y1), (x2, y2))) / ("conquer", (x, y)) -> u32: conquer bit 20, x1 y1 x2 y2 in 5 bits each."""
+    kind, target = move
+    if kind == "edge":
+        (x1, y1), (x2, y2) = target
+        return x1 | y1 << 5 | x2 << 10 | y2 << 15
+    x, y = target
+    return 1 << 20 | x | y << 5
+
+
+def unpack_move(packed):
+    x1, y1, x2, y2 = packed & 31, packed >> 5 & 31, packed >> 10 & 31, packed >> 15 & 31
+    if packed >> 20 & 1:
+        return "conquer", (x1, y1)
+    return "edge", ((x1, y1), (x2, y2))
+
+
+class BookEntry:
+    def __init__(self, move, score, depth, solved):
+        self.move = move
+        self.score = score  # solved: plies to the end, signed; otherwise the search score
+        self.depth = depth  # plies searched to find the move
+        self.solved = solved
+
+    def search_score(self):
+        """The score as GameSearch reports it."""
+        if not self.solved:
+            return self.score
+        return WIN_SCORE - self.score if self.score > 0 else -WIN_SCORE - self.score
+
+    def __repr__(self):
+        return f"BookEntry(move={self.move}, score={self.score}, depth={self.depth}, solved={self.solved})"
+
+
+# --------------------------
+# READING
+# --------------------------
+
+class OpeningBook:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path}: not an opening book")
+        magic, self.rows, self.cols, _, self.count, self.start_hash = HEADER.unpack_from(self.map, 0)
+        if magic != MAGIC or len(self.map) != HEADER.size + self.count * RECORD.size:
+            raise ValueError(f"{path}: not an opening book")
+        self.path = path
+
+    @classmethod
+    def open(cls, path=BOOK_PATH):
+        """The book at path, or None if there is none."""
+        if not os.path.exists(path):
+            return None
+        return cls(path)
+
+    def close(self):
+        self.map.close()
+
+    def lookup(self, board, turn):
+        """BookEntry for a Board or BoardSnapshot with `turn` to move, or None."""
+        if (board.rows, board.cols) != (self.rows, self.cols):
+            return None
+        key = position_hash(board, turn)
+
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            h = HASH.unpack_from(self.map, HEADER.size + mid * RECORD.size)[0]
+            if h < key:
+                lo = mid + 1
+            elif h > key:
+                hi = mid
+            else:
+                _, move, score, depth, flags = RECORD.unpack_from(self.map, HEADER.size + mid * RECORD.size)
+                return BookEntry(unpack_move(move), score, depth, bool(flags & SOLVED))
+        return None
+
+
+# --------------------------
+# WRITING
+# --------------------------
+
+def write_book(path, rows, cols, start_hash, entries):
+    """entries: {position hash: BookEntry}."""
+    data = bytearray(HEADER.size + len(entries) * RECORD.size)
+    HEADER.pack_into(data, 0, MAGIC, rows, cols, 0, len(entries), start_hash)
+    for i, h in enumerate(sorted(entries)):
+        entry = entries[h]
+        RECORD.pack_into(data, HEADER.size + i * RECORD.size, h, pack_move(entry.move),
+                         max(-32768, min(32767, entry.score)), min(entry.depth, 255), SOLVED if entry.solved else 0)
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    # write-then-rename, so a bot mapping the old file never sees a half-written one
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+def solve(game_logic, depth, time_limit):
+    """Searches a position: BookEntry, or None if the player to move has no legal move."""
+    result = GameSearch(game_logic).run(depth, time_limit)
+    if result.move is None:
+        return None
+    if abs(result.score) >= WIN_SCORE - MAX_DEPTH:
+        plies = WIN_SCORE - abs(result.score)
+        return BookEntry(result.move, plies if result.score > 0 else -plies, result.depth, True)
+    return BookEntry(result.move, result.score, result.depth, False)
+
+
+def build(records, plies, endgame_plies, depth, time_limit):
+    """
+    {position hash: BookEntry} for:
+      - the opening: the starting position, the first `plies` positions of
+        every record and the book's own line (the best move, played on) up
+        to the same ply, so two bots using the book stay in it
+      - endgames: the last `endgame_plies` positions of every won record,
+        kept only when the search proves the result
+    """
+    entries = {}
+    start = GameRecord(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
+
+    lines = [GameRecord(start.rows, start.cols, start.players_original_dots, moves=record.moves[:ply])
+             for record in records for ply in range(min(plies, len(record.moves)))]
+    lines.append(start)
+    while lines:
+        line = lines.pop()
+        game_logic = line.replay()
+        h = position_hash(game_logic.board_obj, game_logic.turn)
+        if h in entries:
+            continue
+        entry = solve(game_logic, depth, time_limit)
+        if entry is None:
+            continue
+        entries[h] = entry
+        print(f"BOOK: ply {len(line.moves):2} {entry}")
+        if len(line.moves) + 1 < plies and not entry.solved:
+            lines.append(GameRecord(line.rows, line.cols, line.players_original_dots,
+                                    moves=line.moves + [(game_logic.turn,) + entry.move]))
+
+    for record in records:
+        if record.winner is None:
+            continue
+        for ply in range(max(0, len(record.moves) - endgame_plies), len(record.moves)):
+            game_logic = record.replay(ply)
+            h = position_hash(game_logic.board_obj, game_logic.turn)
+            if h in entries:
+                continue
+            entry = solve(game_logic, MAX_DEPTH, time_limit)
+            if entry is not None and entry.solved:
+                entries[h] = entry
+                print(f"BOOK: endgame ply {ply} {entry}")
+
+    return entries
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the opening book of the standard 9x9 layout")
+    parser.add_argument("--records", nargs="*", default=[], help="directories of recorded 9x9 games")
+    parser.add_argument("--plies", type=int, default=6, help="opening depth covered by the book")
+    parser.add_argument("--endgame-plies", type=int, default=6, help="positions before the end of won records to solve")
+    parser.add_argument("--depth", type=int, default=MAX_DEPTH, help="search depth per opening position")
+    parser.add_argument("--time", type=float, default=2.0, help="search time per position in seconds")
+    parser.add_argument("--out", default=BOOK_PATH)
+    args = parser.parse_args()
+
+    standard = GameRecord(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
+    records = [
+        record for directory in args.records for record in load_records(directory)
+        if (record.rows, record.cols, record.players_original_dots)
+        == (standard.rows, standard.cols, standard.players_original_dots)
+    ]
+    started = time.perf_counter()
+    entries = build(records, args.plies, args.endgame_plies, args.depth, args.time)
+    start_logic = standard.replay()
+    write_book(args.out, standard.rows, standard.cols,
+               position_hash(start_logic.board_obj, start_logic.turn), entries)
+    print(f"BOOK: {len(entries)} positions from {len(records)} records written to {args.out} "
+          f"in {time.perf_counter() - started:.0f} s")
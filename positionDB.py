@@ -0,0 +1,407 @@
+"""
+Memory-mapped database of board positions, for analysis tools.
+
+Every position is one fixed-size record of bitmaps: each player's edges,
+the available edges, the dots each player conquered and the original dots.
+A sorted index by position hash (positionHash.py) follows the records.
+Records are read in place from the mapped file. A PositionView wraps one
+record with the attributes of a BoardSnapshot (players_pairs,
+available_pairs, conquer_dots, ...), backed by the record's bits rather than
+Python sets, so scanning millions of positions doesn't rebuild any Board:
+
+    with PositionWriter("games.posdb", 9, 9) as writer:
+        writer.add(board, turn, game=7, ply=12)   # a Board or BoardSnapshot
+
+    db = PositionDB("games.posdb")
+    view = db[12345]                              # PositionView
+    (4, 4) in view.empty_dots, len(view.players_pairs["r"])
+    game_logic.check_moves(candidates, snapshot=view)
+    db.find(board, turn)                          # views of the same position
+
+    python positionDB.py benchmarks/games/9x9 --out games.posdb
+
+File layout (little endian): a 32-byte header
+    magic "DOTPOSDB", rows u8, cols u8, reserved u16, record count u32,
+    record size u32, reserved
+then `count` records of `record size` bytes:
+    hash u64, game u32, ply u16, turn u8 (0: PLAYER1), reserved u8,
+    edge bitmaps of PLAYER1, PLAYER2 and the available edges,
+    dot bitmaps of the dots PLAYER1 and PLAYER2 conquered,
+    vertex bitmaps of PLAYER1's and PLAYER2's original dots
+and then the index: `count` entries of hash u64, record u32, reserved u32,
+sorted by hash. Bit i of an edge / dot / vertex bitmap stands for the i-th
+edge / dot / vertex of RecordLayout.
+"""
+import argparse
+import mmap
+import os
+import struct
+import time
+from collections.abc import Set
+from types import MappingProxyType
+
+from settings import Settings
+from gameLogic import BoardGeometry
+from gameRecord import load_records
+from positionHash import position_hash
+
+MAGIC = b"DOTPOSDB"
+HEADER = struct.Struct("<8sBBHII12x")
+RECORD_HEAD = struct.Struct("<QIHBx")
+INDEX_ENTRY = struct.Struct("<QI4x")
+HASH = struct.Struct("<Q")
+
+PLAYERS = [Settings.PLAYER1, Settings.PLAYER2]
+
+
+class RecordLayout:
+    """The bit numbering and record offsets of one board size, built once (like BoardGeometry)."""
+
+    sizes = {}  # (rows, cols) -> RecordLayout
+
+    def __init__(self, rows, cols):
+        geometry = BoardGeometry.of(rows, cols)
+        self.edges = tuple(sorted(geometry.edge_bits))
+        self.dots = tuple(sorted(geometry.vertices))
+        self.vertices = tuple(v for x in range(cols) for y in range(rows) for v in geometry.vertices[(x, y)])
+        self.edge_index = {edge: i for i, edge in enumerate(self.edges)}
+        self.dot_index = {dot: i for i, dot in enumerate(self.dots)}
+        self.vertex_index = {vertex: i for i, vertex in enumerate(self.vertices)}
+        self.all_dots = (1 << len(self.dots)) - 1
+
+        edge_bytes = (len(self.edges) + 7) // 8
+        dot_bytes = (len(self.dots) + 7) // 8
+        vertex_bytes = (len(self.vertices) + 7) // 8
+
+        # (offset, size) of every bitmap in a record
+        offset = RECORD_HEAD.size
+        self.player_edges = {}
+        for player in PLAYERS:
+            self.player_edges[player] = (offset, edge_bytes)
+            offset += edge_bytes
+        self.available_edges = (offset, edge_bytes)
+        offset += edge_bytes
+        self.conquered = {}
+        for player in PLAYERS:
+            self.conquered[player] = (offset, dot_bytes)
+            offset += dot_bytes
+        self.originals = {}
+        for player in PLAYERS:
+            self.originals[player] = (offset, vertex_bytes)
+            offset += vertex_bytes
+        self.record_size = (offset + 7) // 8 * 8  # records stay 8-byte aligned
+
+    @classmethod
+    def of(cls, rows, cols):
+        layout = cls.sizes.get((rows, cols))
+        if layout is None:
+            layout = cls.sizes[(rows, cols)] = cls(rows, cols)
+        return layout
+
+    def pack(self, board, turn, game, ply):
+        """The record of a Board or BoardSnapshot with `turn` to move."""
+        record = bytearray(self.record_size)
+        RECORD_HEAD.pack_into(record, 0, position_hash(board, turn), game, ply, PLAYERS.index(turn))
+        for player in PLAYERS:
+            _put(record, self.player_edges[player], _mask(self.edge_index, board.players_pairs[player]))
+            _put(record, self.conquered[player], _mask(self.dot_index, board.conquer_dots[player]))
+            _put(record, self.originals[player], _mask(self.vertex_index, board.players_original_dots[player]))
+        _put(record, self.available_edges, _mask(self.edge_index, board.available_pairs))
+        return record
+
+
+def _mask(index, items):
+    mask = 0
+    for item in items:
+        mask |= 1 << index[item]
+    return mask
+
+
+def _put(record, field, mask):
+    offset, size = field
+    record[offset:offset + size] = mask.to_bytes(size, "little")
+
+
+# --------------------------
+# READ-ONLY VIEWS
+# --------------------------
+
+class BitSet(Set):
+    """
+    Read-only set of the items whose bit is set in `mask` (bit i: items[i]).
+    Membership is a bit test and nothing is materialized until iterated;
+    set operations (|, &, -) return frozensets.
+    """
+
+    __slots__ = ("mask", "items", "index")
+
+    def __init__(self, mask, items, index):
+        self.mask = mask
+        self.items = items
+        self.index = index
+
+    def __contains__(self, item):
+        i = self.index.get(item)
+        return i is not None and self.mask >> i & 1 == 1
+
+    def __iter__(self):
+        mask, items = self.mask, self.items
+        while mask:
+            low = mask & -mask
+            yield items[low.bit_length() - 1]
+            mask ^= low
+
+    def __len__(self):
+        return self.mask.bit_count()
+
+    # equal to a frozenset of the same items (Set.__eq__), so it must hash like one too
+    __hash__ = Set._hash
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return frozenset(iterable)
+
+    def __repr__(self):
+        return f"BitSet({set(self)})"
+
+
+class PositionView:
+    """
+    One record of a PositionDB, read in place. Same attribute names as
+    BoardSnapshot, so it can be passed wherever a snapshot is read
+    (GameLogic.check_moves, position_hash, AnalysisWorker.analyze);
+    version is the record's number. Collections are BitSets over the
+    record's bitmaps, decoded on every attribute access: keep the
+    attribute, not the view, when reading one many times.
+    """
+
+    __slots__ = ("db", "number", "offset")
+
+    def __init__(self, db, number):
+        self.db = db
+        self.number = number
+        self.offset = HEADER.size + number * db.layout.record_size
+
+    def _mask(self, field):
+        offset, size = field
+        start = self.offset + offset
+        return int.from_bytes(self.db.buffer[start:start + size], "little")
+
+    def _head(self):
+        return RECORD_HEAD.unpack_from(self.db.map, self.offset)
+
+    @property
+    def rows(self):
+        return self.db.rows
+
+    @property
+    def cols(self):
+        return self.db.cols
+
+    @property
+    def version(self):
+        return self.number
+
+    @property
+    def hash(self):
+        return self._head()[0]
+
+    @property
+    def game(self):
+        return self._head()[1]
+
+    @property
+    def ply(self):
+        return self._head()[2]
+
+    @property
+    def turn(self):
+        return PLAYERS[self._head()[3]]
+
+    @property
+    def all_points(self):
+        return self.db.layout.vertices
+
+    @property
+    def players_original_dots(self):
+        layout = self.db.layout
+        return MappingProxyType({
+            p: BitSet(self._mask(layout.originals[p]), layout.vertices, layout.vertex_index) for p in PLAYERS
+        })
+
+    @property
+    def players_pairs(self):
+        layout = self.db.layout
+        return MappingProxyType({
+            p: BitSet(self._mask(layout.player_edges[p]), layout.edges, layout.edge_index) for p in PLAYERS
+        })
+
+    @property
+    def available_pairs(self):
+        layout = self.db.layout
+        return BitSet(self._mask(layout.available_edges), layout.edges, layout.edge_index)
+
+    @property
+    def conquer_dots(self):
+        layout = self.db.layout
+        return MappingProxyType({
+            p: BitSet(self._mask(layout.conquered[p]), layout.dots, layout.dot_index) for p in PLAYERS
+        })
+
+    @property
+    def empty_dots(self):
+        layout = self.db.layout
+        conquered = self._mask(layout.conquered[Settings.PLAYER1]) | self._mask(layout.conquered[Settings.PLAYER2])
+        return BitSet(layout.all_dots & ~conquered, layout.dots, layout.dot_index)
+
+    def __repr__(self):
+        return f"PositionView(#{self.number}, game={self.game}, ply={self.ply}, turn={self.turn})"
+
+
+# --------------------------
+# READING
+# --------------------------
+
+class PositionDB:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self.map) < HEADER.size:
+            raise ValueError(f"{path}: not a position database")
+        magic, self.rows, self.cols, _, self.count, record_size = HEADER.unpack_from(self.map, 0)
+        self.layout = RecordLayout.of(self.rows, self.cols)
+        size = HEADER.size + self.count * (record_size + INDEX_ENTRY.size)
+        if magic != MAGIC or record_size != self.layout.record_size or len(self.map) != size:
+            raise ValueError(f"{path}: not a position database")
+        self.buffer = memoryview(self.map)  # slices of it don't copy
+        self.index_offset = HEADER.size + self.count * record_size
+        self.path = path
+
+    def close(self):
+        self.buffer.release()
+        self.map.close()
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, number):
+        if not 0 <= number < self.count:
+            raise IndexError(number)
+        return PositionView(self, number)
+
+    def __iter__(self):
+        for number in range(self.count):
+            yield PositionView(self, number)
+
+    def lookup(self, key):
+        """Views of every record whose position hashes to `key`, in record order."""
+        lo, hi = 0, self.count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if HASH.unpack_from(self.map, self.index_offset + mid * INDEX_ENTRY.size)[0] < key:
+                lo = mid + 1
+            else:
+                hi = mid
+
+        views = []
+        for i in range(lo, self.count):
+            h, number = INDEX_ENTRY.unpack_from(self.map, self.index_offset + i * INDEX_ENTRY.size)
+            if h != key:
+                break
+            views.append(PositionView(self, number))
+        return views
+
+    def find(self, board, turn):
+        """Views of every record of the position of a Board or BoardSnapshot with `turn` to move."""
+        if (board.rows, board.cols) != (self.rows, self.cols):
+            return []
+        return self.lookup(position_hash(board, turn))
+
+
+# --------------------------
+# WRITING
+# --------------------------
+
+class PositionWriter:
+    """
+    Appends positions of one board size to a new database at `path`.
+    Records go straight to a temporary file; close() appends the index and
+    renames it into place, so readers never map a half-written database.
+    """
+
+    def __init__(self, path, rows, cols):
+        self.path = path
+        self.rows = rows
+        self.cols = cols
+        self.layout = RecordLayout.of(rows, cols)
+        self.index = []  # (hash, record number)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.tmp_path = path + ".tmp"
+        self.file = open(self.tmp_path, "wb")
+        self.file.write(bytes(HEADER.size))  # filled in by close()
+
+    def add(self, board, turn, game=0, ply=0):
+        """Appends a Board or BoardSnapshot with `turn` to move; returns its record number."""
+        record = self.layout.pack(board, turn, game, ply)
+        number = len(self.index)
+        self.index.append((RECORD_HEAD.unpack_from(record, 0)[0], number))
+        self.file.write(record)
+        return number
+
+    def close(self):
+        self.index.sort()
+        entries = bytearray(len(self.index) * INDEX_ENTRY.size)
+        for i, (h, number) in enumerate(self.index):
+            INDEX_ENTRY.pack_into(entries, i * INDEX_ENTRY.size, h, number)
+        self.file.write(entries)
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, self.rows, self.cols, 0, len(self.index), self.layout.record_size))
+        self.file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.tmp_path)
+
+
+def add_record(writer, record, game):
+    """Appends every position of a GameRecord, from the start to the final one."""
+    game_logic = record.new_game()
+    board = game_logic.board_obj
+    writer.add(board, game_logic.turn, game, 0)
+    for ply, (player, kind, move) in enumerate(record.moves, 1):
+        game_logic.turn = player
+        if kind == "edge":
+            game_logic.make_move(move)
+        else:
+            game_logic.make_conquer_move(move)
+        game_logic.turn = game_logic.next_turn()
+        writer.add(board, game_logic.turn, game, ply)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Store every position of recorded games in a position database")
+    parser.add_argument("directories", nargs="+", help="directories of GameRecord JSON files")
+    parser.add_argument("--out", required=True, help="database to write")
+    args = parser.parse_args()
+
+    records = [record for directory in args.directories for record in load_records(directory)]
+    if not records:
+        parser.error("no game records found")
+    rows, cols = records[0].rows, records[0].cols
+    started = time.perf_counter()
+    with PositionWriter(args.out, rows, cols) as writer:
+        for game, record in enumerate(records):
+            if (record.rows, record.cols) != (rows, cols):
+                print(f"POSDB: skipping game {game}: {record.rows}x{record.cols}, not {rows}x{cols}")
+                continue
+            add_record(writer, record, game)
+        count = len(writer.index)
+    print(f"POSDB: {count} positions of {len(records)} games written to {args.out} "
+          f"in {time.perf_counter() - started:.1f} s")
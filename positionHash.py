@@ -0,0 +1,57 @@
+"""
+Zobrist hashes of game positions, the keys of the opening book
+(openingBook.py).
+
+A position is who owns each edge, which dots each player conquered and
+whose turn it is. The available edges are the ones nobody owns and the
+internal in<->out edges follow from the conquered dots, so neither is
+hashed. Every (player, directed edge), (player, dot) and the second
+player's turn get a fixed random 64-bit key, and a position hashes to the
+XOR of its keys. The keys come from a seeded generator, so a hash is the
+same in every process and files keyed by hashes stay valid.
+"""
+import random
+
+from settings import Settings
+from gameLogic import BoardGeometry
+
+SEED = "zobrist-v1"
+
+
+class ZobristKeys:
+    """The random keys of one board size, built once (like BoardGeometry)."""
+
+    sizes = {}  # (rows, cols) -> ZobristKeys
+
+    def __init__(self, rows, cols):
+        rng = random.Random(f"{SEED}-{rows}x{cols}")
+        geometry = BoardGeometry.of(rows, cols)
+        players = [Settings.PLAYER1, Settings.PLAYER2]
+
+        # edges between dots only; internal edges look up as 0
+        edges = sorted(edge for edge in geometry.edge_bits if edge[0][:2] != edge[1][:2])
+        self.edges = {player: {edge: rng.getrandbits(64) for edge in edges} for player in players}
+        self.dots = {player: {dot: rng.getrandbits(64) for dot in sorted(geometry.vertices)} for player in players}
+        self.turn = {Settings.PLAYER1: 0, Settings.PLAYER2: rng.getrandbits(64)}
+
+    @classmethod
+    def of(cls, rows, cols):
+        keys = cls.sizes.get((rows, cols))
+        if keys is None:
+            keys = cls.sizes[(rows, cols)] = cls(rows, cols)
+        return keys
+
+
+def position_hash(board, turn):
+    """Hash of a Board or BoardSnapshot with `turn` to move."""
+    keys = ZobristKeys.of(board.rows, board.cols)
+    h = keys.turn[turn]
+    for player, edges in board.players_pairs.items():
+        edge_keys = keys.edges[player]
+        for edge in edges:
+            h ^= edge_keys.get(edge, 0)
+    for player, dots in board.conquer_dots.items():
+        dot_keys = keys.dots[player]
+        for dot in dots:
+            h ^= dot_keys[dot]
+    return h
@@ -0,0 +1,230 @@
+"""
+Bulk statistics over recorded games, for balancing the starting layouts.
+
+Replays every GameRecord JSON file under the given directories (see
+gameRecord.py) across a process pool, re-validating each move the way the
+server does, and writes one row per game:
+
+    record, rows, cols, layout   - the record file, the board and the original dots
+    moves, edge_moves, conquer_moves, conquers_p1, conquers_p2
+    conquer_rate                 - conquer moves per move
+    winner, first_player_won     - first_player_won is empty (-1 in --columns) for undecided games
+    win_type                     - "connect": the winner joined its dots
+                                   "stalemate": undecided, the player to move had no legal move
+                                   "abandoned": undecided with legal moves left (quit, disconnect)
+                                   "invalid": a move failed validation; the replay stops there
+    check_seconds                - time spent in validate_edge / validate_conquer
+    replay_seconds               - time to replay the whole game
+
+Rows are streamed to CSV in file order as the workers finish them. --columns
+also writes every column as one array of a NumPy .npz file (NumPy is
+optional). A summary per layout (games, first-player win rate, mean length,
+conquer rate, win types) is printed at the end.
+
+    python recordAnalyzer.py benchmarks/games --csv games.csv
+    python recordAnalyzer.py records/ --jobs 8 --csv games.csv --columns games.npz
+"""
+import argparse
+import csv
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from settings import Settings
+from gameRecord import GameRecord
+
+try:
+    import numpy as np
+except ImportError:  # optional: only needed for --columns
+    np = None
+
+COLUMNS = [
+    "record", "rows", "cols", "layout", "moves", "edge_moves", "conquer_moves", "conquers_p1", "conquers_p2",
+    "conquer_rate", "winner", "first_player_won", "win_type", "check_seconds", "replay_seconds",
+]
+
+CHUNK_SIZE = 8  # games handed to a worker at a time
+
+
+# --------------------------
+# ONE GAME
+# --------------------------
+
+def layout_key(record):
+    """The starting layout as a short string, e.g. "r:2,2 5,4 2,6|b:6,2 3,4 6,6"."""
+    return "|".join(
+        f"{player}:" + " ".join(f"{x},{y}" for x, y in record.players_original_dots[player])
+        for player in [Settings.PLAYER1, Settings.PLAYER2]
+    )
+
+
+def analyze_record(record, name=""):
+    """Replays one GameRecord and returns its row: {column: value}."""
+    started = time.perf_counter()
+    game_logic = record.new_game()
+    check_seconds = 0.0
+    conquers = {Settings.PLAYER1: 0, Settings.PLAYER2: 0}
+    played = 0
+    valid = True
+
+    for player, kind, move in record.moves:
+        game_logic.turn = player
+        check_started = time.perf_counter()
+        if kind == "edge":
+            (x1, y1), (x2, y2) = move
+            result = game_logic.validate_edge((x1, y1, 1), (x2, y2, -1))
+        else:
+            result = game_logic.validate_conquer(move)
+        check_seconds += time.perf_counter() - check_started
+        if not result.legal:
+            valid = False
+            break
+
+        if kind == "edge":
+            game_logic.make_move(move)
+        else:
+            game_logic.make_conquer_move(move)
+            conquers[player] += 1
+        game_logic.turn = game_logic.next_turn()
+        played += 1
+
+    winner = game_logic.check_win() if valid else None
+    if not valid:
+        win_type = "invalid"
+    elif winner is not None:
+        win_type = "connect"
+    else:
+        b = game_logic.board_obj
+        candidates = [("edge", edge) for edge in b.available_pairs] + [("conquer", dot) for dot in b.empty_dots]
+        check_started = time.perf_counter()
+        stuck = not any(game_logic.check_moves(candidates))
+        check_seconds += time.perf_counter() - check_started
+        win_type = "stalemate" if stuck else "abandoned"
+
+    conquer_moves = conquers[Settings.PLAYER1] + conquers[Settings.PLAYER2]
+    return {
+        "record": name,
+        "rows": record.rows,
+        "cols": record.cols,
+        "layout": layout_key(record),
+        "moves": played,
+        "edge_moves": played - conquer_moves,
+        "conquer_moves": conquer_moves,
+        "conquers_p1": conquers[Settings.PLAYER1],
+        "conquers_p2": conquers[Settings.PLAYER2],
+        "conquer_rate": conquer_moves / played if played else 0.0,
+        "winner": winner or "",
+        "first_player_won": "" if winner is None else int(winner == Settings.PLAYER1),
+        "win_type": win_type,
+        "check_seconds": check_seconds,
+        "replay_seconds": time.perf_counter() - started,
+    }
+
+
+def analyze_file(path):
+    """Worker entry point: loads and analyzes one record file."""
+    return analyze_record(GameRecord.load(path), path)
+
+
+def record_files(directories):
+    """Every *.json file under the directories, sorted by path."""
+    paths = []
+    for directory in directories:
+        for root, _, names in os.walk(directory):
+            paths.extend(os.path.join(root, name) for name in names if name.endswith(".json"))
+    return sorted(paths)
+
+
+def analyze_files(paths, jobs):
+    """Yields the rows of the record files in order, replayed by `jobs` processes (1: in this process)."""
+    if jobs == 1:
+        yield from map(analyze_file, paths)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        yield from pool.map(analyze_file, paths, chunksize=CHUNK_SIZE)
+
+
+# --------------------------
+# AGGREGATION
+# --------------------------
+
+class LayoutSummary:
+    """Running totals of the games of one starting layout."""
+
+    def __init__(self):
+        self.games = 0
+        self.decided = 0
+        self.first_player_wins = 0
+        self.moves = 0
+        self.conquer_moves = 0
+        self.check_seconds = 0.0
+        self.win_types = {}
+
+    def add(self, row):
+        self.games += 1
+        self.moves += row["moves"]
+        self.conquer_moves += row["conquer_moves"]
+        self.check_seconds += row["check_seconds"]
+        self.win_types[row["win_type"]] = self.win_types.get(row["win_type"], 0) + 1
+        if row["first_player_won"] != "":
+            self.decided += 1
+            self.first_player_wins += row["first_player_won"]
+
+    def __repr__(self):
+        win_rate = f"{self.first_player_wins / self.decided:.1%}" if self.decided else "n/a"
+        return (f"{self.games} games, first player wins {win_rate} of {self.decided} decided, "
+                f"{self.moves / self.games:.1f} moves/game, "
+                f"conquer rate {self.conquer_moves / self.moves if self.moves else 0.0:.3f}, "
+                f"{self.check_seconds * 1000 / max(self.moves, 1):.3f} ms/check, {self.win_types}")
+
+
+def write_columns(path, columns):
+    """{column: [values]} -> one array per column in a .npz file."""
+    arrays = {}
+    for name, values in columns.items():
+        if name == "first_player_won":
+            arrays[name] = np.array([-1 if value == "" else value for value in values], dtype=np.int8)
+        else:
+            arrays[name] = np.array(values)
+    np.savez_compressed(path, **arrays)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded games in parallel and report per-game statistics")
+    parser.add_argument("directories", nargs="+", help="directories searched recursively for GameRecord JSON files")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (1: no pool)")
+    parser.add_argument("--csv", help="CSV file to stream the rows to (default: stdout)")
+    parser.add_argument("--columns", help=".npz file to write the columns to (needs NumPy)")
+    args = parser.parse_args()
+
+    if args.columns and np is None:
+        parser.error("--columns needs NumPy")
+    paths = record_files(args.directories)
+    if not paths:
+        parser.error("no game records found")
+
+    started = time.perf_counter()
+    out = open(args.csv, "w", newline="") if args.csv else sys.stdout
+    writer = csv.DictWriter(out, fieldnames=COLUMNS)
+    writer.writeheader()
+    columns = {name: [] for name in COLUMNS} if args.columns else None
+    summaries = {}
+    try:
+        for row in analyze_files(paths, args.jobs):
+            writer.writerow(row)
+            out.flush()
+            if columns is not None:
+                for name in COLUMNS:
+                    columns[name].append(row[name])
+            summaries.setdefault((row["rows"], row["cols"], row["layout"]), LayoutSummary()).add(row)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    if columns is not None:
+        write_columns(args.columns, columns)
+
+    log = sys.stderr if out is sys.stdout else sys.stdout
+    for (rows, cols, layout), summary in sorted(summaries.items()):
+        print(f"ANALYZE: {rows}x{cols} {layout}: {summary}", file=log)
+    print(f"ANALYZE: {len(paths)} games with {args.jobs} jobs in {time.perf_counter() - started:.1f} s", file=log)
@@ -1,28 +1,81 @@
+import argparse
+import contextlib
+import itertools
+import os
+import select
 import socket
 import threading
 import time
 from settings import Settings
-from gameLogic import GameLogic
+from ServerSettings import ServerSettings
+from gameLogic import ILLEGAL_MOVE
+from broadcaster import Broadcaster, GameChannel
+from gameRecord import GameRecord
+from boardPool import BoardPool
+from gcMonitor import GCMonitor
 
 
 class GameServer:
-    def __init__(self, host='localhost', port=Settings.PORT):
+    def __init__(self, host='localhost', port=Settings.PORT, spectator_port=Settings.SPECTATOR_PORT,
+                 record_dir=None, gc_tuning=False):
         self.host = host
         self.port = port
         self.server_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        # allow an immediate restart while closed game connections sit in TIME_WAIT
+        self.server_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
         self.server_socket.bind((self.host, self.port))
         print(f"SERVER: socket bound to {self.host}:{self.port}")
 
-        self.games = []  # [(player1_conn, player2_conn, game_logic)]
+        self.spectator_port = spectator_port
+        self.spectator_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.spectator_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.spectator_socket.bind((self.host, self.spectator_port))
+        print(f"SERVER: spectator socket bound to {self.host}:{self.spectator_port}")
+
+        self.games = {}  # game_id -> (player1_conn, player2_conn, game_logic, channel)
         self.lock = threading.Lock()  # for managing self.games
+        self.game_ids = itertools.count(1)
+
+        # one I/O thread drains the send queues of every player and spectator
+        self.broadcaster = Broadcaster()
+
+        # finished games' boards are reset and reused for new games
+        self.board_pool = BoardPool(
+            Settings.STANDARD_ROWS, Settings.STANDARD_COLS,
+            Settings.STANDARD_LAYOUT,
+            max_free=ServerSettings.BOARD_POOL_SIZE,
+            prewarm=ServerSettings.BOARD_POOL_PREWARM
+        )
+
+        # finished games are saved here as GameRecord JSON (None: don't record)
+        self.record_dir = record_dir
+        if record_dir:
+            os.makedirs(record_dir, exist_ok=True)
+
+        # --gc-tuning: GC thresholds, pause timing and per-move allocation samples
+        self.gc_monitor = None
+        if gc_tuning:
+            self.gc_monitor = GCMonitor(
+                ServerSettings.GC_THRESHOLDS,
+                ServerSettings.GC_ALLOC_SAMPLE_EVERY,
+                ServerSettings.GC_PAUSE_HISTORY
+            )
+            self.gc_monitor.install()
 
     def start(self):
         """
         Main server loop. Accepts pairs of players and starts a game for them.
         """
-        self.server_socket.listen(2)
+        if self.gc_monitor is not None:
+            # startup is done: keep the long-lived objects out of every future collection
+            frozen = self.gc_monitor.freeze()
+            print(f"SERVER: gc tuning on, thresholds {ServerSettings.GC_THRESHOLDS}, {frozen} objects frozen")
+
+        self.server_socket.listen(ServerSettings.LISTEN_BACKLOG)
         print(f"SERVER: listening on {self.host}:{self.port}")
 
+        threading.Thread(target=self.accept_spectators, daemon=True).start()
+
         while True:
             print("SERVER: waiting for 2 new players...")
 
@@ -34,8 +87,8 @@ class GameServer:
                     conn, addr = self.server_socket.accept()
                     print(f"SERVER: player connected from {addr}")
 
-                    # send player number (1 or 2)
-                    conn.sendall(f"WELCOME {len(current_game_clients) + 1}".encode())
+                    # send player number (1 or 2); every server message is newline-terminated
+                    conn.sendall(f"WELCOME {len(current_game_clients) + 1}\n".encode())
                     current_game_clients.append((conn, addr))
 
                 except Exception as e:
@@ -55,55 +108,138 @@ class GameServer:
             # the outer loop (while True) will restart,
             # ready to accept the next two players.
 
-    def broadcast(self, players, msg):
-        """Send message to both players."""
-        for conn in players.values():
+    def accept_spectators(self):
+        """
+        Accepts spectator connections on their own port.
+        Each spectator sends "WATCH" (latest game) or "WATCH <game_id>".
+        """
+        self.spectator_socket.listen(64)
+        print(f"SERVER: accepting spectators on {self.host}:{self.spectator_port}")
+
+        while True:
             try:
-                conn.sendall(msg.encode())
-            except:
-                # assume connection issues are handled in handle_game loop
+                conn, addr = self.spectator_socket.accept()
+            except Exception as e:
+                print(f"SERVER: Error accepting spectator: {e}")
+                time.sleep(0.2)
+                continue
+
+            # handshake in its own thread so a silent client can't stall accept()
+            threading.Thread(target=self.add_spectator, args=(conn, addr), daemon=True).start()
+
+    def add_spectator(self, conn, addr):
+        try:
+            conn.settimeout(ServerSettings.SPECTATOR_HANDSHAKE_TIMEOUT)
+            msg = conn.recv(1024).decode().strip()
+        except Exception as e:
+            print(f"SERVER: spectator {addr} handshake failed: {e}")
+            conn.close()
+            return
+
+        if not msg.startswith("WATCH"):
+            print(f"SERVER: spectator {addr} sent unexpected handshake: {msg}")
+            conn.close()
+            return
+
+        with self.lock:
+            game_id = None
+            try:
+                requested = msg[6:].strip()
+                game_id = int(requested) if requested else max(self.games)
+            except ValueError:
                 pass
+            game = self.games.get(game_id)
+
+        if game is None or game[3].join(conn, addr, f"WELCOME SPECTATOR {game_id}") is None:
+            try:
+                conn.sendall("END NO_GAME\n".encode())
+            except Exception:
+                pass
+            conn.close()
+            return
+
+        print(f"SERVER: spectator {addr} watching game {game_id}")
+
+    def broadcast(self, senders, msg, channel=None):
+        """
+        Queue message for both players and fan it out to the game's spectators.
+        Never blocks: the broadcaster's I/O thread does the actual sending, and
+        a player whose queue overflows is dropped (handled in handle_game loop).
+        """
+        self.broadcaster.publish(senders.values(), msg + "\n")
+        if channel is not None:
+            channel.publish(msg)
+
+    def recv_from(self, conn, senders):
+        """
+        Waits for the next message from conn (player sockets are non-blocking).
+        Raises ConnectionResetError as soon as any player of the game was dropped
+        by the send-queue overflow policy or a failed send.
+        """
+        while True:
+            if any(sub.dropped for sub in senders.values()):
+                raise ConnectionResetError("player dropped by send queue")
+            readable, _, _ = select.select([conn], [], [], 1.0)
+            if readable:
+                try:
+                    return conn.recv(1024)
+                except BlockingIOError:
+                    continue
 
     def start_game(self, player1, player2):
         conn1, addr1 = player1
         conn2, addr2 = player2
 
-        # setup game
-        game_logic = GameLogic(
-            9, 9,
-            {
-                Settings.PLAYER1: [(2, 2), (5, 4), (2, 6)],
-                Settings.PLAYER2: [(6, 2), (3, 4), (6, 6)]
-            }
-        )
+        # setup game: a recycled board at its starting position
+        game_logic = self.board_pool.acquire()
 
         players = {Settings.PLAYER1: conn1, Settings.PLAYER2: conn2}
+        channel = GameChannel(self.broadcaster)
 
-        # added safe lock, although currently not critical
+        # bounded outbound queue per player, drained by the broadcaster's I/O thread
+        senders = {
+            Settings.PLAYER1: self.broadcaster.add(
+                conn1, addr1, limit=ServerSettings.PLAYER_SEND_QUEUE_LIMIT, watch_eof=False),
+            Settings.PLAYER2: self.broadcaster.add(
+                conn2, addr2, limit=ServerSettings.PLAYER_SEND_QUEUE_LIMIT, watch_eof=False),
+        }
+
+        # lock: spectator threads look games up concurrently
         with self.lock:
-            self.games.append((conn1, conn2, game_logic))
+            game_id = next(self.game_ids)
+            self.games[game_id] = (conn1, conn2, game_logic, channel)
+        print(f"SERVER: game {game_id} started")
 
-        threading.Thread(target=self.handle_game, args=(players, game_logic), daemon=True).start()
+        threading.Thread(target=self.handle_game, args=(players, senders, game_logic, game_id, channel),
+                         daemon=True).start()
 
-    def handle_game(self, players, game_logic):
+    def handle_game(self, players, senders, game_logic, game_id=None, channel=None):
         # player 1 (P1) always starts
         game_logic.turn = Settings.PLAYER1
 
+        record = None
+        if self.record_dir:
+            b = game_logic.board_obj
+            record = GameRecord(b.rows, b.cols, {
+                player: [(x, y) for x, y, i in dots if i == 1]
+                for player, dots in b.players_original_dots.items()
+            })
+
         try:
             while True:
                 current_player = game_logic.turn
                 conn = players[current_player]
 
                 try:
-                    msg = conn.recv(1024).decode()
+                    msg = self.recv_from(conn, senders).decode()
                 except Exception:  # catches ConnectionResetError and other issues
                     print(f"SERVER: connection lost from P{current_player}")
-                    self.broadcast(players, "END DISCONNECTED")
+                    self.broadcast(senders, "END DISCONNECTED", channel)
                     break
 
                 if not msg:
                     print(f"SERVER: P{current_player} disconnected gracefully.")
-                    self.broadcast(players, "END DISCONNECTED")
+                    self.broadcast(senders, "END DISCONNECTED", channel)
                     break
 
                 msg = msg.strip()
@@ -111,37 +247,67 @@ class GameServer:
 
                 if msg.startswith("MOVE"):
                     move_data = msg[5:]  # remove "MOVE "
-                    success = self.apply_move_str(game_logic, move_data, current_player)
-                    if success:
+                    with self.gc_monitor.move() if self.gc_monitor is not None else contextlib.nullcontext():
+                        result = self.apply_move_str(game_logic, move_data, current_player)
+                    if result.legal:
                         # update all players
-                        self.broadcast(players, f"UPDATE {move_data}")
+                        self.broadcast(senders, f"UPDATE {move_data}", channel)
+                        if record is not None:
+                            record.add_wire_move(current_player, move_data)
+                        # both players' remaining edges to win, kept up to date incrementally by the board
+                        distances = {player: game_logic.distance_to_win(player) for player in players}
+                        print(f"SERVER: game {game_id} distance to win: {distances}")
 
                         # --- critical fix: update turn on server ---
                         game_logic.turn = game_logic.next_turn()
                     else:
-                        conn.sendall("INVALID_MOVE".encode())
+                        self.broadcaster.send(senders[current_player], "INVALID_MOVE\n")
+
+                    # No need for a full check_win: the board only changes on a legal move,
+                    # and a move can only complete the mover's own connectivity (edges are
+                    # added to the mover, conquers only remove opponent edges) - which
+                    # validation already computed.
+                    if result.wins:
+                        if record is not None:
+                            record.winner = current_player
+                        self.broadcast(senders, f"END {current_player}", channel)
+                        break
 
                 elif msg == "QUIT":
-                    self.broadcast(players, "END DISCONNECTED")
-                    break
-
-                # check win after move is applied and turn is updated
-                winner = game_logic.check_win()
-                if winner:
-                    self.broadcast(players, f"END {winner}")
+                    self.broadcast(senders, "END DISCONNECTED", channel)
                     break
 
         finally:
-            # clean up resources at the end of the game
-            for conn in players.values():
-                conn.close()
+            # clean up resources at the end of the game (after the final END is sent)
+            self.broadcaster.close_after_flush(senders.values())
+            for player, sub in senders.items():
+                print(f"SERVER: P{player} send queue: {sub.stats()}")
+            print(f"SERVER: send queues overall: {self.broadcaster.stats()}")
+            if channel is not None:
+                channel.close()
+            with self.lock:
+                self.games.pop(game_id, None)
+            if record is not None:
+                self.save_record(record, game_id)
+            self.board_pool.release(game_logic)
+            print(f"SERVER: board pool: {self.board_pool.stats()}")
+            if self.gc_monitor is not None:
+                print(f"SERVER: gc: {self.gc_monitor.stats()}")
             print("SERVER: game ended. Connections closed.")
-            # could also remove the game from self.games if desired
+
+    def save_record(self, record, game_id):
+        path = os.path.join(self.record_dir, f"game_{int(time.time())}_{game_id}.json")
+        try:
+            record.save(path)
+            print(f"SERVER: game {game_id} recorded to {path}")
+        except OSError as e:
+            print(f"SERVER: could not record game {game_id}: {e}")
 
     def apply_move_str(self, game_logic, move_str, player_id):
         """
         Parse move string from client and apply it to GameLogic.
         move_str format: "(x1,y1,layer1)->(x2,y2,layer2)" or "(x,y,layer)"
+        Returns the MoveCheck of the validation (ILLEGAL_MOVE if it couldn't be parsed).
         """
         move_str = move_str.replace("(", "").replace(")", "")
         if "->" in move_str:
@@ -152,13 +318,14 @@ class GameServer:
 
                 # gameLogic expects only (x,y), not layer
                 # check_edge_input expects full points (with 3 components)
-                if game_logic.check_edge_input(p1, p2):
+                result = game_logic.validate_edge(p1, p2)
+                if result.legal:
                     # make_move expects ((x1,y1), (x2,y2))
                     game_logic.make_move(((p1[0], p1[1]), (p2[0], p2[1])))
-                    return True
+                return result
             except Exception as e:
                 print(f"SERVER: Error parsing edge move '{move_str}': {e}")
-                return False
+                return ILLEGAL_MOVE
         else:
             try:
                 # --- critical fix here ---
@@ -168,15 +335,24 @@ class GameServer:
                 # gameLogic expects (x,y) only
                 p_xy = (p_with_layer[0], p_with_layer[1])
 
-                if game_logic.check_conquer_input(p_xy):
+                result = game_logic.validate_conquer(p_xy)
+                if result.legal:
                     game_logic.make_conquer_move(p_xy)
-                    return True
+                return result
             except Exception as e:
                 print(f"SERVER: Error parsing conquer move '{move_str}': {e}")
-                return False
-        return False
+                return ILLEGAL_MOVE
 
 
 if __name__ == "__main__":
-    server = GameServer()
+    parser = argparse.ArgumentParser(description="Game server")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=Settings.PORT)
+    parser.add_argument("--spectator-port", type=int, default=Settings.SPECTATOR_PORT)
+    parser.add_argument("--record-dir", help="save every finished game as a JSON game record")
+    parser.add_argument("--gc-tuning", action="store_true",
+                        help="tune and freeze the garbage collector, report GC pauses and sampled allocations per move")
+    args = parser.parse_args()
+
+    server = GameServer(args.host, args.port, args.spectator_port, args.record_dir, args.gc_tuning)
     server.start()  # this function now runs in an infinite loop
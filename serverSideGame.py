@@ -5,13 +5,7 @@ from settings import Settings
 class ServerSideGame:
     def __init__(self):
         # Initialize game logic
-        self.gameLogic = GameLogic(
-            9, 9,
-            {
-                Settings.PLAYER1: [(2, 2), (5, 4), (2, 6)],
-                Settings.PLAYER2: [(6, 2), (3, 4), (6, 6)]
-            }
-        )
+        self.gameLogic = GameLogic(Settings.STANDARD_ROWS, Settings.STANDARD_COLS, Settings.STANDARD_LAYOUT)
 
         self.board = self.gameLogic.board_obj
 
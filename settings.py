@@ -13,8 +13,22 @@ class Settings:
     PLAYERS_LINE_COLORS = {PLAYER1: (200, 20, 20), PLAYER2: (20, 20, 200)}
     PLAYER_MOUSE_ON_OBJECT_COLOR = {PLAYER1: (200, 60, 60), PLAYER2: (60, 60, 200)}
     ERROR_LINE_COLOR = (0, 0, 0)
+    HINT_COLOR = (0, 200, 120)
     PLAYER_POINT_RADIUS = 20
     EMPTY_POINT_RADIUS = 8
     POINT_COLOR = {PLAYER1: (255, 0, 0), PLAYER2: (0, 0, 255)}
 
+    # The standard game: board size and original dots (server, clients, opening book, benchmarks)
+    STANDARD_ROWS, STANDARD_COLS = 9, 9
+    STANDARD_LAYOUT = {
+        PLAYER1: [(2, 2), (5, 4), (2, 6)],
+        PLAYER2: [(6, 2), (3, 4), (6, 6)]
+    }
+
+    # Speculative hover prefetch on turn change
+    PREFETCH_RADIUS = 2  # in board cells from the cursor / last opponent move
+    PREFETCH_LIMIT = 48
+
     PORT = 12346
+    SPECTATOR_PORT = 12347
+    NET_POLL_TIMEOUT = 0.01  # network thread recv timeout; also bounds the delay before a queued move is sent
@@ -1,4 +1,35 @@
-def is_subset_strongly_connected(E, S):
+"""
+Randomized property checks for graphAlgorithms against the naive reference
+implementations it replaced (the original is_subset_strongly_connected of
+this file and the per-OUT BFS GameLogic used to run), and for GameLogic's
+incremental state over random games against the same answers computed from
+scratch.
+
+    python test.py [rounds] [seed]
+"""
+import os
+import random
+import sys
+import tempfile
+from collections import deque
+
+import graphAlgorithms
+import numpyReachability
+from settings import Settings
+from gameLogic import BoardGeometry, ConnectivityTracker, GameLogic
+from boardPool import BoardPool
+from gameSearch import WIN_SCORE, GameSearch, distance_eval
+from positionDB import PositionDB, PositionWriter
+from positionHash import position_hash
+
+PLAYERS = [Settings.PLAYER1, Settings.PLAYER2]
+
+
+# --------------------------
+# NAIVE REFERENCE VERSIONS
+# --------------------------
+
+def naive_is_subset_strongly_connected(E, S):
     # בניית adjacency list רק עבור S
     adj = {v: [] for v in S}
     for u, v in E:
@@ -24,36 +55,757 @@ def is_subset_strongly_connected(E, S):
     # כל ה-in חייבים להיות reachable לפחות מ-out אחד
     return all(in_v in reachable_ins for in_v in ins)
 
+
+def naive_all_outs_reach_all_ins(V, E, S):
+    adj = {v: [] for v in V}
+    for u, v in E:
+        adj.setdefault(u, []).append(v)
+
+    outs = [v for v in S if v[2] == 1]
+    ins = [v for v in S if v[2] == -1]
+
+    if not ins:
+        return True
+    if not outs:
+        return False
+
+    for out_v in outs:
+        visited = set()
+        queue = [out_v]
+
+        while queue:
+            node = queue.pop(0)
+            if node not in visited:
+                visited.add(node)
+                for nbr in adj.get(node, []):
+                    if nbr not in visited:
+                        queue.append(nbr)
+
+        if not all(in_v in visited for in_v in ins):
+            return False
+
+    return True
+
+
+def naive_reachable(adj, source):
+    visited = set()
+    queue = [source]
+    while queue:
+        node = queue.pop(0)
+        if node not in visited:
+            visited.add(node)
+            queue.extend(adj.get(node, []))
+    return visited
+
+
+def naive_distance_to_win(board, player):
+    """
+    Cheapest tree joining the player's original dots over its live dots (own
+    edges 0, available edges 1): a 0-1 BFS from every original dot, then the
+    best meeting dot for three of them, or Prim over the pairwise distances.
+    """
+    live = {(x, y) for (x, y), internal in board.geometry.internal_edges.items()
+            if internal[0] in board.players_pairs[player]}
+    adj = {dot: [] for dot in live}
+    for edges, cost in [(board.players_pairs[player], 0), (board.available_pairs, 1)]:
+        for u, v in edges:
+            a, c = (u[0], u[1]), (v[0], v[1])
+            if a != c and a in live and c in live:
+                adj[a].append((c, cost))
+
+    def bfs(source):
+        if source not in live:
+            return {}
+        dist, queue = {source: 0}, deque([source])
+        while queue:
+            dot = queue.popleft()
+            for nbr, cost in adj[dot]:
+                if dist[dot] + cost < dist.get(nbr, len(live) + 1):
+                    dist[nbr] = dist[dot] + cost
+                    if cost:
+                        queue.append(nbr)
+                    else:
+                        queue.appendleft(nbr)
+        return dist
+
+    terminals = [(x, y) for x, y, i in board.players_original_dots[player] if i == -1]
+    if len(terminals) <= 1:
+        return 0
+    maps = [bfs(terminal) for terminal in terminals]
+    if any(terminal not in dist for dist in maps for terminal in terminals):
+        return None
+    if len(terminals) == 3:
+        return min(sum(dist[dot] for dist in maps) for dot in live if all(dot in dist for dist in maps))
+
+    inside, total = {0}, 0
+    while len(inside) < len(terminals):
+        cost, j = min((maps[i][terminals[j]], j) for i in inside for j in range(len(terminals)) if j not in inside)
+        total += cost
+        inside.add(j)
+    return total
+
+
+def naive_negamax(game_logic, depth, ply=0):
+    """
+    Plain negamax with GameSearch's scoring rules and no pruning: a win
+    now scores WIN_SCORE - ply - 1, no legal move 0, depth 0 distance_eval.
+    """
+    if depth == 0:
+        return distance_eval(game_logic, game_logic.turn)
+    checks = [(move, validate(game_logic, move)) for move in candidate_moves(game_logic)]
+    legal = [move for move, check in checks if check.legal]
+    if not legal:
+        return 0
+    if any(check.wins for _, check in checks):
+        return WIN_SCORE - ply - 1
+
+    player, best = game_logic.turn, None
+    for move in legal:
+        play(game_logic, move)
+        game_logic.turn = game_logic.next_turn()
+        score = -naive_negamax(game_logic, depth - 1, ply + 1)
+        game_logic.turn = player
+        undo(game_logic, move, player)
+        best = score if best is None else max(best, score)
+    return best
+
+
+# --------------------------
+# RANDOM GRAPHS
+# --------------------------
+
+def random_graph(rng):
+    """
+    A random graph over the board's in/out vertex model: internal in<->out
+    edges (some missing, like conquered dots) plus random out->in edges,
+    mostly between grid neighbours.
+    """
+    cols, rows = rng.randint(1, 6), rng.randint(1, 6)
+    V = [(x, y, i) for x in range(cols) for y in range(rows) for i in [-1, 1]]
+    dots = [(x, y) for x in range(cols) for y in range(rows)]
+    density = rng.random()
+
+    E = set()
+    for x, y in dots:
+        if rng.random() < 0.9:
+            E.add(((x, y, -1), (x, y, 1)))
+            E.add(((x, y, 1), (x, y, -1)))
+    for x, y in dots:
+        for nx, ny in [(x + 1, y), (x, y + 1), (x - 1, y), (x, y - 1)]:
+            if (nx, ny) in dots and rng.random() < density:
+                E.add(((x, y, 1), (nx, ny, -1)))
+    for _ in range(rng.randint(0, 3)):
+        (x1, y1), (x2, y2) = rng.choice(dots), rng.choice(dots)
+        E.add(((x1, y1, 1), (x2, y2, -1)))
+
+    chosen = rng.sample(dots, rng.randint(0, min(len(dots), 4)))
+    S = [(x, y, i) for x, y in chosen for i in [-1, 1]]
+    if S and rng.random() < 0.2:
+        S.pop(rng.randrange(len(S)))  # a lone IN or OUT vertex
+    return V, sorted(E), S, cols, rows
+
+
+def dot_graph(rng):
+    """A random undirected graph of dots plus some terminal dots."""
+    n = rng.randint(1, 12)
+    graph = {v: set() for v in range(n)}
+    for a in range(n):
+        for b in range(a + 1, n):
+            if rng.random() < 0.3:
+                graph[a].add(b)
+                graph[b].add(a)
+    terminals = set(rng.sample(range(n), rng.randint(1, n)))
+    return graph, terminals
+
+
+def terminals_connected(graph, terminals, removed_edge=None, removed_dot=None):
+    adj = {
+        v: [w for w in nbrs if w != removed_dot and frozenset((v, w)) != removed_edge]
+        for v, nbrs in graph.items() if v != removed_dot
+    }
+    live = [t for t in terminals if t != removed_dot]
+    return not live or all(t in naive_reachable(adj, live[0]) for t in live)
+
+
+# --------------------------
+# RANDOM GAMES
+# --------------------------
+
+def random_game(rng, rows, cols):
+    """A GameLogic with two to four original dots per player at random places, P1 to move."""
+    per_player = rng.randint(2, 4)
+    dots = rng.sample([(x, y) for x in range(cols) for y in range(rows)], 2 * per_player)
+    game_logic = GameLogic(rows, cols, {Settings.PLAYER1: dots[:per_player], Settings.PLAYER2: dots[per_player:]})
+    game_logic.turn = Settings.PLAYER1
+    return game_logic
+
+
+def candidate_moves(game_logic):
+    """Every available edge move (once per dot pair) and every empty dot, in GameRecord's move tuples."""
+    b = game_logic.board_obj
+    moves = [("edge", ((u[0], u[1]), (v[0], v[1]))) for u, v in b.available_pairs if (u[0], u[1]) < (v[0], v[1])]
+    moves += [("conquer", dot) for dot in b.empty_dots]
+    return sorted(moves)
+
+
+def validate(game_logic, move):
+    kind, target = move
+    if kind == "edge":
+        (x1, y1), (x2, y2) = target
+        return game_logic.validate_edge((x1, y1, 1), (x2, y2, -1))
+    return game_logic.validate_conquer(target)
+
+
+def play(game_logic, move):
+    kind, target = move
+    if kind == "edge":
+        game_logic.make_move(target)
+    else:
+        game_logic.make_conquer_move(target)
+
+
+def undo(game_logic, move, player):
+    kind, target = move
+    if kind == "edge":
+        game_logic.undo_move(target, player)
+    else:
+        game_logic.undo_conquer_move(target, player)
+
+
+def random_legal_move(rng, game_logic):
+    """A random legal move of the player to move (conquers tried first a third of the time), or None."""
+    moves = candidate_moves(game_logic)
+    rng.shuffle(moves)
+    if rng.random() < 0.3:
+        moves.sort(key=lambda move: move[0] != "conquer")
+    for move in moves:
+        if validate(game_logic, move).legal:
+            return move
+    return None
+
+
+def play_random_game(rng, game_logic, step, max_plies=400):
+    """
+    Plays random legal moves until someone wins or the player to move is
+    stuck, calling step(game_logic, move) before each move is played.
+    """
+    for _ in range(max_plies):
+        move = random_legal_move(rng, game_logic)
+        if move is None:
+            return
+        step(game_logic, move)
+        play(game_logic, move)
+        if game_logic.check_win() is not None:
+            return
+        game_logic.turn = game_logic.next_turn()
+
+
+def board_state(board):
+    """Everything a Board keeps about the position, as plain comparable values."""
+    def nonzero(counts):
+        return {key: count for key, count in counts.items() if count}
+
+    return {
+        "players_pairs": {p: set(board.players_pairs[p]) for p in PLAYERS},
+        "available_pairs": set(board.available_pairs),
+        "conquer_dots": {p: list(board.conquer_dots[p]) for p in PLAYERS},
+        "empty_dots": set(board.empty_dots),
+        "dot_owner": dict(board.dot_owner),
+        "incoming_edges": {p: nonzero(board.incoming_edges[p]) for p in PLAYERS},
+        "successors": {p: nonzero(board.successors[p]) for p in PLAYERS},
+        "available_successors": nonzero(board.available_successors),
+    }
+
+
+def snapshot_state(snapshot):
+    return {name: getattr(snapshot, name) for name in snapshot.__slots__ if name != "version"}
+
+
+def tracker_answers(game_logic):
+    board = game_logic.board_obj
+    return [(board.connectivity[p].connected(), game_logic.distance_to_win(p)) for p in PLAYERS]
+
+
+# --------------------------
+# PROPERTIES
+# --------------------------
+
+def check_directed(rng):
+    V, E, S, cols, rows = random_graph(rng)
+    adj = graphAlgorithms.adjacency(E, V)
+
+    expected = naive_all_outs_reach_all_ins(V, E, S)
+    assert graphAlgorithms.all_outs_reach_all_ins(E, S) == expected, (E, S)
+    assert graphAlgorithms.all_outs_reach_all_ins_condensed(E, S) == expected, (E, S)
+    if numpyReachability.HAS_NUMPY:
+        assert numpyReachability.all_outs_reach_all_ins(E, S, cols, rows) == expected, (E, S)
+
+    assert graphAlgorithms.is_subset_strongly_connected(E, S) == naive_is_subset_strongly_connected(E, S), (E, S)
+
+    # the same query over successor bitmasks, for the edges the grid can hold,
+    # with part of them split off as `removed`
+    geometry = BoardGeometry.of(rows, cols)
+    grid_edges = [e for e in E if e in geometry.edge_bits]
+    removed = rng.sample(grid_edges, rng.randint(0, len(grid_edges)))
+    kept = [e for e in grid_edges if e not in removed]
+    assert graphAlgorithms.all_outs_reach_all_ins_masked(
+        (geometry.masks(grid_edges),), geometry.neighbours, S, geometry.masks(removed)
+    ) == naive_all_outs_reach_all_ins(V, kept, S), (E, S, removed)
+
+    sources = rng.sample(V, min(len(V), rng.randint(1, 5)))
+    masks = graphAlgorithms.reach_masks(adj, sources)
+    for bit, source in enumerate(sources):
+        reached = naive_reachable(adj, source)
+        assert graphAlgorithms.bfs(adj, source) == reached
+        assert {v for v, mask in masks.items() if mask >> bit & 1} == reached
+    assert graphAlgorithms.reachable_from_any(adj, sources) == set().union(
+        *(naive_reachable(adj, s) for s in sources))
+
+    # SCCs: same component <=> mutually reachable; edges never point to a later component
+    components, comp_of = graphAlgorithms.strongly_connected_components(adj)
+    reach = {v: naive_reachable(adj, v) for v in V}
+    assert set(comp_of) == set(V)
+    for u in V:
+        for v in V:
+            assert (comp_of[u] == comp_of[v]) == (v in reach[u] and u in reach[v]), (u, v)
+    for u, v in E:
+        assert comp_of[u] >= comp_of[v], (u, v)
+    succ = graphAlgorithms.condensation(adj, components, comp_of)
+    assert all(d < c for c, successors in enumerate(succ) for d in successors)
+
+
+def check_undirected(rng):
+    graph, terminals = dot_graph(rng)
+
+    component = graphAlgorithms.connected_components(graph)
+    for a in graph:
+        reached = naive_reachable(graph, a)
+        assert all((component[a] == component[b]) == (b in reached) for b in graph)
+
+    connected, cut_edges, cut_dots = graphAlgorithms.separators(graph, terminals)
+    assert connected == terminals_connected(graph, terminals)
+    if connected:
+        for a in graph:
+            for b in graph[a]:
+                edge = frozenset((a, b))
+                assert (edge in cut_edges) == (not terminals_connected(graph, terminals, removed_edge=edge)), edge
+            # terminals are original dots, which can never be conquered (removed)
+            if a not in terminals:
+                assert (a in cut_dots) == (not terminals_connected(graph, terminals, removed_dot=a)), a
+
+
+def check_union_find(rng):
+    n = rng.randint(1, 20)
+    forest = graphAlgorithms.UnionFind()
+    graph = {v: set() for v in range(n)}
+    for v in range(n):
+        forest.add(v)
+    for _ in range(rng.randint(0, 2 * n)):
+        a, b = rng.randrange(n), rng.randrange(n)
+        forest.union(a, b)
+        graph[a].add(b)
+        graph[b].add(a)
+    for a in range(n):
+        reached = naive_reachable(graph, a)
+        assert all((forest.find(a) == forest.find(b)) == (b in reached) for b in range(n))
+
+    # taking one set apart leaves exactly the others
+    a = rng.randrange(n)
+    members = forest.discard_set(a)
+    assert set(members) == naive_reachable(graph, a)
+    assert set(forest.parent) == set(range(n)) - set(members)
+    assert sum(forest.size.values()) == len(forest.parent)
+
+
+def check_moves_match_validation(rng):
+    """
+    GameLogic.check_moves answers every candidate of every position of a 5x5
+    game like validate_*, and legal_moves lists exactly the legal ones.
+    """
+    game_logic = random_game(rng, 5, 5)
+
+    def step(game_logic, move):
+        b = game_logic.board_obj
+        candidates = [("edge", edge) for edge in sorted(b.available_pairs)]
+        candidates += [("conquer", dot) for dot in sorted(b.geometry.vertices)]  # conquered ones too
+        # illegal on their face: owned edges, non-neighbours, off the board
+        candidates += [("edge", edge) for player in PLAYERS for edge in sorted(b.players_pairs[player])
+                       if edge[0][:2] != edge[1][:2]]
+        candidates += [("edge", ((0, 0, 1), (2, 2, -1))), ("edge", ((4, 4, 1), (5, 4, -1))), ("conquer", (5, 0))]
+
+        batch = game_logic.check_moves(candidates)
+        for (kind, target), check in zip(candidates, batch):
+            single = game_logic.validate_edge(*target) if kind == "edge" else game_logic.validate_conquer(target)
+            assert (check.legal, check.wins, check.blocks) == (single.legal, single.wins, single.blocks), \
+                (kind, target, check, single)
+
+        # legal_moves: the same answers from the live board
+        expected = {}
+        for candidate in candidate_moves(game_logic):
+            check = validate(game_logic, candidate)
+            if check.legal:
+                expected[candidate] = (check.wins, check.blocks)
+        legal = game_logic.legal_moves()
+        assert len(legal) == len(expected)
+        assert {candidate: (check.wins, check.blocks) for candidate, check in legal} == expected
+
+    play_random_game(rng, game_logic, step)
+
+
+def check_undo_restores(rng):
+    """
+    Playing a legal move and undoing it (the client's rollback of a rejected
+    prediction) gives back the exact position: every set and index, the
+    snapshot contents and the trackers' answers, with the trackers updated
+    in place rather than rebuilt. Versions keep increasing instead of going
+    back, so a snapshot or frozen component cached under a version is never
+    mistaken for a later, different position.
+    """
+    game_logic = random_game(rng, rng.randint(4, 9), rng.randint(4, 9))
+    board = game_logic.board_obj
+
+    def step(game_logic, move):
+        for _ in range(2):
+            trial = random_legal_move(rng, game_logic) if rng.random() < 0.5 else move
+            before, answers = board_state(board), tracker_answers(game_logic)
+            snapshot, version = game_logic.snapshot(), board.version
+
+            play(game_logic, trial)
+            tracker_answers(game_logic)
+            undo(game_logic, trial, game_logic.turn)
+
+            assert all(board.connectivity[p].is_synced() and board.distance_to_win[p].is_synced() for p in PLAYERS)
+            assert board_state(board) == before, trial
+            assert tracker_answers(game_logic) == answers, trial
+            assert board.version > version
+            assert snapshot_state(game_logic.snapshot()) == snapshot_state(snapshot), trial
+
+    play_random_game(rng, game_logic, step)
+
+
+def check_snapshots_share_unchanged(rng):
+    """
+    A snapshot freezes again only the components a move changed; every
+    other one is the very object of the previous snapshot, and a change
+    that changes nothing (conquering an own dot again) rebuilds nothing.
+    """
+    game_logic = random_game(rng, rng.randint(4, 9), rng.randint(4, 9))
+    board = game_logic.board_obj
+
+    def components(snapshot):
+        return ([snapshot.all_points, snapshot.available_pairs, snapshot.empty_dots]
+                + [getattr(snapshot, name)[p] for name in ["players_original_dots", "players_pairs", "conquer_dots"]
+                   for p in PLAYERS])
+
+    def step(game_logic, move):
+        player, opponent = game_logic.turn, game_logic.next_turn()
+        before = game_logic.snapshot()
+        play(game_logic, move)
+        after = game_logic.snapshot()
+
+        assert after.version > before.version
+        assert after.all_points is before.all_points
+        assert after.conquer_dots[opponent] is before.conquer_dots[opponent]
+        assert all(after.players_original_dots[p] is before.players_original_dots[p] for p in PLAYERS)
+        if move[0] == "edge":
+            assert after.players_pairs[opponent] is before.players_pairs[opponent]
+            assert after.conquer_dots[player] is before.conquer_dots[player]
+            assert after.empty_dots is before.empty_dots
+        else:
+            assert after.available_pairs is before.available_pairs
+            assert after.players_pairs[player] is before.players_pairs[player]
+            board.conquer_dot(player, move[1])
+            again = game_logic.snapshot()
+            assert all(x is y for x, y in zip(components(again), components(after)))
+        undo(game_logic, move, player)
+
+    play_random_game(rng, game_logic, step)
+
+
+def check_connectivity_tracker(rng):
+    """
+    ConnectivityTracker's win answer after every move, conquer, undo and
+    reset of a random game equals a from-scratch reachability check, with
+    the tracker kept in sync by the Board (never rebuilt) along the way.
+    """
+    game_logic = random_game(rng, rng.randint(4, 11), rng.randint(4, 11))
+    board = game_logic.board_obj
+    originals = {(x, y) for p in PLAYERS for x, y, _ in board.players_original_dots[p]}
+
+    def check():
+        for p in PLAYERS:
+            tracker = board.connectivity[p]
+            assert tracker.is_synced()
+            expected = naive_all_outs_reach_all_ins(board.all_points, board.players_pairs[p],
+                                                    board.players_original_dots[p])
+            assert tracker.connected() == expected, p
+        assert game_logic.check_win() in [p for p in PLAYERS if board.connectivity[p].connected()] + [None]
+
+    def step(game_logic, move):
+        check()
+        # conquer any free dot for either player (legal or not) and give it back
+        free = sorted(board.empty_dots - originals)
+        if free:
+            player, dot = rng.choice(PLAYERS), rng.choice(free)
+            board.conquer_dot(player, dot)
+            check()
+            board.unconquer_dot(player, dot)
+            check()
+        # the move itself, undone and then played by the caller
+        play(game_logic, move)
+        check()
+        undo(game_logic, move, game_logic.turn)
+        check()
+
+    for p in PLAYERS:
+        board.connectivity[p].connected()  # sync before the first change
+    play_random_game(rng, game_logic, step)
+    check()
+
+    game_logic.reset()
+    for p in PLAYERS:
+        expected = naive_all_outs_reach_all_ins(board.all_points, board.players_pairs[p], board.players_original_dots[p])
+        assert board.connectivity[p].connected() == expected
+    play_random_game(rng, game_logic, lambda game_logic, move: check(), max_plies=rng.randint(0, 20))
+    check()
+
+
+def check_repeated_add(rng):
+    """
+    Playing a move twice and undoing it once leaves the win and distance
+    trackers equal to ones rebuilt from the board: the second, no-op add
+    must not reach them.
+    """
+    game_logic = random_game(rng, rng.randint(4, 9), rng.randint(4, 9))
+    board = game_logic.board_obj
+
+    def forest(tracker):
+        links = {dot: {other: n for other, n in linked.items() if n} for dot, linked in tracker.links.items()}
+        groups = {frozenset(members) for members in tracker.components.members.values()}
+        return {dot: linked for dot, linked in links.items() if linked}, groups
+
+    def check():
+        for p in PLAYERS:
+            tracker = board.connectivity[p]
+            assert tracker.is_synced(), p
+            fresh = ConnectivityTracker(board, p)
+            fresh.rebuild()
+            assert forest(tracker) == forest(fresh), p
+            assert tracker.connected() == fresh.connected(), p
+            assert board.distance_to_win[p].is_synced(), p
+            assert game_logic.distance_to_win(p) == naive_distance_to_win(board, p), p
+
+    def step(game_logic, move):
+        player = game_logic.turn
+        play(game_logic, move)
+        play(game_logic, move)
+        undo(game_logic, move, player)
+        check()
+
+    for p in PLAYERS:
+        board.connectivity[p].connected()  # sync before the first change
+        game_logic.distance_to_win(p)
+    play_random_game(rng, game_logic, step)
+
+
+def check_reset_matches_fresh(rng):
+    """A finished game given back to a BoardPool is handed out again as a fresh GameLogic would be."""
+    rows, cols = rng.randint(4, 9), rng.randint(4, 9)
+    layout = random_game(rng, rows, cols).board_obj.players_original_dots
+    layout = {p: sorted({(x, y) for x, y, _ in dots}) for p, dots in layout.items()}
+    pool = BoardPool(rows, cols, layout, max_free=1)
+
+    game_logic = pool.acquire()
+    game_logic.turn = Settings.PLAYER1
+    board = game_logic.board_obj
+    play_random_game(rng, game_logic, lambda game_logic, move: tracker_answers(game_logic))
+    old_snapshot, version = game_logic.snapshot(), board.version
+
+    pool.release(game_logic)
+    assert pool.acquire() is game_logic
+    fresh = GameLogic(rows, cols, layout)
+
+    assert game_logic.turn == Settings.PLAYER1
+    assert board_state(board) == board_state(fresh.board_obj)
+    assert board.players_original_dots == fresh.board_obj.players_original_dots
+    assert board.all_points == fresh.board_obj.all_points
+    assert board.version > version
+    snapshot = game_logic.snapshot()
+    assert snapshot is not old_snapshot and snapshot.version > old_snapshot.version
+    assert snapshot_state(snapshot) == snapshot_state(fresh.snapshot())
+    assert tracker_answers(game_logic) == tracker_answers(fresh)
+
+    # and plays on like one
+    moves = []
+    play_random_game(rng, fresh, lambda game_logic, move: moves.append(move), max_plies=rng.randint(1, 40))
+    for move in moves:
+        assert validate(game_logic, move).legal, move
+        play(game_logic, move)
+        if game_logic.check_win() is None:
+            game_logic.turn = game_logic.next_turn()
+    assert board_state(board) == board_state(fresh.board_obj)
+    assert tracker_answers(game_logic) == tracker_answers(fresh)
+
+
+def check_distance_tracker(rng):
+    """
+    DistanceTracker's distance to win after every move, conquer (of any dot,
+    original ones included), undo and reset of a random 7x7 or 9x9 game
+    equals naive_distance_to_win, with the maps kept in sync by the Board.
+    """
+    size = rng.choice([7, 9])
+    game_logic = random_game(rng, size, size)
+    board = game_logic.board_obj
+
+    def check():
+        for p in PLAYERS:
+            assert board.distance_to_win[p].is_synced(), p
+            assert game_logic.distance_to_win(p) == naive_distance_to_win(board, p), p
+
+    def step(game_logic, move):
+        check()
+        player, dot = rng.choice(PLAYERS), rng.choice(sorted(board.geometry.vertices))
+        if board.dot_owner.get(dot) != player:
+            board.conquer_dot(player, dot)
+            check()
+            board.unconquer_dot(player, dot)
+            check()
+        play(game_logic, move)
+        check()
+        undo(game_logic, move, game_logic.turn)
+        check()
+
+    for p in PLAYERS:
+        game_logic.distance_to_win(p)  # sync before the first change
+    play_random_game(rng, game_logic, step)
+    check()
+
+    game_logic.reset()
+    for p in PLAYERS:
+        assert game_logic.distance_to_win(p) == naive_distance_to_win(board, p)
+    play_random_game(rng, game_logic, lambda game_logic, move: check(), max_plies=rng.randint(0, 30))
+    check()
+
+
+def check_search(rng):
+    """
+    GameSearch's alpha-beta root scores equal naive_negamax at depths 1 and
+    2 on small random positions, and run() leaves the board as it found it
+    and still answers a legal move when the time limit cuts it short, at the
+    root or deep in the tree.
+    """
+    game_logic = random_game(rng, rng.randint(3, 5), rng.randint(3, 5))
+    board = game_logic.board_obj
+    for _ in range(rng.randint(0, 6)):
+        move = random_legal_move(rng, game_logic)
+        if move is None or game_logic.check_win() is not None:
+            break
+        play(game_logic, move)
+        if game_logic.check_win() is not None:
+            undo(game_logic, move, game_logic.turn)
+            break
+        game_logic.turn = game_logic.next_turn()
+
+    legal = {move for move in candidate_moves(game_logic) if validate(game_logic, move).legal}
+    before, turn = board_state(board), game_logic.turn
+    for depth in [1, 2]:
+        search = GameSearch(game_logic)
+        score, pv = search._root(depth, search._legal_moves(), None)
+        assert score == naive_negamax(game_logic, depth), (depth, score)
+        assert (board_state(board), game_logic.turn) == (before, turn)
+
+    search = GameSearch(game_logic)
+    result = search.run(max_depth=2)
+    assert (board_state(board), game_logic.turn) == (before, turn)
+    assert result.move in legal if legal else result.move is None
+
+    # out of time before the first node
+    result = GameSearch(game_logic).run(max_depth=3, time_limit=0.0)
+    assert (board_state(board), game_logic.turn) == (before, turn)
+    assert result.move in legal if legal else result.move is None
+
+    # out of time after a few leaves, in the middle of an iteration
+    evaluations = [0, rng.randint(1, 20)]
+
+    def expiring_eval(game_logic, player):
+        evaluations[0] += 1
+        if evaluations[0] >= evaluations[1]:
+            search.deadline = 0.0
+        return distance_eval(game_logic, player)
+
+    search = GameSearch(game_logic, evaluate=expiring_eval)
+    result = search.run(max_depth=3)
+    assert (board_state(board), game_logic.turn) == (before, turn)
+    assert result.move in legal if legal else result.move is None
+
+
+def check_position_views(rng):
+    """
+    Every position of a random game, packed into a PositionDB and read back
+    through its PositionView, has the Board's position hash and check_moves
+    answers, and its BitSets equal and hash like frozensets of the Board's
+    sets (so the two mix as set members and dict keys).
+    """
+    game_logic = random_game(rng, rng.randint(4, 7), rng.randint(4, 7))
+    board = game_logic.board_obj
+    expected = []
+    path = os.path.join(tempfile.mkdtemp(), "test.posdb")
+    writer = PositionWriter(path, board.rows, board.cols)
+
+    def step(game_logic, move):
+        candidates = [("edge", edge) for edge in sorted(board.available_pairs)]
+        candidates += [("conquer", dot) for dot in sorted(board.geometry.vertices)]
+        checks = [(check.legal, check.wins, check.blocks) for check in game_logic.check_moves(candidates)]
+        sets = {"available_pairs": frozenset(board.available_pairs), "empty_dots": frozenset(board.empty_dots)}
+        for p in PLAYERS:
+            sets[("players_pairs", p)] = frozenset(board.players_pairs[p])
+            sets[("conquer_dots", p)] = frozenset(board.conquer_dots[p])
+        expected.append((game_logic.turn, position_hash(board, game_logic.turn), candidates, checks, sets))
+        writer.add(board, game_logic.turn)
+
+    play_random_game(rng, game_logic, step, max_plies=60)
+    writer.close()
+
+    db = PositionDB(path)
+    try:
+        assert len(db) == len(expected)
+        for view, (turn, key, candidates, checks, sets) in zip(db, expected):
+            assert view.turn == turn and view.hash == key
+            game_logic.turn = turn
+            answers = [(check.legal, check.wins, check.blocks)
+                       for check in game_logic.check_moves(candidates, snapshot=view)]
+            assert answers == checks
+            for name, frozen in sets.items():
+                bits = getattr(view, name) if isinstance(name, str) else getattr(view, name[0])[name[1]]
+                assert bits == frozen and hash(bits) == hash(frozen), name
+                assert bits in {frozen} and frozen in {bits: None}, name
+    finally:
+        db.close()
+        os.remove(path)
+        os.rmdir(os.path.dirname(path))
+
+
 if __name__ == "__main__":
-    # Example: small 2x2 grid
-    # Vertices: (x, y, side)
-    V = [
-        (0, 0, -1), (0, 0, 1),
-        (0, 1, -1), (0, 1, 1),
-        (1, 0, -1), (1, 0, 1),
-        (1, 1, -1), (1, 1, 1),
-    ]
-
-    # Edges (directed)
-    E = [
-        ((0, 0, 1), (0, 0, -1)),
-        ((0, 0, 1), (1, 0, -1)),
-        ((1, 0, 1), (1, 0, -1)),
-        ((1, 0, 1), (1, 1, -1)),
-        ((0, 1, 1), (0, 1, -1)),
-        ((0, 1, 1), (1, 1, -1)),
-        ((1, 1, 1), (1, 1, -1)),
-        ((0, 0, 1), (0, 1, -1)),  # cross edge
-    ]
-
-    # Subset of vertices to check connectivity
-    S = [(0, 0, -1), (1, 0, -1), (0, 1, -1), (1, 1, -1),
-         (0, 0, 1), (1, 0, 1), (0, 1, 1), (1, 1, 1)]
-
-    result = is_subset_strongly_connected(E, S)
-    print(f"Subset strongly connected? {result}")
-
-    # Test with a disconnected subset
-    S2 = [(0, 0, -1), (1, 1, -1), (0, 0, 1), (1, 1, 1)]
-    result2 = is_subset_strongly_connected(E, S2)
-    print(f"Disconnected subset strongly connected? {result2}")
+    rounds = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    seed = int(sys.argv[2]) if len(sys.argv) > 2 else 0
+    rng = random.Random(seed)
+
+    for _ in range(rounds):
+        check_directed(rng)
+        check_undirected(rng)
+        check_union_find(rng)
+    print(f"graphAlgorithms: {rounds} random directed + undirected graphs and union-find forests match the naive versions (seed {seed})")
+
+    games = max(1, rounds // 100)
+    for _ in range(games):
+        check_moves_match_validation(rng)
+        check_undo_restores(rng)
+        check_snapshots_share_unchanged(rng)
+        check_connectivity_tracker(rng)
+        check_repeated_add(rng)
+        check_reset_matches_fresh(rng)
+        check_distance_tracker(rng)
+        check_search(rng)
+        check_position_views(rng)
+    print(f"gameLogic: check_moves, undo, snapshots, the win and distance trackers, pooled resets, the search and "
+          f"position database views match from-scratch answers over {games} random games (seed {seed})")